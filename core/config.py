@@ -12,6 +12,82 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     REFRESH_TOKEN_EXPIRE_TIME: int
 
+    # Пул зʼєднань до бази (для SQLite не застосовується)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Кеш prepared statements asyncpg на зʼєднання (0 - вимкнути, напр. за pgbouncer)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Скільки зʼєднань відкрити при старті воркера
+    DB_POOL_WARMUP_CONNECTIONS: int = 5
+
+    # Логування SQL: echo лише для налагодження, у проді - вибіркові повільні запити
+    DB_ECHO: bool = False
+    DB_SLOW_QUERY_MS: int = 200
+    DB_SLOW_QUERY_SAMPLE_RATE: float = 0.1
+
+    # Лічильник SQL-запитів на HTTP-запит (Server-Timing, пошук N+1)
+    QUERY_COUNTER_ENABLED: bool = True
+    QUERY_N_PLUS_ONE_THRESHOLD: int = 5
+    # Strict: перевищення бюджету запитів роута -> 500 (вмикається в тестах)
+    QUERY_BUDGET_STRICT: bool = False
+    QUERY_BUDGET_DEFAULT: int = 0
+
+    # Метрики у форматі Prometheus (GET /metrics)
+    METRICS_ENABLED: bool = True
+
+    # Хешування паролів (argon2). Зміна параметрів -> прозорий rehash при логіні
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+    # Скільки хешувань може виконуватись одночасно (розмір пулу потоків)
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # Кеш автентифікованих користувачів (per-worker), ключ - хеш токена
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_SIZE: int = 10000
+
+    # Кеш продуктів (per-worker) перед ProductRepository.get_by_id / get_many
+    PRODUCT_CACHE_TTL_SECONDS: int = 30
+    PRODUCT_CACHE_MAX_SIZE: int = 10000
+
+    # Інвалідація per-process кешів між воркерами (Postgres LISTEN/NOTIFY)
+    INVALIDATION_CHANNEL: str = "cache_invalidation"
+    INVALIDATION_KEEPALIVE_SECONDS: int = 30
+    INVALIDATION_RECONNECT_SECONDS: int = 5
+
+    # Чорний список токенів: як часто чистити протухлі записи і перебудовувати Bloom-фільтр
+    TOKEN_BLACKLIST_REFRESH_SECONDS: int = 60
+    TOKEN_BLACKLIST_BLOOM_CAPACITY: int = 100000
+    TOKEN_BLACKLIST_BLOOM_ERROR_RATE: float = 0.001
+
+    # Резервування товарів у кошику: час життя hold та інтервал прибирання протухлих
+    STOCK_HOLD_TTL_SECONDS: int = 900
+    STOCK_HOLD_SWEEP_SECONDS: int = 60
+
+    # Шардовані лічильники залишку для гарячих продуктів
+    STOCK_SHARD_COUNT: int = 8
+    STOCK_SHARD_REBALANCE_SECONDS: int = 30
+
+    # Звірка інкрементальних сум кошиків з агрегатом по елементах
+    CART_TOTAL_RECONCILE_SECONDS: int = 300
+    CART_TOTAL_RECONCILE_BATCH: int = 1000
+    # Максимум різних продуктів в одному POST /cart/items
+    CART_BATCH_MAX_ITEMS: int = 100
+
+    # Розмір пачки для bulk_create / bulk_upsert / bulk_delete
+    BULK_CHUNK_SIZE: int = 1000
+
+    # Масовий імпорт продуктів
+    IMPORT_BATCH_SIZE: int = 1000
+    IMPORT_MAX_ERRORS: int = 1000
+    IMPORT_MAX_RECORD_BYTES: int = 1_048_576
+
+    # Розмір пачки серверного курсора при експорті каталогу
+    EXPORT_BATCH_SIZE: int = 1000
+
     model_config = SettingsConfigDict(
         # Важливо: переконайтеся, що шлях правильний.
         # BASE_DIR вказує на папку Shop, тому .env шукаємо там.
@@ -0,0 +1,215 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger("db.query_counter")
+
+# Списки параметрів IN (?, ?, ?) різної довжини - одна й та сама "форма" запиту
+_PARAM_LIST = re.compile(r"\(\s*(?:\?|\$\d+|%\([^)]+\)s)(?:\s*,\s*(?:\?|\$\d+|%\([^)]+\)s))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Нормалізований SQL: без зайвих пробілів, IN-списки згорнуті до (?)"""
+    return _PARAM_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Роут перевищив бюджет запитів до commit (strict-режим)"""
+
+
+class QueryStats:
+    """Статистика SQL одного HTTP-запиту.
+
+    budget - бюджет роута; викликається ліниво, бо endpoint стає відомим
+    лише після маршрутизації.
+    """
+
+    def __init__(self, budget: Callable[[], int] = lambda: 0, strict: bool = False):
+        self.count = 0
+        self.duration_ms = 0.0
+        self.shapes: Counter = Counter()
+        self.strict = strict
+        self._budget = budget
+        # Чи зафіксовано транзакцію в межах запиту (після цього відповідь не замінюємо)
+        self.committed = False
+
+    @property
+    def budget(self) -> int:
+        return self._budget()
+
+    def over_budget(self) -> bool:
+        budget = self.budget
+        return bool(budget) and self.count > budget
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        self.count += 1
+        self.duration_ms += duration_ms
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Форми запитів, виконані щонайменше threshold разів (ознака N+1)"""
+        return [(shape, times) for shape, times in self.shapes.most_common() if times >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration_ms:.1f};desc="{self.count} queries"'
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Статистика поточного HTTP-запиту (None поза QueryCounterMiddleware)"""
+    return _current_stats.get()
+
+
+def check_query_budget() -> None:
+    """strict-режим: кинути QueryBudgetExceeded, якщо поточний запит вже перевищив бюджет.
+
+    UnitOfWork викликає перед COMMIT - роут із перевищенням падає до того,
+    як зміни зафіксовано.
+    """
+    stats = _current_stats.get()
+    if stats is not None and stats.strict and stats.over_budget():
+        raise QueryBudgetExceeded(f"Query budget exceeded before commit: {stats.count} > {stats.budget}")
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_committed(session: Session) -> None:
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.committed = True
+
+
+def install_query_counter(engine: Engine) -> None:
+    """Рахувати запити engine у статистику поточного HTTP-запиту.
+
+    Async-сесії виконують курсор у greenlet з контекстом задачі запиту,
+    тому ContextVar, встановлений middleware, видно в обробниках подій.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        if _current_stats.get() is not None:
+            conn.info.setdefault("query_counter_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_stats.get()
+        started = conn.info.get("query_counter_started_at")
+        if stats is None or not started:
+            return
+        stats.record(statement, (time.perf_counter() - started.pop()) * 1000)
+
+    @event.listens_for(engine, "handle_error")
+    def _drop(context):
+        connection = context.connection
+        if connection is not None and connection.info.get("query_counter_started_at"):
+            connection.info["query_counter_started_at"].pop()
+
+
+def query_budget(max_queries: int) -> Callable:
+    """Максимальна кількість SQL-запитів роута (strict-режим: UnitOfWork.commit і middleware).
+
+    Декоратор ставиться під @router.<method>, безпосередньо над функцією.
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+    return decorator
+
+
+class QueryCounterMiddleware:
+    """Pure ASGI middleware: кількість SQL-запитів і час у базі на кожен HTTP-запит.
+
+    - додає заголовок Server-Timing (db;dur=...;desc="N queries");
+    - логує форми запитів, що повторились n_plus_one_threshold+ разів (N+1);
+    - strict: роут, що перевищив бюджет (@query_budget або default_budget),
+      падає з 500 - тести з цим режимом падають. Перевищення до commit
+      зупиняє запит у UnitOfWork.commit (транзакція відкочується); відповідь
+      без commit замінюється тут. Якщо зміни вже зафіксовано, відповідь не
+      чіпаємо - перевищення лише логується як помилка.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        n_plus_one_threshold: int = 5,
+        strict: bool = False,
+        default_budget: int = 0
+    ):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.strict = strict
+        self.default_budget = default_budget
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(lambda: self._budget(scope), self.strict)
+        token = _current_stats.set(stats)
+        replaced = False
+
+        async def send_with_stats(message: Message) -> None:
+            nonlocal replaced
+            if replaced:
+                # Відповідь роута вже замінена помилкою бюджету - решту тіла відкидаємо
+                return
+
+            if message["type"] == "http.response.start":
+                self._report_repeated(scope, stats)
+                if self.strict and stats.over_budget():
+                    if stats.committed:
+                        logger.error(
+                            "Query budget exceeded after commit for %s %s: %s > %s",
+                            scope["method"], scope["path"], stats.count, stats.budget
+                        )
+                    else:
+                        replaced = True
+                        await self._send_budget_error(send, scope, stats, stats.budget)
+                        return
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current_stats.reset(token)
+
+    def _budget(self, scope: Scope) -> int:
+        # Router записує endpoint у той самий scope після маршрутизації
+        return getattr(scope.get("endpoint"), "__query_budget__", self.default_budget)
+
+    def _report_repeated(self, scope: Scope, stats: QueryStats) -> None:
+        for shape, times in stats.repeated(self.n_plus_one_threshold):
+            logger.warning(
+                "Possible N+1 in %s %s: %s queries of the same shape: %s",
+                scope["method"], scope["path"], times, shape[:300]
+            )
+
+    async def _send_budget_error(self, send: Send, scope: Scope, stats: QueryStats, budget: int) -> None:
+        detail = f"Query budget exceeded for {scope['method']} {scope['path']}: {stats.count} > {budget}"
+        logger.error(detail)
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 500,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"server-timing", stats.server_timing().encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,52 @@
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from core.config import settings
+
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
+
+# argon2 відпускає GIL, тому звичайного пулу потоків достатньо.
+# Розмір пулу обмежує кількість одночасних хешувань, решта чекає в черзі,
+# а event loop вільний для інших запитів.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+
+
+async def _run_in_pool(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, func, *args)
+
+
+async def hash_password(password: str) -> str:
+    """Хешує пароль поза event loop"""
+    return await _run_in_pool(pwd_context.hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Перевіряє пароль поза event loop"""
+    return await _run_in_pool(pwd_context.verify, plain_password, hashed_password)
+
+
+async def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Перевіряє пароль і, якщо параметри argon2 змінились, повертає новий хеш"""
+    return await _run_in_pool(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+def token_digest(token: str) -> str:
+    """SHA-256 токена: ключ для кешів і чорного списку замість самого JWT"""
+    return hashlib.sha256(token.encode()).hexdigest()
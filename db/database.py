@@ -1,19 +1,67 @@
 # db/async_session.py
+import asyncio
 from typing import Any, AsyncGenerator
 
+from sqlalchemy import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from core.config import settings
+from db.pool import InstrumentedAsyncAdaptedQueuePool
+from db.slow_queries import install_slow_query_logger
+
+
+def _engine_options(url: str) -> dict:
+    """Параметри engine з налаштувань; пул і кеш statements лише для серверних баз"""
+    options = {"echo": settings.DB_ECHO, "future": True}
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        return options
+
+    options.update(
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING
+    )
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    return options
+
 
 # Асинхронний engine
-engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URL, echo=True, future=True)
+engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URL, **_engine_options(settings.SQLALCHEMY_DATABASE_URL))
+install_slow_query_logger(engine.sync_engine, settings.DB_SLOW_QUERY_MS, settings.DB_SLOW_QUERY_SAMPLE_RATE)
 
 # Асинхронна сесія
 AsyncSessionLocal = sessionmaker( expire_on_commit=False, bind=engine, class_=AsyncSession)
 
 
 class Base(DeclarativeBase):
-    pass
+    # Серверні значення (id, created_at, ...) повертаються одразу через
+    # RETURNING у тому ж INSERT/UPDATE, без окремого refresh
+    __mapper_args__ = {"eager_defaults": True}
+
+
+async def warm_up_pool(connections: int) -> None:
+    """Відкрити зʼєднання пулу заздалегідь, щоб перші запити після деплою не чекали на handshake"""
+    if engine.dialect.name == "sqlite" or connections <= 0:
+        return
+
+    # Більше за pool_size відкривати немає сенсу - overflow-зʼєднання пул одразу закриє
+    connections = min(connections, settings.DB_POOL_SIZE)
+    opened = await asyncio.gather(
+        *(engine.connect().start() for _ in range(connections)),
+        return_exceptions=True
+    )
+    # Повертаємо зʼєднання в пул; помилка прогріву не повинна зупиняти старт
+    await asyncio.gather(
+        *(conn.close() for conn in opened if not isinstance(conn, BaseException)),
+        return_exceptions=True
+    )
+
+
 # Dependency для FastAPI
 async def get_async_db() -> AsyncGenerator[Any, Any]:
     async with AsyncSessionLocal() as session:
@@ -24,3 +24,19 @@ class PaymentType(enum.Enum):
 class HolderName(enum.Enum):
     visa = "visa"
     mastercard = "mastercard"
+
+
+class ProductSort(str, enum.Enum):
+    ID = "id"
+    PRICE = "price"
+
+
+class ImportFormat(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ImportJobStatus(str, enum.Enum):
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
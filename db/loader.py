@@ -0,0 +1,63 @@
+from typing import Any, Callable, Dict, Hashable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+class RequestLoader:
+    """Request-scoped loader поверх identity map сесії запиту.
+
+    Усі repositories одного запиту працюють з однією сесією, тож первинні
+    ключі вже дедуплікуються identity map. Loader додає до цього memo
+    для вибірок не за первинним ключем (кошик за user_id тощо).
+    Memo тримає сильні посилання на обʼєкти до кінця запиту (identity map
+    слабка) і скидається при rollback, коли обʼєкти протухають.
+
+    Пакетного load_many тут немає: жоден роут не вантажить кілька рядків
+    однієї моделі поштучно, а товари списком бере ProductRepository.get_many
+    (кеш + один SELECT ... IN).
+    """
+
+    INFO_KEY = "request_loader"
+
+    def __init__(self):
+        self._memo: Dict[Hashable, Any] = {}
+
+    @classmethod
+    def of(cls, db: AsyncSession) -> "RequestLoader":
+        """Loader сесії (створюється при першому зверненні)"""
+        loader = db.info.get(cls.INFO_KEY)
+        if loader is None:
+            loader = db.info[cls.INFO_KEY] = cls()
+        return loader
+
+    def get(self, key: Hashable) -> Any:
+        return self._memo.get(key)
+
+    def remember(self, key: Hashable, value: Any) -> Any:
+        if value is not None:
+            self._memo[key] = value
+        return value
+
+    def forget(self, key: Hashable) -> None:
+        self._memo.pop(key, None)
+
+    def clear(self) -> None:
+        self._memo.clear()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _clear_loader_on_rollback(session: Session, previous_transaction) -> None:
+    loader = session.info.get(RequestLoader.INFO_KEY)
+    if loader is not None:
+        loader.clear()
+
+
+async def memoized(db: AsyncSession, key: Hashable, load: Callable[[], Any]) -> Any:
+    """Результат load() один раз на запит (None не запамʼятовується)"""
+    loader = RequestLoader.of(db)
+    value = loader.get(key)
+    if value is None:
+        value = loader.remember(key, await load())
+    return value
@@ -2,11 +2,12 @@ from datetime import datetime
 from typing import List, Optional
 
 from pydantic import EmailStr
-from sqlalchemy import String, ForeignKey, Integer, DECIMAL, Boolean, Text, func, DateTime
+from sqlalchemy import String, ForeignKey, Integer, DECIMAL, Boolean, Text, func, DateTime, Index, DDL, event, UniqueConstraint, CheckConstraint, false, JSON, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from db.database import Base
-from db.enums import OrderStatus, PaymentStatus, PaymentType  # Припускаємо, що це імпортовано коректно
+from db.enums import OrderStatus, PaymentStatus, PaymentType, ImportFormat, ImportJobStatus  # Припускаємо, що це імпортовано коректно
 
 
 # --- МОДЕЛІ (Таблиці) ---
@@ -14,7 +15,10 @@ from db.enums import OrderStatus, PaymentStatus, PaymentType  # Припуска
 class TokenBlackList(Base):
     __tablename__ = "token_blacklist"
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    token: Mapped[str] = mapped_column(String)
+    # SHA-256 токена замість самого JWT: фіксована довжина та унікальний індекс
+    token_hash: Mapped[str] = mapped_column(String(64), unique=True, index=True)
+    # Після exp токен і так невалідний, тож запис можна видаляти
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True)
 
 
 class Country(Base):
@@ -83,6 +87,15 @@ class Product(Base):
     price: Mapped[float] = mapped_column(DECIMAL(10, 2))
     stock_quantity: Mapped[int] = mapped_column(Integer, default=0)
     image_url: Mapped[Optional[str]] = mapped_column(String)
+    # Артикул постачальника - ключ upsert при масовому імпорті
+    sku: Mapped[Optional[str]] = mapped_column(String(64), unique=True, index=True)
+    # "Гарячий" продукт: залишок розбитий на шарди у product_stock_shards,
+    # а stock_quantity - періодично синхронізована сума (для відображення)
+    is_hot: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false())
+    # Повнотекстовий вектор (Postgres). Заповнюється тригером, тому deferred
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR().with_variant(Text(), "sqlite"), nullable=True, deferred=True
+    )
 
     category: Mapped["Category"] = relationship(back_populates="products")
     reviews: Mapped[List["Review"]] = relationship(
@@ -93,6 +106,66 @@ class Product(Base):
     # ✅ ВИПРАВЛЕННЯ: Додано відсутній атрибут
     comparison_products: Mapped[List["ComparisonProducts"]] = relationship(back_populates="product")
 
+    # Індекси під keyset-пагінацію каталогу: (price, id) та фільтр за категорією
+    __table_args__ = (
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_category_id_id", "category_id", "id"),
+        Index("ix_products_category_price_id", "category_id", "price", "id"),
+    )
+
+
+# Конфігурація текстового пошуку Postgres: 'simple' не залежить від мови каталогу
+PRODUCT_SEARCH_CONFIG = "simple"
+
+# Тригер та GIN-індекс для search_vector (тільки Postgres, для create_all;
+# на існуючих базах те саме створює міграція)
+for _ddl in (
+    f"""
+    CREATE OR REPLACE FUNCTION products_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('{PRODUCT_SEARCH_CONFIG}', coalesce(NEW.name, '')), 'A') ||
+            setweight(to_tsvector('{PRODUCT_SEARCH_CONFIG}', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER products_search_vector_trg
+        BEFORE INSERT OR UPDATE OF name, description ON products
+        FOR EACH ROW EXECUTE FUNCTION products_search_vector_update()
+    """,
+    "CREATE INDEX ix_products_search_vector ON products USING gin (search_vector)",
+):
+    event.listen(Product.__table__, "after_create", DDL(_ddl).execute_if(dialect="postgresql"))
+
+
+class ProductStockShard(Base):
+    """Шард лічильника залишку для гарячого продукту"""
+    __tablename__ = "product_stock_shards"
+
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    shard_no: Mapped[int] = mapped_column(Integer, primary_key=True)
+    quantity: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class ProductImportJob(Base):
+    """Стан масового імпорту продуктів (для відновлення перерваного завантаження)"""
+    __tablename__ = "product_import_jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    format: Mapped[ImportFormat] = mapped_column()
+    status: Mapped[ImportJobStatus] = mapped_column(default=ImportJobStatus.RUNNING)
+    # Кількість рядків даних, оброблених і зафіксованих у базі
+    rows_processed: Mapped[int] = mapped_column(Integer, default=0)
+    rows_imported: Mapped[int] = mapped_column(Integer, default=0)
+    rows_failed: Mapped[int] = mapped_column(Integer, default=0)
+    errors: Mapped[list] = mapped_column(JSON, default=list)
+    # Причина, з якої імпорт перервався (FAILED)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(default=func.now(), onupdate=func.now())
+
 
 class ComparisonProducts(Base):
     __tablename__ = "comparison_products"
@@ -105,6 +178,11 @@ class ComparisonProducts(Base):
     # Додаємо зв'язок з юзером (опціонально, але корисно)
     user: Mapped["User"] = relationship(back_populates="comparisons")
 
+    # Повторне додавання того самого продукту не створює дубліката
+    __table_args__ = (
+        UniqueConstraint("user_id", "product_id", name="uq_comparison_products_user_product"),
+    )
+
 
 class Order(Base):
     __tablename__ = "orders"
@@ -143,6 +221,18 @@ class OrderItem(Base):
     orders: Mapped["Order"] = relationship(back_populates="items")
     product: Mapped["Product"] = relationship(back_populates="order_items")
 
+    __table_args__ = (
+        # Один відкритий рядок кошика на продукт - ціль upsert у POST /cart/items
+        Index(
+            "uq_order_items_open_cart_product",
+            "cart_id",
+            "product_id",
+            unique=True,
+            postgresql_where=text("order_id IS NULL"),
+            sqlite_where=text("order_id IS NULL")
+        ),
+    )
+
 class Cart(Base):
     __tablename__ = "carts"
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -155,6 +245,26 @@ class Cart(Base):
     # Зв'язок із замовленнями, що були створені з цього кошика
     orders: Mapped[List["Order"]] = relationship(back_populates="carts", cascade="all, delete-orphan")
 
+class StockReservation(Base):
+    """Тимчасове резервування товару кошиком (hold з TTL)"""
+    __tablename__ = "stock_reservations"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    cart_id: Mapped[int] = mapped_column(ForeignKey("carts.id"))
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
+    quantity: Mapped[int] = mapped_column(Integer)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True)
+
+    __table_args__ = (
+        # Один hold на пару (кошик, продукт) - оновлюється через upsert
+        UniqueConstraint("cart_id", "product_id", name="uq_stock_reservations_cart_product"),
+        # Відʼємний hold зменшував би резерв інших кошиків
+        CheckConstraint("quantity > 0", name="ck_stock_reservations_quantity_positive"),
+        # Сума активних резервів по продукту
+        Index("ix_stock_reservations_product_expires", "product_id", "expires_at"),
+    )
+
+
 class CreditCard(Base):
     __tablename__ = "creditcard"
 
@@ -0,0 +1,61 @@
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from core.metrics import Counter, Gauge, Histogram, registry
+
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+pool_checkout_wait_seconds = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection", buckets=POOL_WAIT_BUCKETS
+)
+pool_checkout_timeouts_total = Counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that hit pool_timeout"
+)
+pool_size = Gauge("db_pool_size", "Configured pool_size")
+pool_max_overflow = Gauge("db_pool_max_overflow", "Configured max_overflow")
+pool_checked_out = Gauge("db_pool_checked_out", "Connections currently in use")
+pool_overflow = Gauge("db_pool_overflow", "Overflow connections currently open (negative - pool not filled yet)")
+pool_saturation = Gauge("db_pool_saturation", "checked_out / (pool_size + max_overflow)")
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool, що міряє час очікування вільного зʼєднання.
+
+    Час включає відкриття нового зʼєднання, якщо пул ще не заповнений.
+    recreate() (engine.dispose) створює пул того ж класу, тож метрики не губляться.
+    QueuePool._do_get зрідка викликає себе рекурсивно (гонка за overflow) -
+    тоді одна видача рахується кілька разів, для гістограми це несуттєво.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_checkout_timeouts_total.inc()
+            raise
+        finally:
+            pool_checkout_wait_seconds.observe(time.perf_counter() - started)
+
+
+def install_pool_metrics(engine: AsyncEngine) -> None:
+    """Оновлювати гейджі пулу engine перед кожним scrape /metrics"""
+
+    def collect() -> None:
+        # engine.pool читаємо щоразу: після dispose() це вже інший обʼєкт
+        pool = engine.sync_engine.pool
+        if not isinstance(pool, QueuePool):
+            return
+        size = pool.size()
+        max_overflow = max(pool._max_overflow, 0)
+        checked_out = pool.checkedout()
+        pool_size.set(size)
+        pool_max_overflow.set(max_overflow)
+        pool_checked_out.set(checked_out)
+        pool_overflow.set(pool.overflow())
+        pool_saturation.set(checked_out / (size + max_overflow) if size + max_overflow else 0.0)
+
+    registry.add_collector(collect)
@@ -1,10 +1,10 @@
 from datetime import datetime, date
 from decimal import Decimal
-from typing import List, Optional
+from typing import Any, List, Optional
 
 from pydantic import BaseModel, EmailStr, Field, ConfigDict, field_serializer
 
-from db.enums import PaymentType
+from db.enums import PaymentType, ImportFormat, ImportJobStatus
 from db.models import OrderStatus
 
 
@@ -103,6 +103,7 @@ class ProductBase(BaseModel):
     price: Decimal
     category_id: int
     image_url: Optional[str] = None
+    sku: Optional[str] = Field(None, max_length=64)
 
 
 class ProductCreate(ProductBase):
@@ -121,6 +122,7 @@ class ProductUpdate(BaseModel):
 class ProductResponse(ProductBase):
     id: int
     stock_quantity: int
+    is_hot: bool = False
     category: Optional[CategoryResponse] = None
 
     @field_serializer('price')
@@ -131,12 +133,58 @@ class ProductResponse(ProductBase):
     class Config:
         from_attributes = True
 
+class ProductPage(BaseModel):
+    items: List[ProductResponse]
+    # Непрозорий курсор для наступної сторінки (None - це остання сторінка)
+    next_cursor: Optional[str] = None
+
+
+class ProductSuggestion(BaseModel):
+    id: int
+    name: str
+
+
+class ImportRowError(BaseModel):
+    # Номер рядка даних у файлі (з 1, без заголовка CSV)
+    row: int
+    errors: List[str]
+
+
+class ProductImportReport(BaseModel):
+    job_id: int
+    format: ImportFormat
+    status: ImportJobStatus
+    rows_processed: int
+    rows_imported: int
+    rows_failed: int
+    errors: List[ImportRowError] = []
+    # True, якщо помилок більше, ніж IMPORT_MAX_ERRORS, і звіт обрізано
+    errors_truncated: bool = False
+    # Причина переривання; продовжити можна з тим самим job_id
+    error: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class ComparisonProductsResponse(BaseModel):
     user_id: int
     product_id: int
 
     product: ProductResponse
 
+
+class ComparisonAttribute(BaseModel):
+    name: str
+    # Значення атрибута для кожного продукту, у порядку ComparisonMatrix.products
+    values: List[Any]
+    # False - у всіх продуктів однакове значення (клієнт може сховати рядок)
+    differs: bool
+
+
+class ComparisonMatrix(BaseModel):
+    products: List[ProductResponse]
+    attributes: List[ComparisonAttribute]
+
 # ==========================================
 # 5. ЗАМОВЛЕННЯ (ORDERS) - Найскладніше
 # ==========================================
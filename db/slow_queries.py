@@ -0,0 +1,38 @@
+import logging
+import random
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("db.slow_queries")
+
+# Довгі SQL обрізаються, параметри не логуються (можуть містити персональні дані)
+MAX_STATEMENT_CHARS = 1000
+
+
+def install_slow_query_logger(engine: Engine, threshold_ms: float, sample_rate: float) -> None:
+    """Логувати запити, довші за threshold_ms, з вибіркою sample_rate (0..1).
+
+    Вибірка обмежує обсяг логів, коли база деградує і повільними стають усі запити.
+    """
+    if threshold_ms <= 0 or sample_rate <= 0:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _log_if_slow(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started_at"].pop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms >= threshold_ms and random.random() < sample_rate:
+            logger.warning("Slow query (%.1f ms): %s", elapsed_ms, statement[:MAX_STATEMENT_CHARS])
+
+    @event.listens_for(engine, "handle_error")
+    def _drop_timer(context):
+        # Запит упав - after_cursor_execute не викличеться
+        connection = context.connection
+        if connection is not None and connection.info.get("query_started_at"):
+            connection.info["query_started_at"].pop()
@@ -0,0 +1,40 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.query_counter import check_query_budget
+from db.database import get_async_db
+
+
+class UnitOfWork:
+    """Unit of work на один запит.
+
+    Repositories лише реєструють зміни в сесії (add/delete/зміна атрибутів)
+    без власних flush/refresh. Усі накопичені зміни пишуться одним flush
+    під час commit, а серверні значення повертаються через RETURNING.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def flush(self) -> None:
+        """Примусово записати зміни (лише якщо значення потрібні до commit)"""
+        await self.session.flush()
+
+    async def commit(self) -> None:
+        """Записати всі зміни одним flush і зафіксувати транзакцію.
+
+        Бюджет запитів (strict) перевіряється між flush і COMMIT: роут,
+        що його перевищив, не залишає по собі зафіксованих змін.
+        """
+        await self.session.flush()
+        check_query_budget()
+        await self.session.commit()
+
+    async def rollback(self) -> None:
+        """Відкотити транзакцію"""
+        await self.session.rollback()
+
+
+def get_unit_of_work(db: AsyncSession = Depends(get_async_db)) -> UnitOfWork:
+    """Dependency: unit of work над тією ж сесією, що й repositories запиту"""
+    return UnitOfWork(db)
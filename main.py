@@ -2,6 +2,7 @@ from contextlib import asynccontextmanager
 
 import uvicorn
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -9,23 +10,63 @@ from routers.routes import (
     auth,
     users,
     products,
+    categories,
     cart,
     orders,
     payments,
     saller,
     admin
 )
-from db.database import Base, engine
+from db.database import Base, engine, AsyncSessionLocal, warm_up_pool
+from db.pool import install_pool_metrics
+from core.config import settings
+from core.metrics import MetricsMiddleware, registry as metrics_registry
+from core.query_counter import QueryBudgetExceeded, QueryCounterMiddleware, install_query_counter
+from routers.services import (
+    build_product_suggest_index,
+    refresh_token_blacklist,
+    refresh_category_registry,
+    purge_expired_stock_holds,
+    rebalance_hot_products,
+    reconcile_cart_totals,
+    start_periodic,
+    stop_periodic,
+    start_invalidation_listener
+)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Зʼєднання відкриваються до першого запиту, а не під час нього
+    await warm_up_pool(settings.DB_POOL_WARMUP_CONNECTIONS)
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+    # In-memory індекс автодоповнення будується один раз при старті воркера
+    async with AsyncSessionLocal() as session:
+        await build_product_suggest_index(session)
+    # Реєстр категорій: список категорій і перевірка назв без запитів до бази
+    await refresh_category_registry()
+
+    # Bloom-фільтр чорного списку токенів + періодичне очищення протухлих
+    await refresh_token_blacklist()
+    background_tasks = [
+        start_periodic("token-blacklist-refresh", settings.TOKEN_BLACKLIST_REFRESH_SECONDS, refresh_token_blacklist),
+        start_periodic("stock-holds-sweeper", settings.STOCK_HOLD_SWEEP_SECONDS, purge_expired_stock_holds),
+        start_periodic("stock-shards-rebalancer", settings.STOCK_SHARD_REBALANCE_SECONDS, rebalance_hot_products),
+        start_periodic("cart-totals-reconcile", settings.CART_TOTAL_RECONCILE_SECONDS, reconcile_cart_totals),
+    ]
+    # Слухач шини інвалідації кешів між воркерами (лише Postgres)
+    invalidation_listener = start_invalidation_listener()
+    if invalidation_listener is not None:
+        background_tasks.append(invalidation_listener)
     yield
+    await stop_periodic(background_tasks)
 app = FastAPI(
     title="My E-commerce API",
     description="API магазинчику",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # --- Підключення роутерів ---
@@ -48,14 +89,14 @@ app.include_router(
     prefix="/products",
     tags=["Products"]
 )
-#
-# # 3. Categories
-# app.include_router(
-#     categories.router,
-#     prefix="/categories",
-#     tags=["Categories"]
-# )
-#
+
+# 3. Categories
+app.include_router(
+    categories.router,
+    prefix="/categories",
+    tags=["Categories"]
+)
+
 # 4. Cart
 app.include_router(
     cart.router,
@@ -108,6 +149,29 @@ app.add_middleware(
   allow_headers=["*"],
 )
 
+if settings.QUERY_COUNTER_ENABLED:
+    install_query_counter(engine.sync_engine)
+    app.add_middleware(
+        QueryCounterMiddleware,
+        n_plus_one_threshold=settings.QUERY_N_PLUS_ONE_THRESHOLD,
+        strict=settings.QUERY_BUDGET_STRICT,
+        default_budget=settings.QUERY_BUDGET_DEFAULT
+    )
+
+    @app.exception_handler(QueryBudgetExceeded)
+    async def query_budget_exceeded(request, exc: QueryBudgetExceeded):
+        # Транзакцію не зафіксовано - клієнт отримує помилку, а не "успіх" без замовлення
+        return JSONResponse(status_code=500, content={"detail": str(exc)})
+
+# Метрики додаються останніми - middleware зовнішній і міряє весь запит
+if settings.METRICS_ENABLED:
+    install_pool_metrics(engine)
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     # Запуск сервера, якщо файл запускається напряму
     uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
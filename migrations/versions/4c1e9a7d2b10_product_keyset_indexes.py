@@ -0,0 +1,31 @@
+"""Product keyset indexes
+
+Revision ID: 4c1e9a7d2b10
+Revises: 27b6a8219f42
+Create Date: 2026-10-18 10:12:40.118512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1e9a7d2b10'
+down_revision: Union[str, Sequence[str], None] = '27b6a8219f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_products_price_id', 'products', ['price', 'id'], unique=False)
+    op.create_index('ix_products_category_id_id', 'products', ['category_id', 'id'], unique=False)
+    op.create_index('ix_products_category_price_id', 'products', ['category_id', 'price', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_category_price_id', table_name='products')
+    op.drop_index('ix_products_category_id_id', table_name='products')
+    op.drop_index('ix_products_price_id', table_name='products')
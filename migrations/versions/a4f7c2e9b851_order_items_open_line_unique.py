@@ -0,0 +1,46 @@
+"""Order items open line unique
+
+Revision ID: a4f7c2e9b851
+Revises: f1a83c5d0e62
+Create Date: 2026-10-18 19:41:12.530417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4f7c2e9b851'
+down_revision: Union[str, Sequence[str], None] = 'f1a83c5d0e62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Зливаємо можливі дублікати відкритих рядків кошика в рядок з найменшим id
+    op.execute(
+        "UPDATE order_items SET quantity = d.total "
+        "FROM (SELECT MIN(id) AS keep_id, SUM(quantity) AS total FROM order_items "
+        "WHERE order_id IS NULL GROUP BY cart_id, product_id HAVING COUNT(*) > 1) AS d "
+        "WHERE order_items.id = d.keep_id"
+    )
+    op.execute(
+        "DELETE FROM order_items AS oi USING order_items AS keep "
+        "WHERE oi.order_id IS NULL AND keep.order_id IS NULL "
+        "AND oi.cart_id = keep.cart_id AND oi.product_id = keep.product_id AND oi.id > keep.id"
+    )
+    op.create_index(
+        'uq_order_items_open_cart_product',
+        'order_items',
+        ['cart_id', 'product_id'],
+        unique=True,
+        postgresql_where=sa.text('order_id IS NULL')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_order_items_open_cart_product', table_name='order_items')
@@ -0,0 +1,33 @@
+"""Stock reservations quantity check
+
+Revision ID: b3e8f4a6d217
+Revises: c7d2e5a91f04
+Create Date: 2026-10-18 21:14:05.362910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e8f4a6d217'
+down_revision: Union[str, Sequence[str], None] = 'c7d2e5a91f04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Нульові й відʼємні holds нічого не резервують - прибираємо їх перед перевіркою
+    op.execute("DELETE FROM stock_reservations WHERE quantity <= 0")
+    op.create_check_constraint(
+        'ck_stock_reservations_quantity_positive',
+        'stock_reservations',
+        'quantity > 0'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ck_stock_reservations_quantity_positive', 'stock_reservations', type_='check')
@@ -0,0 +1,50 @@
+"""Token blacklist hash and expiry
+
+Revision ID: b7d4e0c93f25
+Revises: 8f3b2d6e41a7
+Create Date: 2026-10-18 12:20:51.733094
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d4e0c93f25'
+down_revision: Union[str, Sequence[str], None] = '8f3b2d6e41a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('token_blacklist', sa.Column('token_hash', sa.String(length=64), nullable=True))
+    op.add_column('token_blacklist', sa.Column('expires_at', sa.DateTime(), nullable=True))
+    # Для старих записів exp невідомий - тримаємо їх максимальний строк життя refresh токена
+    op.execute("""
+        UPDATE token_blacklist
+        SET token_hash = encode(sha256(convert_to(token, 'UTF8')), 'hex'),
+            expires_at = (now() at time zone 'utc') + interval '7 days'
+    """)
+    op.execute("""
+        DELETE FROM token_blacklist a USING token_blacklist b
+        WHERE a.token_hash = b.token_hash AND a.id > b.id
+    """)
+    op.alter_column('token_blacklist', 'token_hash', nullable=False)
+    op.alter_column('token_blacklist', 'expires_at', nullable=False)
+    op.create_index(op.f('ix_token_blacklist_token_hash'), 'token_blacklist', ['token_hash'], unique=True)
+    op.create_index(op.f('ix_token_blacklist_expires_at'), 'token_blacklist', ['expires_at'], unique=False)
+    op.drop_column('token_blacklist', 'token')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Самі токени відновити неможливо - записи чорного списку губляться
+    op.execute("DELETE FROM token_blacklist")
+    op.add_column('token_blacklist', sa.Column('token', sa.String(), nullable=False))
+    op.drop_index(op.f('ix_token_blacklist_expires_at'), table_name='token_blacklist')
+    op.drop_index(op.f('ix_token_blacklist_token_hash'), table_name='token_blacklist')
+    op.drop_column('token_blacklist', 'expires_at')
+    op.drop_column('token_blacklist', 'token_hash')
@@ -0,0 +1,36 @@
+"""Comparison products unique
+
+Revision ID: c7d2e5a91f04
+Revises: a4f7c2e9b851
+Create Date: 2026-10-18 20:02:47.118263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e5a91f04'
+down_revision: Union[str, Sequence[str], None] = 'a4f7c2e9b851'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Прибираємо дублікати, лишаючи найраніше додання продукту
+    op.execute(
+        "DELETE FROM comparison_products AS cp USING comparison_products AS keep "
+        "WHERE cp.user_id = keep.user_id AND cp.product_id = keep.product_id AND cp.id > keep.id"
+    )
+    op.create_unique_constraint(
+        'uq_comparison_products_user_product',
+        'comparison_products',
+        ['user_id', 'product_id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_comparison_products_user_product', 'comparison_products', type_='unique')
@@ -0,0 +1,42 @@
+"""Product stock shards
+
+Revision ID: e6c05b8a9d14
+Revises: d2a91f5c7e38
+Create Date: 2026-10-18 15:02:44.118905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6c05b8a9d14'
+down_revision: Union[str, Sequence[str], None] = 'd2a91f5c7e38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('is_hot', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.create_table('product_stock_shards',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('shard_no', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id', 'shard_no')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Повертаємо залишок гарячих продуктів з шардів у products.stock_quantity
+    op.execute(
+        "UPDATE products SET stock_quantity = s.total "
+        "FROM (SELECT product_id, SUM(quantity) AS total FROM product_stock_shards GROUP BY product_id) AS s "
+        "WHERE products.id = s.product_id"
+    )
+    op.drop_table('product_stock_shards')
+    op.drop_column('products', 'is_hot')
@@ -0,0 +1,46 @@
+"""Product sku and import jobs
+
+Revision ID: f1a83c5d0e62
+Revises: e6c05b8a9d14
+Create Date: 2026-10-18 16:27:09.513377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a83c5d0e62'
+down_revision: Union[str, Sequence[str], None] = 'e6c05b8a9d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('sku', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_products_sku'), 'products', ['sku'], unique=True)
+    op.create_table('product_import_jobs',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('format', sa.Enum('CSV', 'NDJSON', name='importformat'), nullable=False),
+    sa.Column('status', sa.Enum('RUNNING', 'COMPLETED', 'FAILED', name='importjobstatus'), nullable=False),
+    sa.Column('rows_processed', sa.Integer(), nullable=False),
+    sa.Column('rows_imported', sa.Integer(), nullable=False),
+    sa.Column('rows_failed', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.JSON(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('product_import_jobs')
+    sa.Enum(name='importjobstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='importformat').drop(op.get_bind(), checkfirst=True)
+    op.drop_index(op.f('ix_products_sku'), table_name='products')
+    op.drop_column('products', 'sku')
@@ -1,10 +1,15 @@
 from .cart_calculations import calculate_total_price, check_the_cart
 from .order_calculations import order_status
 from .product_calculations import check_product_quantity
+from .pagination import encode_cursor, decode_cursor
+from .comparison_calculations import comparison_matrix
 
 __all__ = [
     "calculate_total_price",
     "check_the_cart",
     "order_status",
     "check_product_quantity",
+    "encode_cursor",
+    "decode_cursor",
+    "comparison_matrix",
 ]
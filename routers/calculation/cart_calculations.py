@@ -3,16 +3,18 @@ from sqlalchemy import func
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from db.database import get_async_db
 from db.models import OrderItem, Cart, User
 from routers.routes.auth import get_current_user
+from routers.repositories.dependencies import get_cart_repository
+from routers.repositories import CartRepository
 
 
 async def calculate_total_price(db: AsyncSession, cart: Cart) -> float:
-    """Розраховує загальну ціну кошика"""
+    """Розраховує загальну ціну кошика (лише елементи, які ще не в замовленні)"""
     try:
         stmt = select(func.sum(OrderItem.quantity * OrderItem.price_at_purchase)).where(
-            OrderItem.cart_id == cart.id
+            OrderItem.cart_id == cart.id,
+            OrderItem.order_id.is_(None)
         )
         result = await db.execute(stmt)
         total_price = result.scalar_one_or_none()
@@ -23,14 +25,12 @@ async def calculate_total_price(db: AsyncSession, cart: Cart) -> float:
 
 
 async def check_the_cart(
-    db: AsyncSession = Depends(get_async_db),
+    cart_repo: CartRepository = Depends(get_cart_repository),
     current_user: User = Depends(get_current_user)
 ) -> Cart:
-    """Перевіряє та повертає кошик користувача"""
+    """Перевіряє та повертає кошик користувача (кошик запамʼятовується на весь запит)"""
     try:
-        stmt = select(Cart).where(Cart.user_id == current_user.id)
-        result = await db.execute(stmt)
-        cart = result.scalar_one_or_none()
+        cart = await cart_repo.get_for_user(current_user.id)
         
         if not cart:
             raise HTTPException(
@@ -0,0 +1,30 @@
+from typing import List
+
+from db.shemas import ComparisonAttribute, ProductResponse
+
+# Атрибути, що порівнюються, у порядку рядків матриці
+COMPARED_ATTRIBUTES = ("price", "category", "stock_quantity", "is_hot", "sku", "description", "image_url")
+
+
+def _attribute_value(product: ProductResponse, name: str):
+    if name == "category":
+        return product.category.name if product.category else None
+    if name == "price":
+        return float(product.price)
+    return getattr(product, name)
+
+
+def comparison_matrix(products: List[ProductResponse]) -> List[ComparisonAttribute]:
+    """Матриця порівняння: по рядку на атрибут, по стовпцю на продукт.
+
+    differs показує, чи відрізняється значення хоча б в одного продукту.
+    """
+    attributes = []
+    for name in COMPARED_ATTRIBUTES:
+        values = [_attribute_value(product, name) for product in products]
+        attributes.append(ComparisonAttribute(
+            name=name,
+            values=values,
+            differs=any(value != values[0] for value in values[1:])
+        ))
+    return attributes
@@ -4,7 +4,7 @@ from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload, joinedload
 from db.database import get_async_db
 from db.enums import OrderStatus
-from db.models import Order, OrderItem
+from db.models import Order, OrderItem, Product
 
 
 def get_order_status_dependency(order_id: int):
@@ -16,7 +16,7 @@ def get_order_status_dependency(order_id: int):
         result = await db.execute(
             select(Order)
             .where(Order.id == order_id)
-            .options(selectinload(Order.items).joinedload(OrderItem.product))
+            .options(selectinload(Order.items).joinedload(OrderItem.product).joinedload(Product.category))
         )
 
         order = result.scalar_one_or_none()
@@ -46,7 +46,7 @@ async def order_status(
     result = await db.execute(
         select(Order)
         .where(Order.id == order_id)
-        .options(selectinload(Order.items).joinedload(OrderItem.product))
+        .options(selectinload(Order.items).joinedload(OrderItem.product).joinedload(Product.category))
     )
 
     order = result.scalar_one_or_none()
@@ -0,0 +1,22 @@
+import base64
+import binascii
+import json
+
+
+def encode_cursor(data: dict) -> str:
+    """Кодує позицію keyset-пагінації у непрозорий курсор"""
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Декодує курсор. Кидає ValueError, якщо курсор пошкоджений"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(data, dict):
+        raise ValueError("Invalid cursor")
+    return data
@@ -8,6 +8,8 @@ from .comparison_repository import ComparisonRepository
 from .category_repository import CategoryRepository
 from .address_repository import AddressRepository
 from .token_repository import TokenRepository
+from .reservation_repository import ReservationRepository
+from .import_job_repository import ImportJobRepository
 from . import dependencies
 
 __all__ = [
@@ -22,5 +24,7 @@ __all__ = [
     "CategoryRepository",
     "AddressRepository",
     "TokenRepository",
+    "ReservationRepository",
+    "ImportJobRepository",
     "dependencies",
 ]
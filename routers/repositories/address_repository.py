@@ -13,8 +13,7 @@ class AddressRepository(BaseRepository[UserAddress]):
     
     async def get_by_id(self, address_id: int) -> Optional[UserAddress]:
         """Отримати адресу за ID"""
-        result = await self.db.execute(select(UserAddress).where(UserAddress.id == address_id))
-        return result.scalar_one_or_none()
+        return await self.db.get(UserAddress, address_id)
     
     async def get_by_user_id(self, user_id: int) -> List[UserAddress]:
         """Отримати всі адреси користувача"""
@@ -37,6 +36,4 @@ class AddressRepository(BaseRepository[UserAddress]):
         """Створити нову адресу"""
         address = UserAddress(**kwargs)
         self.db.add(address)
-        await self.db.flush()
-        await self.db.refresh(address)
         return address
@@ -1,11 +1,23 @@
-from typing import Generic, TypeVar, Type, Optional, List
+from typing import Generic, TypeVar, Type, Optional, List, Dict, Any, Iterator, Sequence, Union
+from sqlalchemy import insert, delete
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
+from core.config import settings
 from db.database import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
 
+# Postgres дозволяє до 32767 bind-параметрів на запит (SQLite - 32766)
+MAX_BIND_PARAMS = 32000
+
+
+def _chunks(items: Sequence, size: int) -> Iterator[Sequence]:
+    """Розбити послідовність на пачки розміром size"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
 
 class BaseRepository(Generic[ModelType]):
     """Базовий клас для всіх repositories"""
@@ -13,12 +25,18 @@ class BaseRepository(Generic[ModelType]):
     def __init__(self, model: Type[ModelType], db: AsyncSession):
         self.model = model
         self.db = db
+
+    def _dialect_insert(self, model=None):
+        """INSERT з підтримкою ON CONFLICT для поточної бази (Postgres або SQLite)"""
+        model = model if model is not None else self.model
+        if self.db.bind.dialect.name == "postgresql":
+            return postgresql.insert(model)
+        return sqlite.insert(model)
     
     async def get_by_id(self, id: int) -> Optional[ModelType]:
-        """Отримати запис за ID"""
-        result = await self.db.execute(select(self.model).where(self.model.id == id))
-        return result.scalar_one_or_none()
-    
+        """Отримати запис за ID (без запиту, якщо він вже завантажений у цьому запиті)"""
+        return await self.db.get(self.model, id)
+
     async def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
         """Отримати всі записи з пагінацією"""
         result = await self.db.execute(
@@ -30,8 +48,6 @@ class BaseRepository(Generic[ModelType]):
         """Створити новий запис"""
         instance = self.model(**kwargs)
         self.db.add(instance)
-        await self.db.flush()
-        await self.db.refresh(instance)
         return instance
     
     async def update(self, instance: ModelType, **kwargs) -> ModelType:
@@ -39,11 +55,116 @@ class BaseRepository(Generic[ModelType]):
         for key, value in kwargs.items():
             setattr(instance, key, value)
         self.db.add(instance)
-        await self.db.flush()
-        await self.db.refresh(instance)
         return instance
     
     async def delete(self, instance: ModelType) -> None:
         """Видалити запис"""
         await self.db.delete(instance)
-        await self.db.flush()
+
+    def _chunk_size(self, rows: List[Dict[str, Any]], chunk_size: Optional[int]) -> int:
+        """Розмір пачки з урахуванням ліміту bind-параметрів на один запит"""
+        size = chunk_size or settings.BULK_CHUNK_SIZE
+        columns = max(len(rows[0]), 1)
+        return max(1, min(size, MAX_BIND_PARAMS // columns))
+
+    async def bulk_create(
+        self,
+        rows: List[Dict[str, Any]],
+        returning: bool = False,
+        chunk_size: Optional[int] = None
+    ) -> Union[int, List[int]]:
+        """Вставити багато записів multi-row INSERT пачками по chunk_size.
+
+        Усі словники в rows мають містити однаковий набір ключів. Повертає
+        ID вставлених записів (returning=True) або кількість вставлених рядків.
+        Обʼєкти в сесії не створюються.
+        """
+        if not rows:
+            return [] if returning else 0
+
+        ids: List[int] = []
+        count = 0
+        for chunk in _chunks(rows, self._chunk_size(rows, chunk_size)):
+            stmt = insert(self.model).values(list(chunk))
+            if returning:
+                result = await self.db.execute(stmt.returning(self.model.id))
+                ids.extend(result.scalars().all())
+            else:
+                await self.db.execute(stmt)
+            count += len(chunk)
+        return ids if returning else count
+
+    async def bulk_upsert(
+        self,
+        rows: List[Dict[str, Any]],
+        index_elements: List[str],
+        update_fields: Optional[List[str]] = None,
+        returning: bool = False,
+        chunk_size: Optional[int] = None
+    ) -> Union[int, List[int]]:
+        """Вставити або оновити багато записів через INSERT ... ON CONFLICT.
+
+        index_elements - колонки унікального ключа для ON CONFLICT.
+        update_fields - колонки, що оновлюються при конфлікті (за замовчуванням
+        усі, крім ключа); порожній список означає ON CONFLICT DO NOTHING.
+        Повертає ID вставлених/оновлених записів (returning=True) або
+        кількість зачеплених рядків.
+        """
+        if not rows:
+            return [] if returning else 0
+
+        if update_fields is None:
+            update_fields = [key for key in rows[0] if key not in index_elements]
+
+        ids: List[int] = []
+        count = 0
+        for chunk in _chunks(rows, self._chunk_size(rows, chunk_size)):
+            stmt = self._dialect_insert().values(list(chunk))
+            if update_fields:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=index_elements,
+                    set_={field: stmt.excluded[field] for field in update_fields}
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+
+            if returning:
+                result = await self.db.execute(stmt.returning(self.model.id))
+                chunk_ids = result.scalars().all()
+                ids.extend(chunk_ids)
+                count += len(chunk_ids)
+            else:
+                result = await self.db.execute(stmt)
+                count += result.rowcount
+        return ids if returning else count
+
+    async def bulk_delete(
+        self,
+        ids: List[int],
+        returning: bool = False,
+        chunk_size: Optional[int] = None
+    ) -> Union[int, List[int]]:
+        """Видалити багато записів за ID пачками DELETE ... WHERE id IN (...).
+
+        Повертає ID видалених записів (returning=True) або їх кількість.
+        Обʼєкти, вже завантажені в сесію, не синхронізуються.
+        """
+        if not ids:
+            return [] if returning else 0
+
+        size = min(chunk_size or settings.BULK_CHUNK_SIZE, MAX_BIND_PARAMS)
+        deleted: List[int] = []
+        count = 0
+        for chunk in _chunks(ids, size):
+            stmt = (
+                delete(self.model)
+                .where(self.model.id.in_(chunk))
+                .execution_options(synchronize_session=False)
+            )
+            if returning:
+                result = await self.db.execute(stmt.returning(self.model.id))
+                deleted.extend(result.scalars().all())
+            else:
+                result = await self.db.execute(stmt)
+                count += result.rowcount
+        return deleted if returning else count
@@ -1,8 +1,12 @@
+from decimal import Decimal
 from typing import List, Optional
+from sqlalchemy import update, delete, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload, joinedload
-from db.models import Cart, OrderItem, Product
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from db.loader import memoized
+from db.models import Cart, OrderItem, Product, StockReservation, User
 from .base_repository import BaseRepository
 
 
@@ -12,41 +16,131 @@ class CartRepository(BaseRepository[Cart]):
     def __init__(self, db: AsyncSession):
         super().__init__(Cart, db)
     
+    async def get_for_user(self, user_id: int) -> Optional[Cart]:
+        """Отримати кошик користувача без елементів (один SELECT на запит, далі з memo)"""
+        async def load() -> Optional[Cart]:
+            result = await self.db.execute(select(Cart).where(Cart.user_id == user_id))
+            return result.scalar_one_or_none()
+
+        return await memoized(self.db, (Cart, "user_id", user_id), load)
+
     async def get_by_user_id(self, user_id: int) -> Optional[Cart]:
-        """Отримати кошик користувача з усіма елементами"""
+        """Отримати кошик користувача з елементами, які ще не в замовленні.
+
+        Кошик береться з memo запиту (check_the_cart вже міг його завантажити),
+        елементи читаються завжди заново - вони могли змінитись у цьому запиті.
+        """
+        cart = await self.get_for_user(user_id)
+        if cart is None:
+            return None
+
         result = await self.db.execute(
-            select(Cart)
-            .where(Cart.user_id == user_id)
-            .options(
-                selectinload(Cart.items).options(
-                    joinedload(OrderItem.product).options(
-                        joinedload(Product.category)
-                    )
-                )
-            )
-        )
-        return result.scalar_one_or_none()
+            select(OrderItem)
+            .where(OrderItem.cart_id == cart.id, OrderItem.order_id.is_(None))
+            .options(joinedload(OrderItem.product).joinedload(Product.category))
+            .order_by(OrderItem.id)
+            .execution_options(populate_existing=True)
+        )
+        set_committed_value(cart, "items", list(result.scalars().all()))
+        return cart
     
-    async def create(self, user_id: int) -> Cart:
-        """Створити новий кошик для користувача"""
-        cart = Cart(user_id=user_id, total_price=0)
+    async def create(self, user: User) -> Cart:
+        """Створити новий кошик для користувача (користувач може бути ще не збереженим)"""
+        cart = Cart(user=user, total_price=0)
         self.db.add(cart)
-        await self.db.flush()
-        await self.db.refresh(cart)
         return cart
     
     async def update_total_price(self, cart: Cart, total_price: float) -> Cart:
         """Оновити загальну ціну кошика"""
         cart.total_price = total_price
         self.db.add(cart)
-        await self.db.flush()
-        await self.db.refresh(cart)
         return cart
     
+    async def add_to_total(self, cart: Cart, delta: Decimal) -> Decimal:
+        """Атомарно змінити загальну ціну кошика на delta.
+
+        Один UPDATE ... RETURNING без читання рядка, тож паралельні
+        зміни кошика не перезаписують одна одну.
+        """
+        result = await self.db.execute(
+            update(Cart)
+            .where(Cart.id == cart.id)
+            .values(total_price=Cart.total_price + delta)
+            .returning(Cart.total_price)
+            .execution_options(synchronize_session=False)
+        )
+        total_price = result.scalar_one()
+        set_committed_value(cart, "total_price", total_price)
+        return total_price
+
     async def clear_cart(self, cart: Cart) -> Cart:
-        """Очистити кошик (видалити всі елементи)"""
-        cart.total_price = 0
-        for item in cart.items:
-            await self.db.delete(item)
-        await self.db.flush()
+        """Очистити кошик: видалити всі елементи, які ще не в замовленні, і зняти їх holds.
+
+        Holds знімаються тут, а не у викликачів: інакше видалені рядки ще
+        блокували б товар до спливу TTL.
+        """
+        await self.db.execute(
+            delete(StockReservation).where(StockReservation.cart_id == cart.id)
+        )
+        await self.db.execute(
+            delete(OrderItem)
+            .where(OrderItem.cart_id == cart.id, OrderItem.order_id.is_(None))
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.execute(
+            update(Cart)
+            .where(Cart.id == cart.id)
+            .values(total_price=0)
+            .execution_options(synchronize_session=False)
+        )
+        set_committed_value(cart, "total_price", Decimal(0))
         return cart
+
+    @staticmethod
+    def _items_total(cart_id):
+        return (
+            select(func.coalesce(func.sum(OrderItem.quantity * OrderItem.price_at_purchase), 0))
+            .where(OrderItem.cart_id == cart_id, OrderItem.order_id.is_(None))
+            .scalar_subquery()
+        )
+
+    async def find_total_drift(self, limit: int) -> List[int]:
+        """ID кошиків, у яких total_price не збігається з агрегатом по елементах (лише читання).
+
+        Результат - кандидати: кошик міг змінитись паралельно, тож перевіряються
+        вони ще раз під блокуванням у reconcile_total.
+        """
+        result = await self.db.execute(
+            select(Cart.id)
+            .where(Cart.total_price != self._items_total(Cart.id))
+            .order_by(Cart.id)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def reconcile_total(self, cart_id: int) -> bool:
+        """Виправити total_price одного кошика. Повертає True, якщо було розходження.
+
+        Спершу SELECT ... FOR UPDATE рядка кошика: зміна кошика (add_to_total)
+        тримає цей самий lock до commit, тож після його отримання паралельна
+        транзакція вже зафіксована. Суму рахуємо окремим запитом - у READ
+        COMMITTED він бачить свіжий знімок order_items, а не той, що був до lock.
+        """
+        result = await self.db.execute(
+            select(Cart.total_price).where(Cart.id == cart_id).with_for_update()
+        )
+        total_price = result.scalar_one_or_none()
+        if total_price is None:
+            return False
+
+        actual = (await self.db.execute(select(self._items_total(cart_id)))).scalar_one()
+        if Decimal(total_price) == Decimal(actual):
+            return False
+
+        await self.db.execute(
+            update(Cart)
+            .where(Cart.id == cart_id)
+            .values(total_price=actual)
+            .execution_options(synchronize_session=False)
+        )
+        return True
@@ -13,8 +13,7 @@ class CategoryRepository(BaseRepository[Category]):
     
     async def get_by_id(self, category_id: int) -> Optional[Category]:
         """Отримати категорію за ID"""
-        result = await self.db.execute(select(Category).where(Category.id == category_id))
-        return result.scalar_one_or_none()
+        return await self.db.get(Category, category_id)
     
     async def get_all(self) -> List[Category]:
         """Отримати всі категорії"""
@@ -25,8 +24,6 @@ class CategoryRepository(BaseRepository[Category]):
         """Створити нову категорію"""
         category = Category(**kwargs)
         self.db.add(category)
-        await self.db.flush()
-        await self.db.refresh(category)
         return category
     
     async def update(self, category_id: int, **kwargs) -> Optional[Category]:
@@ -39,8 +36,6 @@ class CategoryRepository(BaseRepository[Category]):
             setattr(category, key, value)
         
         self.db.add(category)
-        await self.db.flush()
-        await self.db.refresh(category)
         return category
     
     async def delete(self, category_id: int) -> bool:
@@ -50,5 +45,4 @@ class CategoryRepository(BaseRepository[Category]):
             return False
         
         await self.db.delete(category)
-        await self.db.flush()
         return True
@@ -1,30 +1,41 @@
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from db.models import ComparisonProducts
+from sqlalchemy.orm import contains_eager
+from db.models import ComparisonProducts, Product
 from .base_repository import BaseRepository
+from .product_repository import stock_expression, with_live_stock
 
 
 class ComparisonRepository(BaseRepository[ComparisonProducts]):
     """Repository для роботи з таблицею порівняння продуктів"""
-    
+
     def __init__(self, db: AsyncSession):
         super().__init__(ComparisonProducts, db)
-    
+
     async def get_by_user_id(self, user_id: int) -> List[ComparisonProducts]:
-        """Отримати всі продукти для порівняння користувача"""
+        """Отримати всі продукти для порівняння користувача (з продуктами, категоріями і залишком одним запитом)"""
         result = await self.db.execute(
-            select(ComparisonProducts).where(ComparisonProducts.user_id == user_id)
-        )
-        return result.scalars().all()
-    
-    async def create(self, user_id: int, product_id: int) -> ComparisonProducts:
-        """Додати продукт до таблиці порівняння"""
-        comparison = ComparisonProducts(
-            user_id=user_id,
-            product_id=product_id
+            select(ComparisonProducts, Product, stock_expression())
+            .join(ComparisonProducts.product)
+            .options(contains_eager(ComparisonProducts.product).joinedload(Product.category))
+            .where(ComparisonProducts.user_id == user_id)
+            .order_by(ComparisonProducts.id)
         )
-        self.db.add(comparison)
-        await self.db.flush()
-        await self.db.refresh(comparison)
-        return comparison
+        rows = result.unique().all()
+        # Залишок гарячих продуктів - сума шардів, а не періодично синхронізований stock_quantity
+        with_live_stock((product, stock) for _, product, stock in rows)
+        return [comparison for comparison, _, _ in rows]
+
+    async def create(self, user_id: int, product_id: int) -> bool:
+        """Додати продукт до таблиці порівняння.
+
+        INSERT ... ON CONFLICT DO NOTHING: повторне додавання нічого не змінює.
+        Повертає True, якщо продукт додано вперше.
+        """
+        stmt = self._dialect_insert().values(user_id=user_id, product_id=product_id)
+        stmt = stmt.on_conflict_do_nothing(
+            index_elements=[ComparisonProducts.user_id, ComparisonProducts.product_id]
+        ).returning(ComparisonProducts.id)
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none() is not None
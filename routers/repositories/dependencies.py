@@ -13,6 +13,8 @@ from .comparison_repository import ComparisonRepository
 from .category_repository import CategoryRepository
 from .address_repository import AddressRepository
 from .token_repository import TokenRepository
+from .reservation_repository import ReservationRepository
+from .import_job_repository import ImportJobRepository
 
 
 def get_product_repository(db: AsyncSession = Depends(get_async_db)) -> ProductRepository:
@@ -68,3 +70,13 @@ def get_address_repository(db: AsyncSession = Depends(get_async_db)) -> AddressR
 def get_token_repository(db: AsyncSession = Depends(get_async_db)) -> TokenRepository:
     """Отримати TokenRepository"""
     return TokenRepository(db)
+
+
+def get_reservation_repository(db: AsyncSession = Depends(get_async_db)) -> ReservationRepository:
+    """Отримати ReservationRepository"""
+    return ReservationRepository(db)
+
+
+def get_import_job_repository(db: AsyncSession = Depends(get_async_db)) -> ImportJobRepository:
+    """Отримати ImportJobRepository"""
+    return ImportJobRepository(db)
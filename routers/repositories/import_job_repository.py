@@ -0,0 +1,27 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.enums import ImportFormat
+from db.models import ProductImportJob
+from .base_repository import BaseRepository
+
+
+class ImportJobRepository(BaseRepository[ProductImportJob]):
+    """Repository для задач масового імпорту продуктів"""
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(ProductImportJob, db)
+
+    async def get_by_id(self, job_id: int) -> Optional[ProductImportJob]:
+        """Отримати задачу імпорту за ID"""
+        return await self.db.get(ProductImportJob, job_id)
+
+    async def create(self, format: ImportFormat) -> ProductImportJob:
+        """Створити нову задачу імпорту"""
+        job = ProductImportJob(format=format, errors=[])
+        self.db.add(job)
+        return job
+
+    async def reload(self, job: ProductImportJob) -> ProductImportJob:
+        """Перечитати задачу після rollback (атрибути протухають разом з транзакцією)"""
+        await self.db.refresh(job)
+        return job
@@ -1,7 +1,11 @@
-from typing import Optional
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import update, Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from db.models import OrderItem
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from db.models import OrderItem, Product
 from .base_repository import BaseRepository
 
 
@@ -13,15 +17,17 @@ class OrderItemRepository(BaseRepository[OrderItem]):
     
     async def get_by_id(self, item_id: int) -> Optional[OrderItem]:
         """Отримати елемент за ID"""
-        result = await self.db.execute(select(OrderItem).where(OrderItem.id == item_id))
-        return result.scalar_one_or_none()
+        return await self.db.get(OrderItem, item_id)
     
     async def get_by_cart_and_product(self, cart_id: int, product_id: int) -> Optional[OrderItem]:
-        """Отримати елемент кошика для конкретного продукту"""
+        """Отримати елемент кошика (ще не в замовленні) для конкретного продукту"""
         result = await self.db.execute(
-            select(OrderItem).where(
+            select(OrderItem)
+            .options(joinedload(OrderItem.product).joinedload(Product.category))
+            .where(
                 OrderItem.cart_id == cart_id,
-                OrderItem.product_id == product_id
+                OrderItem.product_id == product_id,
+                OrderItem.order_id.is_(None)
             )
         )
         return result.scalar_one_or_none()
@@ -29,31 +35,60 @@ class OrderItemRepository(BaseRepository[OrderItem]):
     async def create(
         self,
         cart_id: int,
-        product_id: int,
+        product: Product,
         quantity: int,
         price_at_purchase: float
     ) -> OrderItem:
         """Створити новий елемент кошика"""
         item = OrderItem(
             cart_id=cart_id,
-            product_id=product_id,
+            product=product,
             quantity=quantity,
             price_at_purchase=price_at_purchase
         )
         self.db.add(item)
-        await self.db.flush()
-        await self.db.refresh(item)
         return item
     
+    async def upsert_cart_lines(self, cart_id: int, lines: Dict[int, Tuple[int, Decimal]]) -> List[Row]:
+        """Додати кілька товарів у кошик одним INSERT ... ON CONFLICT.
+
+        lines - {product_id: (кількість, ціна)}. Нові рядки створюються з поточною
+        ціною, у вже відкритих рядках кількість додається, а price_at_purchase
+        лишається попередньою. Повертає (id, product_id, quantity, price_at_purchase)
+        кожного зачепленого рядка.
+        """
+        if not lines:
+            return []
+
+        stmt = self._dialect_insert().values([
+            {
+                "cart_id": cart_id,
+                "product_id": product_id,
+                "quantity": quantity,
+                "price_at_purchase": price
+            }
+            for product_id, (quantity, price) in lines.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[OrderItem.cart_id, OrderItem.product_id],
+            index_where=OrderItem.order_id.is_(None),
+            set_={"quantity": OrderItem.quantity + stmt.excluded.quantity}
+        ).returning(OrderItem.id, OrderItem.product_id, OrderItem.quantity, OrderItem.price_at_purchase)
+        result = await self.db.execute(stmt)
+        return result.all()
+
     async def add_quantity(self, item: OrderItem, quantity: int) -> OrderItem:
-        """Додати кількість до існуючого елемента"""
-        item.quantity += quantity
-        self.db.add(item)
-        await self.db.flush()
-        await self.db.refresh(item)
+        """Атомарно додати кількість до існуючого елемента (один UPDATE ... RETURNING)"""
+        result = await self.db.execute(
+            update(OrderItem)
+            .where(OrderItem.id == item.id)
+            .values(quantity=OrderItem.quantity + quantity)
+            .returning(OrderItem.quantity)
+            .execution_options(synchronize_session=False)
+        )
+        set_committed_value(item, "quantity", result.scalar_one())
         return item
     
     async def delete(self, item: OrderItem) -> None:
         """Видалити елемент"""
         await self.db.delete(item)
-        await self.db.flush()
@@ -18,7 +18,11 @@ class OrderRepository(BaseRepository[Order]):
         result = await self.db.execute(
             select(Order)
             .where(Order.id == order_id)
-            .options(selectinload(Order.items).joinedload(OrderItem.product))
+            .options(
+                selectinload(Order.items)
+                .joinedload(OrderItem.product)
+                .joinedload(Product.category)
+            )
         )
         return result.scalar_one_or_none()
     
@@ -27,7 +31,11 @@ class OrderRepository(BaseRepository[Order]):
         result = await self.db.execute(
             select(Order)
             .where(Order.user_id == user_id)
-            .options(selectinload(Order.items).joinedload(OrderItem.product))
+            .options(
+                selectinload(Order.items)
+                .joinedload(OrderItem.product)
+                .joinedload(Product.category)
+            )
         )
         return result.scalars().all()
     
@@ -45,32 +53,27 @@ class OrderRepository(BaseRepository[Order]):
         self,
         user_id: int,
         cart_id: int,
-        address_id: int,
+        address: UserAddress,
         total_price: float
     ) -> Order:
-        """Створити нове замовлення"""
+        """Створити нове замовлення (адреса може бути ще не збереженою)"""
         order = Order(
             user_id=user_id,
             cart_id=cart_id,
-            address_id=address_id,
+            addresses=address,
             status=OrderStatus.NEW,
             total_price=total_price
         )
         self.db.add(order)
-        await self.db.flush()
         return order
     
     async def update_status(self, order: Order, status: OrderStatus) -> Order:
         """Оновити статус замовлення"""
         order.status = status
         self.db.add(order)
-        await self.db.flush()
-        await self.db.refresh(order)
         return order
     
-    async def link_items_to_order(self, order_id: int, items: List[OrderItem]) -> None:
-        """Прив'язати елементи до замовлення"""
+    async def link_items_to_order(self, order: Order, items: List[OrderItem]) -> None:
+        """Прив'язати елементи до замовлення (order_id проставиться при flush)"""
         for item in items:
-            item.order_id = order_id
-            self.db.add(item)
-        await self.db.flush()
+            item.orders = order
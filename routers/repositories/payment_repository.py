@@ -16,19 +16,17 @@ class PaymentRepository(BaseRepository[Payment]):
         self,
         user_id: int,
         order_id: int,
-        credit_card_id: Optional[int] = None,
+        credit_card: Optional[CreditCard] = None,
         status: PaymentStatus = PaymentStatus.PENDING
     ) -> Payment:
         """Створити новий платіж"""
         payment = Payment(
             user_id=user_id,
             order_id=order_id,
-            credit_card_id=credit_card_id,
+            credit_card=credit_card,
             status=status
         )
         self.db.add(payment)
-        await self.db.flush()
-        await self.db.refresh(payment)
         return payment
 
 
@@ -55,6 +53,4 @@ class CreditCardRepository(BaseRepository[CreditCard]):
             last_4_numbers=last_4_numbers
         )
         self.db.add(card)
-        await self.db.flush()
-        await self.db.refresh(card)
         return card
@@ -1,9 +1,53 @@
-from typing import List, Optional
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterator, Dict, List, Optional, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import or_
-from db.models import Product
-from .base_repository import BaseRepository
+from sqlalchemy.orm import joinedload, noload, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import tuple_, func, cast, case, update, delete, inspect, Row
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from core.config import settings
+from db.enums import ProductSort
+from db.models import Product, Category, OrderItem, ProductStockShard, StockReservation, PRODUCT_SEARCH_CONFIG
+from routers.services import product_search_index, product_cache
+from .base_repository import BaseRepository, _chunks
+
+
+def _columns_snapshot(obj) -> dict:
+    """Значення завантажених колонок (deferred, як search_vector, не потрапляють у знімок)"""
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(type(obj)).column_attrs if not attr.deferred}
+
+
+def _product_snapshot(product: Product) -> dict:
+    category = product.category
+    return {
+        "product": _columns_snapshot(product),
+        "category": _columns_snapshot(category) if category is not None else None
+    }
+
+
+def stock_expression():
+    """Вираз актуального залишку: для гарячого продукту - сума шардів.
+
+    products.stock_quantity гарячого продукту ребалансер оновлює лише періодично.
+    """
+    sharded = (
+        select(func.coalesce(func.sum(ProductStockShard.quantity), 0))
+        .where(ProductStockShard.product_id == Product.id)
+        .scalar_subquery()
+    )
+    return case((Product.is_hot.is_(True), sharded), else_=Product.stock_quantity)
+
+
+def with_live_stock(rows) -> List[Product]:
+    """Рядки (Product, stock) з select(Product, stock_expression()) -> продукти з актуальним залишком"""
+    products = []
+    for product, stock in rows:
+        if product.is_hot:
+            set_committed_value(product, "stock_quantity", stock)
+        products.append(product)
+    return products
 
 
 class ProductRepository(BaseRepository[Product]):
@@ -12,71 +56,497 @@ class ProductRepository(BaseRepository[Product]):
     def __init__(self, db: AsyncSession):
         super().__init__(Product, db)
     
-    async def get_by_id(self, product_id: int) -> Optional[Product]:
-        """Отримати продукт за ID"""
-        result = await self.db.execute(select(Product).where(Product.id == product_id))
-        return result.scalar_one_or_none()
-    
-    async def get_all(self) -> List[Product]:
-        """Отримати всі продукти"""
-        result = await self.db.execute(select(Product))
-        return result.scalars().all()
+    async def get_by_id(self, product_id: int, cached: bool = True) -> Optional[Product]:
+        """Отримати продукт за ID (разом з категорією).
+
+        Читає через product_cache. cached=False - завжди з бази (перед зміною
+        продукту або коли потрібен точний залишок).
+        """
+        products = await self.get_many([product_id], cached=cached)
+        return products[0] if products else None
+
+    async def get_many(self, product_ids: Sequence[int], cached: bool = True) -> List[Product]:
+        """Отримати продукти за ID (разом з категоріями) у порядку product_ids.
+
+        Кешовані продукти прикріплюються до сесії без запиту, решта
+        довантажується одним SELECT і потрапляє в кеш. Відсутні ID пропускаються.
+        """
+        found: Dict[int, Product] = {}
+        missing = []
+        for product_id in dict.fromkeys(product_ids):
+            # Обʼєкт, вже завантажений у цю сесію, не можна перезаписувати знімком
+            in_session = self.db.identity_map.get(self.db.identity_key(Product, product_id)) is not None
+            snapshot = product_cache.get(product_id) if cached and not in_session else None
+            if snapshot is not None:
+                found[product_id] = await self._from_snapshot(snapshot)
+            else:
+                missing.append(product_id)
+
+        if missing:
+            stmt = (
+                select(Product, stock_expression())
+                .options(joinedload(Product.category))
+                .where(Product.id.in_(missing))
+            )
+            if not cached:
+                stmt = stmt.execution_options(populate_existing=True)
+            result = await self.db.execute(stmt)
+            for product in with_live_stock(result.all()):
+                found[product.id] = product
+                # Шлях запису (cached=False) кеш не наповнює: транзакцію ще можуть відкотити
+                if cached:
+                    product_cache.set(product.id, _product_snapshot(product))
+
+        return [found[product_id] for product_id in product_ids if product_id in found]
+
+    async def _from_snapshot(self, snapshot: dict) -> Product:
+        """Прикріплює знімок продукту (з категорією) до сесії без жодного запиту до бази"""
+        product = Product(**snapshot["product"])
+        category = None
+        if snapshot["category"] is not None:
+            category = Category(**snapshot["category"])
+            make_transient_to_detached(category)
+        # Без подій backref: Category.products не повинна вважатись завантаженою
+        set_committed_value(product, "category", category)
+        make_transient_to_detached(product)
+        return await self.db.merge(product, load=False)
     
-    async def search(self, query: str) -> List[Product]:
-        """Пошук продуктів за назвою або описом"""
-        if not query:
+    async def get_page(
+        self,
+        limit: int = 20,
+        after_id: Optional[int] = None,
+        after_price: Optional[Decimal] = None,
+        sort: ProductSort = ProductSort.ID,
+        category_id: Optional[int] = None,
+        min_price: Optional[Decimal] = None,
+        max_price: Optional[Decimal] = None,
+        in_stock: bool = False
+    ) -> List[Product]:
+        """Отримати сторінку продуктів (keyset-пагінація по (id) або (price, id)).
+
+        Повертає до limit + 1 записів: зайвий запис означає, що є наступна сторінка.
+        Категорія не завантажується - роут бере її з category_registry.
+        """
+        stmt = select(Product, stock_expression()).options(noload(Product.category))
+
+        if category_id is not None:
+            stmt = stmt.where(Product.category_id == category_id)
+        if min_price is not None:
+            stmt = stmt.where(Product.price >= min_price)
+        if max_price is not None:
+            stmt = stmt.where(Product.price <= max_price)
+        if in_stock:
+            stmt = stmt.where(stock_expression() > 0)
+
+        if sort == ProductSort.PRICE:
+            if after_id is not None and after_price is not None:
+                stmt = stmt.where(tuple_(Product.price, Product.id) > tuple_(after_price, after_id))
+            stmt = stmt.order_by(Product.price, Product.id)
+        else:
+            if after_id is not None:
+                stmt = stmt.where(Product.id > after_id)
+            stmt = stmt.order_by(Product.id)
+
+        result = await self.db.execute(stmt.limit(limit + 1))
+        return with_live_stock(result.all())
+
+    async def search(self, query: str, limit: int = 20, offset: int = 0) -> List[Product]:
+        """Повнотекстовий пошук продуктів за назвою та описом, відсортований за релевантністю.
+
+        Категорія не завантажується - роут бере її з category_registry.
+        """
+        if not query or not query.strip():
             return []
-        
-        result = await self.db.execute(
-            select(Product).where(
-                or_(
-                    Product.name.contains(query.lower()),
-                    Product.description.contains(query.lower())
-                )
+
+        if self.db.bind.dialect.name == "postgresql":
+            ts_query = func.websearch_to_tsquery(cast(PRODUCT_SEARCH_CONFIG, REGCONFIG), query)
+            result = await self.db.execute(
+                select(Product, stock_expression())
+                .options(noload(Product.category))
+                .where(Product.search_vector.op("@@")(ts_query))
+                .order_by(func.ts_rank_cd(Product.search_vector, ts_query).desc(), Product.id)
+                .offset(offset)
+                .limit(limit)
             )
+            return with_live_stock(result.all())
+
+        # Fallback для інших баз (SQLite у тестах) - in-process інвертований індекс
+        if not product_search_index.is_built:
+            rows = await self.db.execute(select(Product.id, Product.name, Product.description))
+            product_search_index.build(rows.all())
+
+        product_ids = product_search_index.search(query, limit=limit, offset=offset)
+        if not product_ids:
+            return []
+
+        result = await self.db.execute(
+            select(Product, stock_expression())
+            .options(noload(Product.category))
+            .where(Product.id.in_(product_ids))
         )
-        return result.scalars().all()
+        products_map = {p.id: p for p in with_live_stock(result.all())}
+        return [products_map[pid] for pid in product_ids if pid in products_map]
     
+    async def stream_export_rows(
+        self,
+        category_id: Optional[int] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Потоково віддавати каталог пачками рядків (без ORM-обʼєктів та identity map).
+
+        Використовує серверний курсор (yield_per), тож у памʼяті тримається
+        лише одна пачка незалежно від розміру каталогу.
+        """
+        stmt = (
+            select(
+                Product.id,
+                Product.sku,
+                Product.name,
+                Product.description,
+                Product.price,
+                Product.category_id,
+                Category.name.label("category"),
+                stock_expression().label("stock_quantity"),
+                Product.image_url
+            )
+            .outerjoin(Category, Product.category_id == Category.id)
+            .order_by(Product.id)
+            .execution_options(yield_per=batch_size)
+        )
+        if category_id is not None:
+            stmt = stmt.where(Product.category_id == category_id)
+
+        result = await self.db.stream(stmt)
+        async for partition in result.partitions():
+            yield partition
+
     async def create(self, **kwargs) -> Product:
         """Створити новий продукт"""
         product = Product(**kwargs)
+        if product.category_id is not None:
+            # Категорію беремо з identity map (або одним SELECT), щоб відповідь не робила lazy load
+            product.category = await self.db.get(Category, product.category_id)
         self.db.add(product)
-        await self.db.flush()
-        await self.db.refresh(product)
         return product
     
     async def update(self, product_id: int, **kwargs) -> Optional[Product]:
         """Оновити продукт"""
-        product = await self.get_by_id(product_id)
+        product = await self.get_by_id(product_id, cached=False)
         if not product:
             return None
         
         for key, value in kwargs.items():
             setattr(product, key, value)
+        if "category_id" in kwargs:
+            product.category = await self.db.get(Category, product.category_id)
         
         self.db.add(product)
-        await self.db.flush()
-        await self.db.refresh(product)
         return product
     
     async def delete(self, product_id: int) -> bool:
         """Видалити продукт"""
-        product = await self.get_by_id(product_id)
+        product = await self.get_by_id(product_id, cached=False)
         if not product:
             return False
         
         await self.db.delete(product)
-        await self.db.flush()
         return True
     
     async def decrease_stock(self, product_id: int, quantity: int) -> Optional[Product]:
-        """Зменшити кількість товару на складі"""
-        product = await self.get_by_id(product_id)
-        if not product:
+        """Зменшити кількість товару на складі.
+
+        Повертає None, якщо продукту немає або залишку недостатньо.
+        """
+        failed = await self.decrease_stock_bulk({product_id: quantity})
+        if failed:
             return None
-        
-        product.stock_quantity -= quantity
-        self.db.add(product)
-        await self.db.flush()
-        await self.db.refresh(product)
-        return product
+        return await self.get_by_id(product_id, cached=False)
+
+    def _reserved_by_others(self, product_id, cart_id: int, now: datetime):
+        """Підзапит: сума активних holds інших кошиків на продукт"""
+        return (
+            select(func.coalesce(func.sum(StockReservation.quantity), 0))
+            .where(
+                StockReservation.product_id == product_id,
+                StockReservation.cart_id != cart_id,
+                StockReservation.expires_at > now
+            )
+            .scalar_subquery()
+        )
+
+    async def decrease_stock_bulk(
+        self,
+        quantities: Dict[int, int],
+        cart_id: Optional[int] = None,
+        now: Optional[datetime] = None
+    ) -> List[int]:
+        """Списати товари одним умовним UPDATE ... RETURNING.
+
+        quantities - {product_id: кількість}. Якщо передано cart_id, активні holds
+        інших кошиків не можна списати (holds цього кошика конвертуються у списання).
+        Гарячі продукти списуються з шардів (див. _decrease_sharded).
+        Повертає ID продуктів, які не вдалося списати (немає на складі в потрібній
+        кількості або не існують). Якщо список не порожній, решта рядків вже
+        зменшена - транзакцію треба відкотити.
+        """
+        if not quantities:
+            return []
+
+        requested = case(quantities, value=Product.id)
+        available = Product.stock_quantity
+        if cart_id is not None:
+            available = available - self._reserved_by_others(Product.id, cart_id, now)
+
+        result = await self.db.execute(
+            update(Product)
+            .where(Product.id.in_(quantities), Product.is_hot.is_(False), available >= requested)
+            .values(stock_quantity=Product.stock_quantity - requested)
+            .returning(Product.id)
+            .execution_options(synchronize_session="fetch")
+        )
+        updated = set(result.scalars().all())
+        rest = [product_id for product_id in quantities if product_id not in updated]
+        if not rest:
+            return []
+
+        # Не списані рядки: або гарячі продукти, або нестача/відсутність
+        hot = await self.db.execute(
+            select(Product.id).where(Product.id.in_(rest), Product.is_hot.is_(True))
+        )
+        hot_ids = set(hot.scalars().all())
+        failed = []
+        for product_id in rest:
+            if product_id not in hot_ids or not await self._decrease_sharded(
+                product_id, quantities[product_id], cart_id, now
+            ):
+                failed.append(product_id)
+        return failed
+
+    async def _decrease_sharded(
+        self,
+        product_id: int,
+        quantity: int,
+        cart_id: Optional[int] = None,
+        now: Optional[datetime] = None,
+        attempts: int = 3
+    ) -> bool:
+        """Списати з випадкового шарда, у якому вистачає залишку.
+
+        Шард обирається з SKIP LOCKED, тож паралельні покупці розходяться
+        по різних рядках замість черги на одному. Якщо жоден шард окремо
+        не покриває кількість, списуємо з кількох під блокуванням усіх шардів.
+        """
+        if cart_id is not None:
+            total = await self.get_sharded_stock(product_id)
+            reserved = await self.db.scalar(select(self._reserved_by_others(product_id, cart_id, now)))
+            if total - reserved < quantity:
+                return False
+
+        candidate = (
+            select(ProductStockShard.shard_no)
+            .where(ProductStockShard.product_id == product_id, ProductStockShard.quantity >= quantity)
+            .order_by(func.random())
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        for _ in range(attempts):
+            result = await self.db.execute(
+                update(ProductStockShard)
+                .where(
+                    ProductStockShard.product_id == product_id,
+                    ProductStockShard.shard_no == candidate,
+                    ProductStockShard.quantity >= quantity
+                )
+                .values(quantity=ProductStockShard.quantity - quantity)
+                .returning(ProductStockShard.shard_no)
+                .execution_options(synchronize_session=False)
+            )
+            if result.first() is not None:
+                return True
+
+        # Залишок розпорошений по шардах - списуємо з кількох
+        result = await self.db.execute(
+            select(ProductStockShard)
+            .where(ProductStockShard.product_id == product_id)
+            .order_by(ProductStockShard.quantity.desc(), ProductStockShard.shard_no)
+            .with_for_update()
+        )
+        shards = result.scalars().all()
+        if sum(shard.quantity for shard in shards) < quantity:
+            return False
+        remaining = quantity
+        for shard in shards:
+            take = min(shard.quantity, remaining)
+            shard.quantity -= take
+            remaining -= take
+            if not remaining:
+                break
+        return True
+
+    async def get_sharded_stock(self, product_id: int) -> int:
+        """Сума залишку по всіх шардах продукту"""
+        total = await self.db.scalar(
+            select(func.coalesce(func.sum(ProductStockShard.quantity), 0))
+            .where(ProductStockShard.product_id == product_id)
+        )
+        return int(total)
+
+    async def get_shard_count(self, product_id: int) -> int:
+        """Кількість шардів гарячого продукту"""
+        return await self.db.scalar(
+            select(func.count()).select_from(ProductStockShard).where(ProductStockShard.product_id == product_id)
+        )
+
+    async def get_stock(self, product: Product) -> int:
+        """Актуальний залишок: для гарячого продукту - сума шардів"""
+        if product.is_hot:
+            return await self.get_sharded_stock(product.id)
+        return product.stock_quantity
+
+    async def set_sharded_stock(self, product: Product, total: int, shards: int) -> None:
+        """Розбити залишок продукту на shards рівних лічильників і позначити його гарячим"""
+        await self._split_shards(product.id, total, shards)
+        product.is_hot = True
+        product.stock_quantity = total
+
+    async def _split_shards(self, product_id: int, total: int, shards: int) -> None:
+        await self.db.execute(
+            delete(ProductStockShard).where(ProductStockShard.product_id == product_id)
+        )
+        base, extra = divmod(total, shards)
+        self.db.add_all([
+            ProductStockShard(product_id=product_id, shard_no=i, quantity=base + (1 if i < extra else 0))
+            for i in range(shards)
+        ])
+
+    async def upsert_by_sku(self, rows: List[dict]) -> None:
+        """Імпорт пачки продуктів: INSERT ... ON CONFLICT (sku) DO UPDATE.
+
+        У гарячого продукту stock_quantity - лише синхронізована сума шардів,
+        тож upsert його не чіпає, а імпортований залишок розкладається по
+        шардах (як у PUT /saller/products/{id}). Інакше ребалансер повернув
+        би стару суму шардів.
+        """
+        if not rows:
+            return
+
+        hot: Dict[int, int] = {}
+        stock_by_sku = {row["sku"]: row.get("stock_quantity") for row in rows}
+        for chunk in _chunks(rows, self._chunk_size(rows, None)):
+            stmt = self._dialect_insert().values(list(chunk))
+            set_ = {key: stmt.excluded[key] for key in chunk[0] if key != "sku"}
+            if "stock_quantity" in set_:
+                set_["stock_quantity"] = case(
+                    (Product.is_hot.is_(True), Product.stock_quantity),
+                    else_=stmt.excluded.stock_quantity
+                )
+            stmt = stmt.on_conflict_do_update(index_elements=[Product.sku], set_=set_)
+            result = await self.db.execute(stmt.returning(Product.id, Product.sku, Product.is_hot))
+            for product_id, sku, is_hot in result.all():
+                if is_hot and stock_by_sku.get(sku) is not None:
+                    hot[product_id] = stock_by_sku[sku]
+
+        if not hot:
+            return
+        counts = dict((await self.db.execute(
+            select(ProductStockShard.product_id, func.count())
+            .where(ProductStockShard.product_id.in_(hot))
+            .group_by(ProductStockShard.product_id)
+        )).all())
+        for product_id, total in hot.items():
+            await self._split_shards(product_id, total, counts.get(product_id) or settings.STOCK_SHARD_COUNT)
+            await self.db.execute(
+                update(Product)
+                .where(Product.id == product_id)
+                .values(stock_quantity=total)
+                .execution_options(synchronize_session=False)
+            )
+
+    async def disable_sharding(self, product: Product) -> None:
+        """Зібрати шарди назад у stock_quantity і зняти позначку гарячого продукту"""
+        product.stock_quantity = await self.get_sharded_stock(product.id)
+        await self.db.execute(
+            delete(ProductStockShard).where(ProductStockShard.product_id == product.id)
+        )
+        product.is_hot = False
+
+    async def get_hot_product_ids(self) -> List[int]:
+        """ID усіх гарячих продуктів"""
+        result = await self.db.execute(select(Product.id).where(Product.is_hot.is_(True)))
+        return list(result.scalars().all())
+
+    async def rebalance_shards(self, product_id: int) -> int:
+        """Вирівняти залишок між шардами та синхронізувати stock_quantity.
+
+        Повертає поточну суму залишку.
+        """
+        result = await self.db.execute(
+            select(ProductStockShard)
+            .where(ProductStockShard.product_id == product_id)
+            .order_by(ProductStockShard.shard_no)
+            .with_for_update()
+        )
+        shards = result.scalars().all()
+        total = sum(shard.quantity for shard in shards)
+        if shards:
+            base, extra = divmod(total, len(shards))
+            for i, shard in enumerate(shards):
+                shard.quantity = base + (1 if i < extra else 0)
+        await self.db.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(stock_quantity=total)
+            .execution_options(synchronize_session=False)
+        )
+        return total
+
+    async def get_stock_levels(self, product_ids: List[int]) -> Dict[int, Row]:
+        """Отримати назву та залишок для кількох продуктів одним запитом"""
+        result = await self.db.execute(
+            select(Product.id, Product.name, stock_expression().label("stock_quantity"))
+            .where(Product.id.in_(product_ids))
+        )
+        return {row.id: row for row in result.all()}
+
+    async def lock_for_hold(self, product_ids: Sequence[int]) -> None:
+        """Заблокувати рядки продуктів до кінця транзакції (FOR NO KEY UPDATE, у порядку id).
+
+        Серіалізує перевірку "залишок - holds" і запис hold між кошиками:
+        паралельний кошик чекає на commit і наступним запитом бачить уже
+        створений hold. NO KEY - не блокує вставки рядків із FK на продукт.
+        """
+        await self.db.execute(
+            select(Product.id)
+            .where(Product.id.in_(product_ids))
+            .order_by(Product.id)
+            .with_for_update(key_share=True)
+        )
+
+    async def get_cart_availability(self, cart_id: int, product_ids: List[int], now: datetime) -> Dict[int, Row]:
+        """Все для перевірки додавання в кошик одним запитом.
+
+        Для кожного продукту: назва, ціна, залишок, holds інших кошиків
+        (reserved) та кількість, яка вже лежить у відкритому рядку кошика (in_cart).
+        """
+        in_cart = (
+            select(func.coalesce(func.sum(OrderItem.quantity), 0))
+            .where(
+                OrderItem.cart_id == cart_id,
+                OrderItem.product_id == Product.id,
+                OrderItem.order_id.is_(None)
+            )
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            select(
+                Product.id,
+                Product.name,
+                Product.price,
+                stock_expression().label("stock_quantity"),
+                self._reserved_by_others(Product.id, cart_id, now).label("reserved"),
+                in_cart.label("in_cart")
+            )
+            .where(Product.id.in_(product_ids))
+        )
+        return {row.id: row for row in result.all()}
@@ -0,0 +1,62 @@
+from datetime import datetime
+from typing import Dict
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.models import StockReservation
+from .base_repository import BaseRepository
+
+
+class ReservationRepository(BaseRepository[StockReservation]):
+    """Repository для тимчасових резервувань товарів (holds) кошиками"""
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(StockReservation, db)
+
+    async def hold(self, cart_id: int, product_id: int, quantity: int, expires_at: datetime) -> None:
+        """Створити або оновити hold кошика на продукт (одним upsert)"""
+        await self.hold_many(cart_id, {product_id: quantity}, expires_at)
+
+    async def hold_many(self, cart_id: int, quantities: Dict[int, int], expires_at: datetime) -> None:
+        """Створити або оновити holds кошика для кількох продуктів одним upsert"""
+        if not quantities:
+            return
+
+        stmt = self._dialect_insert().values([
+            {
+                "cart_id": cart_id,
+                "product_id": product_id,
+                "quantity": quantity,
+                "expires_at": expires_at
+            }
+            for product_id, quantity in quantities.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StockReservation.cart_id, StockReservation.product_id],
+            set_={
+                "quantity": stmt.excluded.quantity,
+                "expires_at": stmt.excluded.expires_at
+            }
+        )
+        await self.db.execute(stmt)
+
+    async def release(self, cart_id: int, product_id: int) -> None:
+        """Зняти hold кошика з продукту"""
+        await self.db.execute(
+            delete(StockReservation).where(
+                StockReservation.cart_id == cart_id,
+                StockReservation.product_id == product_id
+            )
+        )
+
+    async def release_cart(self, cart_id: int) -> None:
+        """Зняти всі holds кошика (замовлення оформлене або кошик очищено)"""
+        await self.db.execute(
+            delete(StockReservation).where(StockReservation.cart_id == cart_id)
+        )
+
+    async def purge_expired(self, now: datetime) -> int:
+        """Видалити протухлі holds"""
+        result = await self.db.execute(
+            delete(StockReservation).where(StockReservation.expires_at <= now)
+        )
+        return result.rowcount
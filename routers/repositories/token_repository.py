@@ -1,4 +1,6 @@
-from typing import Optional
+from datetime import datetime
+from typing import List
+from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from db.models import TokenBlackList
@@ -11,17 +13,29 @@ class TokenRepository(BaseRepository[TokenBlackList]):
     def __init__(self, db: AsyncSession):
         super().__init__(TokenBlackList, db)
     
-    async def is_blacklisted(self, token: str) -> bool:
-        """Перевірити чи токен в чорному списку"""
+    async def is_blacklisted(self, token_hash: str) -> bool:
+        """Перевірити чи токен (його SHA-256) в чорному списку"""
         result = await self.db.execute(
-            select(TokenBlackList).where(TokenBlackList.token == token)
+            select(TokenBlackList.id).where(TokenBlackList.token_hash == token_hash)
         )
         return result.scalar_one_or_none() is not None
     
-    async def add_to_blacklist(self, token: str) -> TokenBlackList:
+    async def add_to_blacklist(self, token_hash: str, expires_at: datetime) -> TokenBlackList:
         """Додати токен до чорного списку"""
-        blacklisted_token = TokenBlackList(token=token)
+        blacklisted_token = TokenBlackList(token_hash=token_hash, expires_at=expires_at)
         self.db.add(blacklisted_token)
-        await self.db.flush()
-        await self.db.refresh(blacklisted_token)
         return blacklisted_token
+
+    async def get_active_hashes(self, now: datetime) -> List[str]:
+        """Отримати хеші всіх ще не протухлих токенів"""
+        result = await self.db.execute(
+            select(TokenBlackList.token_hash).where(TokenBlackList.expires_at >= now)
+        )
+        return result.scalars().all()
+
+    async def purge_expired(self, now: datetime) -> int:
+        """Видалити токени, термін дії яких вже минув"""
+        result = await self.db.execute(
+            delete(TokenBlackList).where(TokenBlackList.expires_at < now)
+        )
+        return result.rowcount
@@ -45,8 +45,6 @@ class UserRepository(BaseRepository[User]):
         """Створити нового користувача"""
         user = User(**kwargs)
         self.db.add(user)
-        await self.db.flush()
-        await self.db.refresh(user)
         return user
     
     async def update(self, user: User, **kwargs) -> User:
@@ -55,11 +53,8 @@ class UserRepository(BaseRepository[User]):
             setattr(user, key, value)
         
         self.db.add(user)
-        await self.db.flush()
-        await self.db.refresh(user)
         return user
     
     async def delete(self, user: User) -> None:
         """Видалити користувача"""
         await self.db.delete(user)
-        await self.db.flush()
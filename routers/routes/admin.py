@@ -2,6 +2,14 @@ from fastapi import HTTPException, APIRouter, Depends, status
 from db.shemas import CategoryBase, CategoryResponse
 from routers.repositories.dependencies import get_category_repository
 from routers.repositories import CategoryRepository
+from db.unit_of_work import UnitOfWork, get_unit_of_work
+from routers.services import (
+    on_categories_changed,
+    invalidation_bus,
+    CacheEntity,
+    category_registry,
+    load_category_registry
+)
 
 router = APIRouter()
 
@@ -9,24 +17,25 @@ router = APIRouter()
 @router.post("/categories", response_model=CategoryResponse)
 async def add_category(
     category: CategoryBase,
-    repo: CategoryRepository = Depends(get_category_repository)
+    repo: CategoryRepository = Depends(get_category_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Додати нову категорію"""
     if category is None:
         raise HTTPException(status_code=404, detail="Please enter a valid category dane")
 
-    # Перевірка на дублікати (опціонально)
-    all_categories = await repo.get_all()
-    category_dict = category.model_dump()
-    
-    # Перевіряємо чи категорія з такою назвою вже існує
-    for cat in all_categories:
-        if cat.name == category_dict.get('name'):
-            raise HTTPException(status_code=400, detail="Category with this name already exists")
+    if not category_registry.is_loaded:
+        await load_category_registry(repo.db)
+
+    # Перевіряємо чи категорія з такою назвою вже існує (O(1) по реєстру)
+    if category_registry.find_by_name(category.name) is not None:
+        raise HTTPException(status_code=400, detail="Category with this name already exists")
 
     db_category = await repo.create(**category.model_dump())
-    await repo.db.commit()
-    await repo.db.refresh(db_category)
+    await uow.flush()
+    await invalidation_bus.publish(uow.session, CacheEntity.CATEGORY, [db_category.id])
+    await uow.commit()
+    category_registry.put(db_category.id, db_category.name)
     return db_category
 
 
@@ -34,7 +43,8 @@ async def add_category(
 async def update_category(
     category_id: int,
     category: CategoryBase,
-    repo: CategoryRepository = Depends(get_category_repository)
+    repo: CategoryRepository = Depends(get_category_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Оновити категорію"""
     db_category = await repo.get_by_id(category_id)
@@ -51,8 +61,10 @@ async def update_category(
         category_id,
         **category.model_dump(exclude_unset=True)
     )
-    await repo.db.commit()
-    await repo.db.refresh(updated_category)
+    await invalidation_bus.publish(uow.session, CacheEntity.CATEGORY, [category_id])
+    await uow.commit()
+    category_registry.put(updated_category.id, updated_category.name)
+    on_categories_changed()
 
     return updated_category
 
@@ -60,7 +72,8 @@ async def update_category(
 @router.delete("/categories/{id}", response_model=CategoryResponse)
 async def delete_category(
     id: int,
-    repo: CategoryRepository = Depends(get_category_repository)
+    repo: CategoryRepository = Depends(get_category_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Видалити категорію"""
     if not id:
@@ -80,5 +93,8 @@ async def delete_category(
             detail="Category not found"
         )
     
-    await repo.db.commit()
+    await invalidation_bus.publish(uow.session, CacheEntity.CATEGORY, [id])
+    await uow.commit()
+    category_registry.remove(id)
+    on_categories_changed()
     return db_category
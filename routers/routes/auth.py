@@ -1,33 +1,41 @@
 from datetime import datetime, timedelta, timezone
+from typing import List, Optional
 from fastapi import Depends, HTTPException, status, APIRouter
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import jwt, JWTError
-from passlib.context import CryptContext
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
-from db.database import get_async_db
-from db.models import User, Cart
+from db.unit_of_work import UnitOfWork, get_unit_of_work
+from db.models import User
 from db.shemas import UserCreate, UserResponse, UserForgotPassword
 from core.config import settings
+from core.cache import TTLCache
+from core.security import hash_password, verify_and_update_password, token_digest
 from routers.repositories.dependencies import (
     get_user_repository,
     get_token_repository,
     get_cart_repository
 )
 from routers.repositories import UserRepository, TokenRepository, CartRepository
+from routers.services import (
+    token_blacklist_filter,
+    refresh_token_blacklist,
+    invalidation_bus,
+    CacheEntity
+)
 
 router = APIRouter(tags=["Auth"])
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+# Кеш автентифікованих токенів: digest токена -> (claims, знімок колонок User)
+identity_cache = TTLCache(
+    "identity",
+    maxsize=settings.AUTH_CACHE_MAX_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
 
 
 def create_token(data: dict, expires_delta: timedelta, token_type: str) -> str:
@@ -37,6 +45,51 @@ def create_token(data: dict, expires_delta: timedelta, token_type: str) -> str:
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
+def invalidate_token(token: str) -> None:
+    """Прибрати токен з кешу ідентичностей (logout)"""
+    identity_cache.pop(token_digest(token))
+
+
+def invalidate_user(user_id: int) -> None:
+    """Прибрати всі кешовані токени користувача (зміна пароля, профілю, видалення)"""
+    identity_cache.evict_if(lambda _, entry: entry[1]["id"] == user_id)
+
+
+def _on_users_invalidated(user_ids: Optional[List[int]]) -> None:
+    """Користувачів змінив інший воркер"""
+    if user_ids is None:
+        identity_cache.clear()
+        return
+    user_ids = set(user_ids)
+    identity_cache.evict_if(lambda _, entry: entry[1]["id"] in user_ids)
+
+
+async def _on_tokens_invalidated(digests: Optional[List[str]]) -> None:
+    """Інший воркер додав токени до чорного списку (logout)"""
+    if digests is None:
+        identity_cache.clear()
+        await refresh_token_blacklist()
+        return
+    for digest in digests:
+        token_blacklist_filter.add(digest)
+        identity_cache.pop(digest)
+
+
+invalidation_bus.register(CacheEntity.USER, _on_users_invalidated)
+invalidation_bus.register(CacheEntity.TOKEN, _on_tokens_invalidated)
+
+
+def _user_snapshot(user: User) -> dict:
+    return {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+
+
+async def _user_from_snapshot(db: AsyncSession, snapshot: dict) -> User:
+    """Прикріплює знімок користувача до сесії без жодного запиту до бази"""
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     token_repo: TokenRepository = Depends(get_token_repository),
@@ -48,8 +101,14 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    # Перевірка чи токен в чорному списку
-    if await token_repo.is_blacklisted(token):
+    # Гарячий шлях: токен вже перевірений цим воркером - без запитів до бази
+    digest = token_digest(token)
+    cached = identity_cache.get(digest)
+    if cached is not None:
+        return await _user_from_snapshot(user_repo.db, cached[1])
+
+    # Перевірка чи токен в чорному списку: до бази йдемо лише якщо Bloom-фільтр не виключає
+    if token_blacklist_filter.might_contain(digest) and await token_repo.is_blacklisted(digest):
         raise credentials_exception
 
     try:
@@ -67,6 +126,10 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
+    # Запис не повинен жити довше за сам токен
+    ttl = min(settings.AUTH_CACHE_TTL_SECONDS, payload["exp"] - datetime.now(timezone.utc).timestamp())
+    identity_cache.set(digest, (payload, _user_snapshot(user)), ttl=ttl)
+
     return user
 
 
@@ -74,7 +137,8 @@ async def get_current_user(
 async def register(
     user_data: UserCreate,
     user_repo: UserRepository = Depends(get_user_repository),
-    cart_repo: CartRepository = Depends(get_cart_repository)
+    cart_repo: CartRepository = Depends(get_cart_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Реєстрація нового користувача"""
     # Перевірка на існуючий email
@@ -86,7 +150,7 @@ async def register(
         raise HTTPException(status_code=400, detail="Login already taken")
 
     # Створення користувача
-    hashed = hash_password(user_data.password)
+    hashed = await hash_password(user_data.password)
     new_user = await user_repo.create(
         email=user_data.email,
         password=hashed,
@@ -95,12 +159,10 @@ async def register(
         last_name=user_data.last_name,
         phone_number=user_data.phone_number
     )
-    await user_repo.db.flush()
 
-    # Створення кошика для користувача
-    await cart_repo.create(new_user.id)
-    await user_repo.db.commit()
-    await user_repo.db.refresh(new_user)
+    # Створення кошика для користувача (обидва INSERT в одному flush)
+    await cart_repo.create(new_user)
+    await uow.commit()
 
     return new_user
 
@@ -108,16 +170,27 @@ async def register(
 @router.post('/login')
 async def login(
     user_data: OAuth2PasswordRequestForm = Depends(),
-    user_repo: UserRepository = Depends(get_user_repository)
+    user_repo: UserRepository = Depends(get_user_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Вхід користувача"""
     user = await user_repo.get_by_login(user_data.username)
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Incorrect login or password"
+    )
 
-    if not user or not verify_password(user_data.password, user.password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect login or password"
-        )
+    if not user:
+        raise credentials_exception
+
+    is_valid, new_hash = await verify_and_update_password(user_data.password, user.password)
+    if not is_valid:
+        raise credentials_exception
+
+    # Параметри argon2 змінились - зберігаємо хеш з новими параметрами
+    if new_hash:
+        user.password = new_hash
+        await uow.commit()
 
     access_token = create_token(
         data={"sub": user.login},
@@ -131,8 +204,6 @@ async def login(
         token_type="refresh"
     )
 
-    await user_repo.db.commit()
-
     return {
         "access_token": access_token,
         "refresh_token": refresh_token,
@@ -144,8 +215,8 @@ async def login(
 async def logout(
     token: str = Depends(oauth2_scheme),
     current_user: User = Depends(get_current_user),
-    user_repo: UserRepository = Depends(get_user_repository),
-    token_repo: TokenRepository = Depends(get_token_repository)
+    token_repo: TokenRepository = Depends(get_token_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Вихід користувача"""
     credentials_exception = HTTPException(
@@ -155,16 +226,21 @@ async def logout(
     )
 
     try:
-        await user_repo.db.refresh(current_user)
         current_user.last_logout_at = datetime.now(timezone.utc)
 
         # Перевірка чи токен вже в чорному списку
-        if await token_repo.is_blacklisted(token):
+        digest = token_digest(token)
+        if await token_repo.is_blacklisted(digest):
             raise credentials_exception
 
-        # Додаємо токен до чорного списку
-        await token_repo.add_to_blacklist(token)
-        await token_repo.db.commit()
+        # Додаємо токен до чорного списку до закінчення його терміну дії
+        exp = jwt.get_unverified_claims(token)["exp"]
+        expires_at = datetime.fromtimestamp(exp, timezone.utc).replace(tzinfo=None)
+        await token_repo.add_to_blacklist(digest, expires_at)
+        await invalidation_bus.publish(uow.session, CacheEntity.TOKEN, [digest])
+        await uow.commit()
+        token_blacklist_filter.add(digest)
+        invalidate_token(token)
 
         return "Logout successfully"
 
@@ -220,12 +296,14 @@ async def refresh_token_endpoint(
 async def change_password(
     new_password: str,
     current_user: User = Depends(get_current_user),
-    user_repo: UserRepository = Depends(get_user_repository)
+    user_repo: UserRepository = Depends(get_user_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Змінити пароль"""
-    current_user.password = hash_password(new_password)
-    await user_repo.update(current_user, password=current_user.password)
-    await user_repo.db.commit()
+    await user_repo.update(current_user, password=await hash_password(new_password))
+    await invalidation_bus.publish(uow.session, CacheEntity.USER, [current_user.id])
+    await uow.commit()
+    invalidate_user(current_user.id)
     return {"message": "Password updated successfully"}
 
 
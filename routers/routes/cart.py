@@ -1,25 +1,32 @@
+from datetime import timedelta
+from typing import List
 from fastapi import HTTPException, APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from routers.calculation import check_the_cart, calculate_total_price
-from db.database import get_async_db
+from core.config import settings
+from core.query_counter import query_budget
+from routers.calculation import check_the_cart
 from db.models import User, Cart
+from db.unit_of_work import UnitOfWork, get_unit_of_work
 from db.shemas import OrderItemResponse, OrderItemCreate, CartResponse
 from routers.routes.auth import get_current_user
 from routers.repositories.dependencies import (
     get_cart_repository,
     get_product_repository,
-    get_order_item_repository
+    get_order_item_repository,
+    get_reservation_repository
 )
 from routers.repositories import (
     CartRepository,
     ProductRepository,
-    OrderItemRepository
+    OrderItemRepository,
+    ReservationRepository
 )
+from routers.services import utc_now
 
 router = APIRouter()
 
 
 @router.get('/', response_model=CartResponse)
+@query_budget(5)
 async def get_cart(
     current_user: User = Depends(get_current_user),
     cart_repo: CartRepository = Depends(get_cart_repository)
@@ -32,12 +39,15 @@ async def get_cart(
 
 
 @router.post('/item', response_model=OrderItemResponse)
+@query_budget(10)
 async def add_to_cart(
     order: OrderItemCreate,
     cart: Cart = Depends(check_the_cart),
     product_repo: ProductRepository = Depends(get_product_repository),
     order_item_repo: OrderItemRepository = Depends(get_order_item_repository),
-    cart_repo: CartRepository = Depends(get_cart_repository)
+    cart_repo: CartRepository = Depends(get_cart_repository),
+    reservation_repo: ReservationRepository = Depends(get_reservation_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Додати товар до кошика"""
     product = await product_repo.get_by_id(order.product_id)
@@ -46,53 +56,127 @@ async def add_to_cart(
 
     # Перевіряємо чи вже є такий товар в кошику
     db_order = await order_item_repo.get_by_cart_and_product(cart.id, product.id)
+    new_quantity = order.quantity + (db_order.quantity if db_order else 0)
+
+    # Перевіряємо чи достатньо товару на складі з урахуванням holds інших кошиків.
+    # Перевірка і hold - під блокуванням рядка продукту, інакше два кошики
+    # одночасно пройдуть перевірку і зарезервують більше, ніж є
+    now = utc_now()
+    await product_repo.lock_for_hold([product.id])
+    availability = (await product_repo.get_cart_availability(cart.id, [product.id], now))[product.id]
+    if availability.stock_quantity - availability.reserved < new_quantity:
+        raise HTTPException(status_code=400, detail='Quantity is already taken.')
+
+    # Резервуємо товар за кошиком на STOCK_HOLD_TTL_SECONDS
+    await reservation_repo.hold(
+        cart.id,
+        product.id,
+        new_quantity,
+        now + timedelta(seconds=settings.STOCK_HOLD_TTL_SECONDS)
+    )
 
     if db_order:
-        # Перевіряємо чи достатньо товару на складі
-        if product.stock_quantity < db_order.quantity + order.quantity:
-            raise HTTPException(status_code=400, detail='Quantity is already taken.')
-        
-        # Оновлюємо кількість
+        # Оновлюємо кількість і загальну ціну кошика на різницю
         await order_item_repo.add_quantity(db_order, order.quantity)
-        await order_item_repo.db.commit()
-        await order_item_repo.db.refresh(db_order)
-
-        # Оновлюємо загальну ціну кошика
-        cart.total_price = await calculate_total_price(order_item_repo.db, cart)
-        await cart_repo.update_total_price(cart, cart.total_price)
-        await cart_repo.db.commit()
+        await cart_repo.add_to_total(cart, db_order.price_at_purchase * order.quantity)
+        await uow.commit()
         return db_order
 
     # Створюємо новий елемент кошика
     new_order_item = await order_item_repo.create(
         cart_id=cart.id,
-        product_id=product.id,
+        product=product,
         quantity=order.quantity,
-        price_at_purchase=float(product.price)
+        price_at_purchase=product.price
     )
-    await order_item_repo.db.commit()
-    await order_item_repo.db.refresh(new_order_item)
-
-    # Оновлюємо загальну ціну кошика
-    cart.total_price = await calculate_total_price(order_item_repo.db, cart)
-    await cart_repo.update_total_price(cart, cart.total_price)
-    await cart_repo.db.commit()
+    await cart_repo.add_to_total(cart, product.price * order.quantity)
+    await uow.commit()
 
     return new_order_item
 
 
+@router.post('/items', response_model=CartResponse)
+@query_budget(10)
+async def add_items_to_cart(
+    items: List[OrderItemCreate],
+    cart: Cart = Depends(check_the_cart),
+    product_repo: ProductRepository = Depends(get_product_repository),
+    order_item_repo: OrderItemRepository = Depends(get_order_item_repository),
+    cart_repo: CartRepository = Depends(get_cart_repository),
+    reservation_repo: ReservationRepository = Depends(get_reservation_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
+):
+    """Додати кілька товарів до кошика одним запитом.
+
+    Продукти й залишки перевіряються одним запитом, рядки кошика пишуться
+    одним upsert, holds - одним upsert, сума кошика змінюється один раз.
+    Або додаються всі товари, або жоден.
+    """
+    # Повтори одного продукту в запиті сумуються
+    quantities = {}
+    for item in items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    if not quantities:
+        raise HTTPException(status_code=400, detail='No items to add.')
+    if len(quantities) > settings.CART_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f'Too many products in one request (max {settings.CART_BATCH_MAX_ITEMS}).'
+        )
+
+    now = utc_now()
+    # Як і в add_to_cart: перевірка залишку і holds - під блокуванням рядків продуктів
+    await product_repo.lock_for_hold(list(quantities))
+    availability = await product_repo.get_cart_availability(cart.id, list(quantities), now)
+    missing = [product_id for product_id in quantities if product_id not in availability]
+    if missing:
+        raise HTTPException(status_code=404, detail=f'No products found: {missing}.')
+
+    new_quantities = {}
+    shortages = []
+    for product_id, quantity in quantities.items():
+        row = availability[product_id]
+        new_quantities[product_id] = row.in_cart + quantity
+        if row.stock_quantity - row.reserved < new_quantities[product_id]:
+            shortages.append(f"'{row.name}' (requested {new_quantities[product_id]}, "
+                             f"available {max(row.stock_quantity - row.reserved, 0)})")
+    if shortages:
+        raise HTTPException(status_code=400, detail=f"Quantity is already taken for: {', '.join(shortages)}.")
+
+    lines = await order_item_repo.upsert_cart_lines(
+        cart.id,
+        {product_id: (quantity, availability[product_id].price) for product_id, quantity in quantities.items()}
+    )
+    await reservation_repo.hold_many(
+        cart.id,
+        new_quantities,
+        now + timedelta(seconds=settings.STOCK_HOLD_TTL_SECONDS)
+    )
+    # Існуючі рядки зберігають свою price_at_purchase - сума рахується по ній
+    await cart_repo.add_to_total(
+        cart,
+        sum(line.price_at_purchase * quantities[line.product_id] for line in lines)
+    )
+    await uow.commit()
+
+    return await cart_repo.get_by_user_id(cart.user_id)
+
+
 @router.put("/item/{item_id}", response_model=CartResponse)
+@query_budget(11)
 async def change_order_quantity(
     item_id: int,
     quantity: int,
     cart: Cart = Depends(check_the_cart),
     order_item_repo: OrderItemRepository = Depends(get_order_item_repository),
     product_repo: ProductRepository = Depends(get_product_repository),
-    cart_repo: CartRepository = Depends(get_cart_repository)
+    cart_repo: CartRepository = Depends(get_cart_repository),
+    reservation_repo: ReservationRepository = Depends(get_reservation_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Змінити кількість товару в кошику"""
     cart_item = await order_item_repo.get_by_id(item_id)
-    if not cart_item or cart_item.cart_id != cart.id:
+    if not cart_item or cart_item.cart_id != cart.id or cart_item.order_id is not None:
         raise HTTPException(status_code=404, detail='OrderItem not found.')
 
     # Перевіряємо чи достатньо товару для нової кількості
@@ -101,48 +185,61 @@ async def change_order_quantity(
         raise HTTPException(status_code=404, detail='Product not found.')
     
     new_quantity = cart_item.quantity + quantity
-    if product.stock_quantity < new_quantity:
+    if new_quantity < 1:
+        # Нуль чи відʼємний hold зменшив би резерв інших кошиків; для видалення є DELETE /item/{id}
+        raise HTTPException(status_code=400, detail='Quantity must be at least 1. Use DELETE to remove the item.')
+    now = utc_now()
+    await product_repo.lock_for_hold([product.id])
+    availability = (await product_repo.get_cart_availability(cart.id, [product.id], now))[product.id]
+    if availability.stock_quantity - availability.reserved < new_quantity:
         raise HTTPException(status_code=400, detail='Quantity is already taken.')
 
-    # Оновлюємо кількість
-    await order_item_repo.add_quantity(cart_item, quantity)
-    await order_item_repo.db.commit()
-    await order_item_repo.db.refresh(cart_item)
+    await reservation_repo.hold(
+        cart.id,
+        product.id,
+        new_quantity,
+        now + timedelta(seconds=settings.STOCK_HOLD_TTL_SECONDS)
+    )
 
-    # Оновлюємо загальну ціну кошика
-    cart.total_price = await calculate_total_price(order_item_repo.db, cart)
-    await cart_repo.update_total_price(cart, cart.total_price)
-    await cart_repo.db.commit()
-    await cart_repo.db.refresh(cart)
+    # Оновлюємо кількість і загальну ціну кошика на різницю
+    await order_item_repo.add_quantity(cart_item, quantity)
+    await cart_repo.add_to_total(cart, cart_item.price_at_purchase * quantity)
+    await uow.commit()
 
-    return cart
+    return await cart_repo.get_by_user_id(cart.user_id)
 
 
 @router.delete("/item/{item_id}")
+@query_budget(8)
 async def delete_item_from_cart(
     item_id: int,
     cart: Cart = Depends(check_the_cart),
     order_item_repo: OrderItemRepository = Depends(get_order_item_repository),
-    cart_repo: CartRepository = Depends(get_cart_repository)
+    cart_repo: CartRepository = Depends(get_cart_repository),
+    reservation_repo: ReservationRepository = Depends(get_reservation_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Видалити товар з кошика"""
     cart_item = await order_item_repo.get_by_id(item_id)
-    if not cart_item:
+    if not cart_item or cart_item.cart_id != cart.id or cart_item.order_id is not None:
         raise HTTPException(status_code=404, detail='OrderItem not found.')
     
     # Оновлюємо загальну ціну кошика
-    cart.total_price -= abs(cart_item.price_at_purchase * cart_item.quantity)
+    await cart_repo.add_to_total(cart, -(cart_item.price_at_purchase * cart_item.quantity))
+    await reservation_repo.release(cart.id, cart_item.product_id)
     await order_item_repo.delete(cart_item)
-    await order_item_repo.db.commit()
+    await uow.commit()
     return f"Item {item_id} was successfully deleted."
 
 
 @router.delete("/")
+@query_budget(6)
 async def clear_cart(
     cart: Cart = Depends(check_the_cart),
-    cart_repo: CartRepository = Depends(get_cart_repository)
+    cart_repo: CartRepository = Depends(get_cart_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
-    """Очистити кошик"""
+    """Очистити кошик (разом із holds)"""
     await cart_repo.clear_cart(cart)
-    await cart_repo.db.commit()
+    await uow.commit()
     return "Cart was successfully cleared."
@@ -0,0 +1,28 @@
+from typing import List
+from fastapi import HTTPException, APIRouter, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.database import get_async_db
+from db.shemas import CategoryResponse
+from routers.services import category_registry, load_category_registry
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[CategoryResponse])
+async def categories(db: AsyncSession = Depends(get_async_db)):
+    """Отримати всі категорії (з in-memory реєстру)"""
+    if not category_registry.is_loaded:
+        # Реєстр завантажується в lifespan; сюди потрапляємо лише якщо його не запускали
+        await load_category_registry(db)
+    return category_registry.all()
+
+
+@router.get("/{category_id}", response_model=CategoryResponse)
+async def one_category(category_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Отримати категорію за ID (з in-memory реєстру)"""
+    if not category_registry.is_loaded:
+        await load_category_registry(db)
+    category = category_registry.get(category_id)
+    if category is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
+    return category
@@ -1,35 +1,48 @@
 from fastapi import HTTPException, APIRouter, Depends
+from core.query_counter import QueryBudgetExceeded, query_budget
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from routers.calculation import order_status, check_the_cart
 from db.database import get_async_db
 from db.enums import OrderStatus
-from db.models import Cart, Product
+from db.models import Cart
+from db.unit_of_work import UnitOfWork, get_unit_of_work
 from db.shemas import OrderResponse, OrderCreate
 from routers.repositories.dependencies import (
     get_order_repository,
     get_address_repository,
     get_product_repository,
-    get_order_item_repository
+    get_order_item_repository,
+    get_reservation_repository,
+    get_cart_repository
 )
 from routers.repositories import (
     OrderRepository,
     AddressRepository,
     ProductRepository,
-    OrderItemRepository
+    OrderItemRepository,
+    ReservationRepository,
+    CartRepository
 )
+from routers.services import utc_now, on_stock_changed, invalidation_bus, CacheEntity
 
 router = APIRouter()
 
 
+# Найдорожчий шлях: нова адреса і гарячий продукт, для якого не вистачило
+# жодного окремого шарда (3 спроби + списання з кількох), плюс NOTIFY (Postgres)
+# і перевірка токена в базі при хибно-позитивній відповіді Bloom-фільтра
 @router.post('/', response_model=OrderResponse)
+@query_budget(21)
 async def create_order(
     address: OrderCreate,
     cart: Cart = Depends(check_the_cart),
     order_repo: OrderRepository = Depends(get_order_repository),
     address_repo: AddressRepository = Depends(get_address_repository),
     product_repo: ProductRepository = Depends(get_product_repository),
-    order_item_repo: OrderItemRepository = Depends(get_order_item_repository)
+    order_item_repo: OrderItemRepository = Depends(get_order_item_repository),
+    reservation_repo: ReservationRepository = Depends(get_reservation_repository),
+    cart_repo: CartRepository = Depends(get_cart_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Створити нове замовлення"""
     # Отримуємо елементи кошика
@@ -37,71 +50,74 @@ async def create_order(
     if not cart_items:
         raise HTTPException(status_code=400, detail="Cart is empty")
 
-    # Обробка адреси
-    address_id = None
+    # Обробка адреси (нова адреса запишеться разом із замовленням)
     if address.address_id:
         db_address = await address_repo.get_user_address(address.address_id, cart.user_id)
         if not db_address:
             raise HTTPException(status_code=404, detail="Inputted address is not found")
-        address_id = db_address.id
     else:
-        new_address = await address_repo.create(
+        db_address = await address_repo.create(
             user_id=cart.user_id,
             **address.model_dump(exclude={'address_id'})
         )
-        await address_repo.db.flush()
-        address_id = new_address.id
 
     # Створюємо замовлення
+    items_total = sum(item.price_at_purchase * item.quantity for item in cart_items)
     order = await order_repo.create(
         user_id=cart.user_id,
         cart_id=cart.id,
-        address_id=address_id,
-        total_price=float(cart.total_price)
+        address=db_address,
+        total_price=float(items_total)
     )
-    await order_repo.db.flush()
-
-    # Перевірка та списання товарів зі складу
-    product_ids = [item.product_id for item in cart_items]
-    result = await order_repo.db.execute(
-        select(Product)
-        .where(Product.id.in_(product_ids))
-        .with_for_update()
-    )
-    products_map = {p.id: p for p in result.scalars().all()}
 
+    # Прив'язуємо елементи кошика до замовлення і знімаємо їх суму з кошика
+    await order_repo.link_items_to_order(order, cart_items)
+    await cart_repo.add_to_total(cart, -items_total)
+
+    # Holds кошика конвертуються у списання
+    await reservation_repo.release_cart(cart.id)
+
+    # Списання товарів зі складу одним умовним UPDATE (останнім перед commit,
+    # щоб блокування рядків продуктів тримались якомога менше).
+    # Товар, зарезервований іншими кошиками, списати не можна.
+    quantities = {}
     for item in cart_items:
-        product = products_map.get(item.product_id)
-        if not product:
-            await order_repo.db.rollback()
-            raise HTTPException(status_code=404, detail=f"Product {item.product_id} not found")
-
-        if product.stock_quantity < item.quantity:
-            await order_repo.db.rollback()
-            raise HTTPException(
-                status_code=400,
-                detail=f"Not enough stock for product '{product.name}'."
-            )
-
-        # Списуємо товар зі складу
-        await product_repo.decrease_stock(product.id, item.quantity)
-        item.order_id = order.id
-        order_repo.db.add(item)
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+
+    failed = await product_repo.decrease_stock_bulk(quantities, cart_id=cart.id, now=utc_now())
+    if failed:
+        await uow.rollback()
+        stock = await product_repo.get_stock_levels(failed)
+
+        missing = [product_id for product_id in failed if product_id not in stock]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Products {missing} not found")
+
+        shortages = ", ".join(
+            f"'{stock[product_id].name}' (requested {quantities[product_id]}, "
+            f"available {stock[product_id].stock_quantity})"
+            for product_id in failed
+        )
+        raise HTTPException(status_code=400, detail=f"Not enough stock for products: {shortages}.")
 
     try:
-        await order_repo.db.commit()
-        await order_repo.db.refresh(order)
-        
+        await invalidation_bus.publish(uow.session, CacheEntity.PRODUCT, quantities)
+        await uow.commit()
+        on_stock_changed(quantities)
+
         # Отримуємо повне замовлення з елементами
         full_order = await order_repo.get_by_id(order.id)
         return full_order
 
+    except QueryBudgetExceeded:
+        raise
     except Exception as e:
-        await order_repo.db.rollback()
+        await uow.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get('/{order_id}', response_model=OrderResponse)
+@query_budget(5)
 async def order_info(
     order_id: int,
     db: AsyncSession = Depends(get_async_db)
@@ -115,11 +131,12 @@ async def order_info(
 async def delete_order(
     order_id: int,
     db: AsyncSession = Depends(get_async_db),
-    order_repo: OrderRepository = Depends(get_order_repository)
+    order_repo: OrderRepository = Depends(get_order_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Скасувати замовлення"""
     from routers.calculation import order_status
     order = await order_status(order_id, db)
     await order_repo.update_status(order, OrderStatus.CANCELLED)
-    await order_repo.db.commit()
+    await uow.commit()
     return {"message": "Order canceled successfully"}
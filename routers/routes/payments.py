@@ -3,6 +3,7 @@ from routers.calculation import order_status
 from db.enums import PaymentStatus, PaymentType
 from db.models import User
 from db.shemas import PaymentCreate
+from db.unit_of_work import UnitOfWork, get_unit_of_work
 from routers.routes.auth import get_current_user
 from routers.repositories.dependencies import (
     get_payment_repository,
@@ -25,7 +26,8 @@ async def create_payment(
     current_user: User = Depends(get_current_user),
     payment_repo: PaymentRepository = Depends(get_payment_repository),
     credit_card_repo: CreditCardRepository = Depends(get_credit_card_repository),
-    cart_repo: CartRepository = Depends(get_cart_repository)
+    cart_repo: CartRepository = Depends(get_cart_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Створити платіж"""
     # Отримуємо замовлення через order_status (використовуємо db з payment_repo)
@@ -37,7 +39,7 @@ async def create_payment(
         if payment.credit_card is None:
             raise HTTPException(status_code=400, detail="Credit card is required")
 
-        card_id = None
+        card = None
 
         if payment.save_card:
             masked_card = "*" * 12 + payment.credit_card.card_number[-4:]
@@ -47,21 +49,19 @@ async def create_payment(
             )
 
             if existing_card is None:
-                new_card = await credit_card_repo.create(
+                # Нова картка запишеться разом із платежем
+                card = await credit_card_repo.create(
                     user_id=current_user.id,
                     last_4_numbers=masked_card
                 )
-                await credit_card_repo.db.flush()
-                await credit_card_repo.db.refresh(new_card)
-                card_id = new_card.id
             else:
-                card_id = existing_card.id
+                card = existing_card
 
         # Створюємо платіж
         transaction = await payment_repo.create(
             user_id=current_user.id,
             order_id=order.id,
-            credit_card_id=card_id,
+            credit_card=card,
             status=PaymentStatus.PENDING
         )
 
@@ -69,10 +69,8 @@ async def create_payment(
         cart = await cart_repo.get_by_user_id(current_user.id)
         if cart:
             await cart_repo.clear_cart(cart)
-            await cart_repo.db.commit()
 
-        await payment_repo.db.commit()
-        await payment_repo.db.refresh(transaction)
+        await uow.commit()
 
         return {"status": f"{PaymentStatus.PENDING}", "receipt": transaction.id}
     
@@ -1,6 +1,21 @@
-from fastapi import HTTPException, APIRouter, Depends
-from typing import List
-from db.shemas import ProductResponse, ComparisonProductsResponse
+from decimal import Decimal, InvalidOperation
+from fastapi import HTTPException, APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Optional
+from core.config import settings
+from core.query_counter import query_budget
+from db.database import AsyncSessionLocal
+from db.enums import ProductSort, ImportFormat
+from db.shemas import ProductResponse, ComparisonProductsResponse, ComparisonMatrix, ProductPage, ProductSuggestion
+from routers.calculation import encode_cursor, decode_cursor, comparison_matrix
+from routers.services import (
+    product_suggest_index,
+    build_product_suggest_index,
+    export_header,
+    format_export_rows,
+    category_registry,
+    load_category_registry
+)
 from routers.routes.auth import get_current_user
 from routers.repositories.dependencies import (
     get_product_repository,
@@ -8,20 +23,76 @@ from routers.repositories.dependencies import (
 )
 from routers.repositories import ProductRepository, ComparisonRepository
 from db.models import User
+from db.unit_of_work import UnitOfWork, get_unit_of_work
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[ProductResponse])
+async def _with_categories(repo: ProductRepository, products) -> List[ProductResponse]:
+    """Серіалізувати продукти, підставивши категорії з реєстру (без JOIN/selectinload)"""
+    if not category_registry.has_all(product.category_id for product in products):
+        # Категорію створив інший воркер, а повідомлення шини ще не дійшло
+        await load_category_registry(repo.db)
+
+    items = []
+    for product in products:
+        item = ProductResponse.model_validate(product)
+        item.category = category_registry.get(product.category_id)
+        items.append(item)
+    return items
+
+
+@router.get("/", response_model=ProductPage)
+@query_budget(3)
 async def products(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    sort: ProductSort = ProductSort.ID,
+    category_id: Optional[int] = None,
+    min_price: Optional[Decimal] = Query(None, ge=0),
+    max_price: Optional[Decimal] = Query(None, ge=0),
+    in_stock: bool = False,
     repo: ProductRepository = Depends(get_product_repository)
 ):
-    """Отримати всі продукти"""
-    all_products = await repo.get_all()
-    return all_products or []
+    """Отримати сторінку продуктів з фільтрами (keyset-пагінація)"""
+    after_id = None
+    after_price = None
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            if position.get("sort") != sort.value:
+                raise ValueError("Cursor was issued for another sort order")
+            after_id = int(position["id"])
+            if sort == ProductSort.PRICE:
+                after_price = Decimal(position["price"])
+        except (ValueError, KeyError, TypeError, InvalidOperation):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    page = await repo.get_page(
+        limit=limit,
+        after_id=after_id,
+        after_price=after_price,
+        sort=sort,
+        category_id=category_id,
+        min_price=min_price,
+        max_price=max_price,
+        in_stock=in_stock
+    )
+
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        last = page[-1]
+        position = {"sort": sort.value, "id": last.id}
+        if sort == ProductSort.PRICE:
+            position["price"] = str(last.price)
+        next_cursor = encode_cursor(position)
+
+    return {"items": await _with_categories(repo, page), "next_cursor": next_cursor}
 
 
 @router.get("/comparison", response_model=List[ComparisonProductsResponse])
+@query_budget(3)
 async def show_comparison_table(
     current_user: User = Depends(get_current_user),
     repo: ComparisonRepository = Depends(get_comparison_repository)
@@ -31,20 +102,84 @@ async def show_comparison_table(
     return db_comparison or []
 
 
+@router.get("/comparison/matrix", response_model=ComparisonMatrix)
+@query_budget(3)
+async def show_comparison_matrix(
+    current_user: User = Depends(get_current_user),
+    repo: ComparisonRepository = Depends(get_comparison_repository)
+):
+    """Матриця порівняння: атрибути продуктів пліч-о-пліч, з позначкою відмінностей"""
+    db_comparison = await repo.get_by_user_id(current_user.id)
+    products = [ProductResponse.model_validate(row.product) for row in db_comparison]
+    return {"products": products, "attributes": comparison_matrix(products)}
+
+
 @router.get("/search", response_model=List[ProductResponse])
+@query_budget(3)
 async def search_product(
     q: str | None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
     repo: ProductRepository = Depends(get_product_repository)
 ):
-    """Пошук продуктів"""
+    """Повнотекстовий пошук продуктів (за релевантністю)"""
     if q is None:
         return []
     
-    search_products = await repo.search(q)
-    return search_products or []
+    search_products = await repo.search(q, limit=limit, offset=offset)
+    return await _with_categories(repo, search_products)
+
+
+@router.get("/suggest", response_model=List[ProductSuggestion])
+async def suggest_products(
+    prefix: str = Query(min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    repo: ProductRepository = Depends(get_product_repository)
+):
+    """Автодоповнення назв продуктів за префіксом (з in-memory індексу)"""
+    if not product_suggest_index.is_built:
+        # Індекс будується в lifespan; сюди потрапляємо лише якщо його не запускали
+        await build_product_suggest_index(repo.db)
+
+    return [
+        {"id": product_id, "name": name}
+        for product_id, name in product_suggest_index.suggest(prefix, limit)
+    ]
+
+
+async def _export_stream(format: ImportFormat, category_id: Optional[int]) -> AsyncIterator[str]:
+    # Заголовок йде одразу, ще до першого запиту до бази
+    header = export_header(format)
+    if header:
+        yield header
+
+    # Власна сесія: відповідь стрімиться вже після виходу з dependencies запиту
+    async with AsyncSessionLocal() as session:
+        repo = ProductRepository(session)
+        async for rows in repo.stream_export_rows(category_id, settings.EXPORT_BATCH_SIZE):
+            yield format_export_rows(rows, format)
+
+
+@router.get("/export")
+async def export_products(
+    format: ImportFormat = ImportFormat.NDJSON,
+    category_id: Optional[int] = None
+):
+    """Потоковий експорт каталогу в NDJSON або CSV (памʼять не залежить від розміру каталогу)"""
+    if format == ImportFormat.CSV:
+        media_type, extension = "text/csv", "csv"
+    else:
+        media_type, extension = "application/x-ndjson", "ndjson"
+
+    return StreamingResponse(
+        _export_stream(format, category_id),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="products.{extension}"'}
+    )
 
 
 @router.get("/{id}", response_model=ProductResponse)
+@query_budget(3)
 async def one_product(
     id: int,
     repo: ProductRepository = Depends(get_product_repository)
@@ -61,13 +196,15 @@ async def related_products(
     id: int,
     current_user: User = Depends(get_current_user),
     product_repo: ProductRepository = Depends(get_product_repository),
-    comparison_repo: ComparisonRepository = Depends(get_comparison_repository)
+    comparison_repo: ComparisonRepository = Depends(get_comparison_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Додати продукт до таблиці порівняння"""
     product = await product_repo.get_by_id(id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
+    # Повторне додавання ігнорується (унікальність user_id + product_id)
     await comparison_repo.create(user_id=current_user.id, product_id=id)
-    await comparison_repo.db.commit()
+    await uow.commit()
     return "Product has been added into the comparison table"
@@ -1,45 +1,174 @@
-from fastapi import HTTPException, APIRouter, Depends, status
-from db.shemas import ProductResponse, ProductCreate
-from routers.repositories.dependencies import get_product_repository
-from routers.repositories import ProductRepository
+from typing import Optional
+from fastapi import HTTPException, APIRouter, Depends, Query, Request, status
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.requests import ClientDisconnect
+from core.config import settings
+from db.enums import ImportFormat, ImportJobStatus
+from db.models import ProductImportJob
+from db.shemas import ProductResponse, ProductCreate, ProductImportReport
+from routers.repositories.dependencies import (
+    get_product_repository,
+    get_category_repository,
+    get_import_job_repository
+)
+from routers.repositories import ProductRepository, CategoryRepository, ImportJobRepository
+from routers.services import (
+    on_product_saved,
+    on_product_deleted,
+    on_products_imported,
+    on_stock_changed,
+    invalidation_bus,
+    CacheEntity,
+    ImportFormatError,
+    ProductImporter,
+    iter_rows
+)
+from db.unit_of_work import UnitOfWork, get_unit_of_work
 
 router = APIRouter()
 
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"}
+
+
+def _import_report(job: ProductImportJob) -> ProductImportReport:
+    return ProductImportReport(
+        job_id=job.id,
+        format=job.format,
+        status=job.status,
+        rows_processed=job.rows_processed,
+        rows_imported=job.rows_imported,
+        rows_failed=job.rows_failed,
+        errors=job.errors,
+        errors_truncated=job.rows_failed > len(job.errors),
+        error=job.error
+    )
+
 
 @router.post("/products", response_model=ProductResponse)
 async def add_product(
     product: ProductCreate,
-    repo: ProductRepository = Depends(get_product_repository)
+    repo: ProductRepository = Depends(get_product_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Додати новий продукт"""
     if product is None:
         raise HTTPException(status_code=404, detail="Please enter a valid product dane")
 
     db_product = await repo.create(**product.model_dump())
-    await repo.db.commit()
-    await repo.db.refresh(db_product)
+    # id потрібен у повідомленні шини - flush до commit
+    await uow.flush()
+    await invalidation_bus.publish(uow.session, CacheEntity.PRODUCT, [db_product.id])
+    await uow.commit()
+    on_product_saved(db_product.id, db_product.name, db_product.description)
 
     return db_product
 
 
+@router.post("/products/import", response_model=ProductImportReport)
+async def import_products(
+    request: Request,
+    format: Optional[ImportFormat] = Query(None, description="За замовчуванням - з Content-Type"),
+    job_id: Optional[int] = Query(None, description="ID перерваної задачі, щоб продовжити імпорт"),
+    repo: ProductRepository = Depends(get_product_repository),
+    category_repo: CategoryRepository = Depends(get_category_repository),
+    job_repo: ImportJobRepository = Depends(get_import_job_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
+):
+    """Масовий імпорт продуктів з CSV або NDJSON (upsert за sku).
+
+    Тіло читається потоком; рядки валідуються й записуються пачками по
+    IMPORT_BATCH_SIZE, кожна пачка - окрема транзакція. Якщо завантаження
+    перервалось, той самий файл можна надіслати ще раз з job_id -
+    вже зафіксовані рядки буде пропущено.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type == "text/csv":
+            format = ImportFormat.CSV
+        elif content_type in NDJSON_CONTENT_TYPES:
+            format = ImportFormat.NDJSON
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Expected text/csv or application/x-ndjson body"
+            )
+
+    if job_id is not None:
+        job = await job_repo.get_by_id(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Import job not found")
+        if job.status == ImportJobStatus.COMPLETED:
+            raise HTTPException(status_code=409, detail="Import job is already completed")
+        if job.format != format:
+            raise HTTPException(status_code=400, detail=f"Import job expects {job.format.value} data")
+        job.status = ImportJobStatus.RUNNING
+        job.error = None
+    else:
+        job = await job_repo.create(format)
+    # Задача фіксується одразу, щоб її ID був відомий навіть при обриві
+    await uow.commit()
+
+    category_ids = {category.id for category in await category_repo.get_all()}
+    importer = ProductImporter(
+        job,
+        repo,
+        uow,
+        category_ids,
+        batch_size=settings.IMPORT_BATCH_SIZE,
+        max_errors=settings.IMPORT_MAX_ERRORS
+    )
+    try:
+        await importer.run(iter_rows(request.stream(), format, settings.IMPORT_MAX_RECORD_BYTES))
+        job.status = ImportJobStatus.COMPLETED
+    except (ImportFormatError, ClientDisconnect, SQLAlchemyError) as e:
+        # Зафіксовані пачки лишаються; незавершена пачка відкочується
+        await uow.rollback()
+        await job_repo.reload(job)
+        job.status = ImportJobStatus.FAILED
+        job.error = str(e) if isinstance(e, ImportFormatError) else f"Import interrupted: {type(e).__name__}"
+    # Імпорт міг змінити будь-які продукти - інші воркери скидають кеш повністю
+    await invalidation_bus.publish(uow.session, CacheEntity.PRODUCT)
+    await uow.commit()
+
+    await on_products_imported(repo.db)
+    return _import_report(job)
+
+
+@router.get("/products/import/{job_id}", response_model=ProductImportReport)
+async def import_status(
+    job_id: int,
+    job_repo: ImportJobRepository = Depends(get_import_job_repository)
+):
+    """Стан задачі масового імпорту"""
+    job = await job_repo.get_by_id(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return _import_report(job)
+
+
 @router.put("/products/{product_id}", response_model=ProductResponse)
 async def update_product(
     product_id: int,
     product: ProductCreate,
-    repo: ProductRepository = Depends(get_product_repository)
+    repo: ProductRepository = Depends(get_product_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Оновити продукт"""
-    db_product = await repo.get_by_id(product_id)
+    db_product = await repo.get_by_id(product_id, cached=False)
     if not db_product:
         raise HTTPException(status_code=404, detail="Product not found")
 
     if product:
-        updated_product = await repo.update(
-            product_id,
-            **product.model_dump(exclude_unset=True, exclude_defaults=True)
-        )
-        await repo.db.commit()
-        await repo.db.refresh(updated_product)
+        data = product.model_dump(exclude_unset=True, exclude_defaults=True)
+        # У гарячого продукту новий залишок розкладається по шардах
+        new_stock = data.pop("stock_quantity", None) if db_product.is_hot else None
+        updated_product = await repo.update(product_id, **data)
+        if new_stock is not None:
+            shards = await repo.get_shard_count(product_id) or settings.STOCK_SHARD_COUNT
+            await repo.set_sharded_stock(updated_product, new_stock, shards)
+        await invalidation_bus.publish(uow.session, CacheEntity.PRODUCT, [product_id])
+        await uow.commit()
+        on_product_saved(updated_product.id, updated_product.name, updated_product.description)
         return updated_product
     
     raise HTTPException(status_code=404, detail="Product haven't been updated")
@@ -48,12 +177,55 @@ async def update_product(
 @router.delete("/products/{product_id}")
 async def delete_product(
     product_id: int,
-    repo: ProductRepository = Depends(get_product_repository)
+    repo: ProductRepository = Depends(get_product_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Видалити продукт"""
     success = await repo.delete(product_id)
     if not success:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    await repo.db.commit()
+    await invalidation_bus.publish(uow.session, CacheEntity.PRODUCT, [product_id])
+    await uow.commit()
+    on_product_deleted(product_id)
     return {"message": "Product deleted", "status_code": 204}
+
+
+@router.post("/products/{product_id}/hot", response_model=ProductResponse)
+async def enable_hot_product(
+    product_id: int,
+    shards: Optional[int] = Query(None, ge=2, le=64),
+    repo: ProductRepository = Depends(get_product_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
+):
+    """Позначити продукт гарячим: залишок розбивається на шардовані лічильники"""
+    db_product = await repo.get_by_id(product_id, cached=False)
+    if not db_product:
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    total = await repo.get_stock(db_product)
+    await repo.set_sharded_stock(db_product, total, shards or settings.STOCK_SHARD_COUNT)
+    await invalidation_bus.publish(uow.session, CacheEntity.PRODUCT, [product_id])
+    await uow.commit()
+    on_stock_changed([product_id])
+    return db_product
+
+
+@router.delete("/products/{product_id}/hot", response_model=ProductResponse)
+async def disable_hot_product(
+    product_id: int,
+    repo: ProductRepository = Depends(get_product_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
+):
+    """Зняти позначку гарячого продукту: шарди збираються назад у stock_quantity"""
+    db_product = await repo.get_by_id(product_id, cached=False)
+    if not db_product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    if not db_product.is_hot:
+        raise HTTPException(status_code=400, detail="Product is not hot")
+
+    await repo.disable_sharding(db_product)
+    await invalidation_bus.publish(uow.session, CacheEntity.PRODUCT, [product_id])
+    await uow.commit()
+    on_stock_changed([product_id])
+    return db_product
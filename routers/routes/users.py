@@ -1,13 +1,15 @@
 from typing import List
 from fastapi import HTTPException, APIRouter, Depends, status
 from db.shemas import UserUpdate, UserResponse, OrderResponse
-from routers.routes.auth import get_current_user
+from routers.routes.auth import get_current_user, invalidate_user
 from routers.repositories.dependencies import (
     get_user_repository,
     get_order_repository
 )
 from routers.repositories import UserRepository, OrderRepository
 from db.models import User
+from db.unit_of_work import UnitOfWork, get_unit_of_work
+from routers.services import invalidation_bus, CacheEntity
 
 router = APIRouter()
 
@@ -22,7 +24,8 @@ async def user_info(current_user: User = Depends(get_current_user)):
 async def change_user(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_user),
-    user_repo: UserRepository = Depends(get_user_repository)
+    user_repo: UserRepository = Depends(get_user_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Оновити інформацію про користувача"""
     # Перевірка на дублікати email/login
@@ -40,8 +43,9 @@ async def change_user(
     # Оновлення даних
     updated_data = user_update.model_dump(exclude_unset=True, exclude_none=True)
     updated_user = await user_repo.update(current_user, **updated_data)
-    await user_repo.db.commit()
-    await user_repo.db.refresh(updated_user)
+    await invalidation_bus.publish(uow.session, CacheEntity.USER, [current_user.id])
+    await uow.commit()
+    invalidate_user(updated_user.id)
     
     return updated_user
 
@@ -49,12 +53,15 @@ async def change_user(
 @router.delete('/me')
 async def delete_user(
     current_user: User = Depends(get_current_user),
-    user_repo: UserRepository = Depends(get_user_repository)
+    user_repo: UserRepository = Depends(get_user_repository),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Видалити користувача"""
     if current_user:
         await user_repo.delete(current_user)
-        await user_repo.db.commit()
+        await invalidation_bus.publish(uow.session, CacheEntity.USER, [current_user.id])
+        await uow.commit()
+        invalidate_user(current_user.id)
         return f"User with id = {current_user.id} have been successfully deleted"
     return None
 
@@ -0,0 +1,63 @@
+from .search_index import InvertedIndex, product_search_index
+from .suggest_index import PrefixIndex, product_suggest_index, build_product_suggest_index
+from .invalidation import CacheEntity, InvalidationBus, invalidation_bus, start_invalidation_listener
+from .product_cache import product_cache, invalidate_products
+from .catalog import (
+    on_product_saved,
+    on_product_deleted,
+    on_products_imported,
+    on_stock_changed,
+    on_categories_changed
+)
+from .scheduler import start_periodic, stop_periodic
+from .clock import utc_now
+from .token_blacklist import TokenBlacklistFilter, token_blacklist_filter, refresh_token_blacklist
+from .category_registry import (
+    CategoryRegistry,
+    category_registry,
+    load_category_registry,
+    refresh_category_registry
+)
+from .stock_holds import purge_expired_stock_holds
+from .stock_shards import rebalance_hot_products
+from .cart_totals import reconcile_cart_totals
+from .product_import import ImportFormatError, ProductImporter, iter_rows
+from .product_export import EXPORT_COLUMNS, export_header, format_export_rows
+
+__all__ = [
+    "InvertedIndex",
+    "product_search_index",
+    "PrefixIndex",
+    "product_suggest_index",
+    "build_product_suggest_index",
+    "on_product_saved",
+    "on_product_deleted",
+    "on_products_imported",
+    "on_stock_changed",
+    "on_categories_changed",
+    "CacheEntity",
+    "InvalidationBus",
+    "invalidation_bus",
+    "start_invalidation_listener",
+    "product_cache",
+    "invalidate_products",
+    "start_periodic",
+    "stop_periodic",
+    "TokenBlacklistFilter",
+    "token_blacklist_filter",
+    "refresh_token_blacklist",
+    "CategoryRegistry",
+    "category_registry",
+    "load_category_registry",
+    "refresh_category_registry",
+    "utc_now",
+    "purge_expired_stock_holds",
+    "rebalance_hot_products",
+    "reconcile_cart_totals",
+    "ImportFormatError",
+    "ProductImporter",
+    "iter_rows",
+    "EXPORT_COLUMNS",
+    "export_header",
+    "format_export_rows",
+]
@@ -0,0 +1,28 @@
+import logging
+
+from core.config import settings
+from db.database import AsyncSessionLocal
+from routers.repositories.cart_repository import CartRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_cart_totals() -> None:
+    """Фонова звірка total_price кошиків з SUM(quantity * price_at_purchase).
+
+    Кандидати шукаються одним читаючим запитом, а кожен кошик виправляється
+    в окремій короткій транзакції під блокуванням свого рядка.
+    """
+    async with AsyncSessionLocal() as session:
+        repo = CartRepository(session)
+        candidates = await repo.find_total_drift(settings.CART_TOTAL_RECONCILE_BATCH)
+        await session.commit()
+
+        fixed = []
+        for cart_id in candidates:
+            if await repo.reconcile_total(cart_id):
+                fixed.append(cart_id)
+            await session.commit()
+
+    if fixed:
+        logger.warning("Reconciled total_price drift in %s carts: %s", len(fixed), fixed[:20])
@@ -0,0 +1,70 @@
+from typing import Iterable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from db.database import AsyncSessionLocal
+from db.models import Product
+from .invalidation import CacheEntity, invalidation_bus
+from .product_cache import product_cache, invalidate_products
+from .search_index import product_search_index
+from .suggest_index import product_suggest_index, build_product_suggest_index
+
+
+def on_product_saved(product_id: int, name: str, description: Optional[str]) -> None:
+    """Оновити in-process індекси та кеш після створення або зміни продукту"""
+    invalidate_products([product_id])
+    product_search_index.add(product_id, name, description)
+    product_suggest_index.add(product_id, name)
+
+
+def on_product_deleted(product_id: int) -> None:
+    """Прибрати продукт з in-process індексів та кешу після видалення"""
+    invalidate_products([product_id])
+    product_search_index.remove(product_id)
+    product_suggest_index.remove(product_id)
+
+
+async def on_products_imported(db: AsyncSession) -> None:
+    """Після масового імпорту індекси дешевше перебудувати, ніж оновлювати по одному"""
+    product_cache.clear()
+    product_search_index.invalidate()
+    await build_product_suggest_index(db)
+
+
+def on_stock_changed(product_ids: Iterable[int]) -> None:
+    """Залишок продуктів змінився (замовлення, шарди) - кешовані знімки застаріли"""
+    invalidate_products(product_ids)
+
+
+def on_categories_changed() -> None:
+    """Знімки продуктів містять категорію, тож зміна категорії скидає кеш продуктів"""
+    product_cache.clear()
+
+
+async def _on_products_invalidated(product_ids: Optional[List[int]]) -> None:
+    """Продукти змінив інший воркер: кеш скидається, індекси пошуку оновлюються з бази.
+
+    None (імпорт або перепідключення шини) - індекси перебудовуються повністю.
+    """
+    async with AsyncSessionLocal() as session:
+        if product_ids is None:
+            await on_products_imported(session)
+            return
+
+        invalidate_products(product_ids)
+        result = await session.execute(
+            select(Product.id, Product.name, Product.description).where(Product.id.in_(product_ids))
+        )
+        found = set()
+        for product_id, name, description in result.all():
+            found.add(product_id)
+            product_search_index.add(product_id, name, description)
+            product_suggest_index.add(product_id, name)
+        # Відсутні в базі - видалені
+        for product_id in set(product_ids) - found:
+            product_search_index.remove(product_id)
+            product_suggest_index.remove(product_id)
+
+
+invalidation_bus.register(CacheEntity.PRODUCT, _on_products_invalidated)
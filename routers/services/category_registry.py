@@ -0,0 +1,90 @@
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.database import AsyncSessionLocal
+from db.shemas import CategoryResponse
+from routers.repositories.category_repository import CategoryRepository
+from .catalog import on_categories_changed
+from .invalidation import CacheEntity, invalidation_bus
+
+logger = logging.getLogger(__name__)
+
+
+class CategoryRegistry:
+    """In-memory реєстр категорій воркера: id -> категорія, назва -> id.
+
+    Категорії майже не змінюються, тож реєстр завантажується при старті,
+    точково оновлюється адмінськими роутами і перезавантажується, коли
+    категорії змінив інший воркер (шина інвалідації).
+    """
+
+    def __init__(self):
+        self._by_id: Dict[int, CategoryResponse] = {}
+        self._by_name: Dict[str, int] = {}
+        self.is_loaded = False
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def load(self, categories: Iterable) -> None:
+        self._by_id = {}
+        self._by_name = {}
+        for category in categories:
+            self.put(category.id, category.name)
+        self.is_loaded = True
+
+    def put(self, category_id: int, name: str) -> None:
+        """Додати або перейменувати категорію"""
+        previous = self._by_id.get(category_id)
+        if previous is not None and self._by_name.get(previous.name) == category_id:
+            del self._by_name[previous.name]
+        self._by_id[category_id] = CategoryResponse(id=category_id, name=name)
+        self._by_name[name] = category_id
+
+    def remove(self, category_id: int) -> None:
+        category = self._by_id.pop(category_id, None)
+        if category is not None and self._by_name.get(category.name) == category_id:
+            del self._by_name[category.name]
+
+    def get(self, category_id: int) -> Optional[CategoryResponse]:
+        return self._by_id.get(category_id)
+
+    def find_by_name(self, name: str) -> Optional[int]:
+        """ID категорії з такою назвою або None"""
+        return self._by_name.get(name)
+
+    def all(self) -> List[CategoryResponse]:
+        return sorted(self._by_id.values(), key=lambda category: category.id)
+
+    def has_all(self, category_ids: Iterable[int]) -> bool:
+        return all(category_id in self._by_id for category_id in category_ids)
+
+
+category_registry = CategoryRegistry()
+
+
+async def load_category_registry(db: AsyncSession) -> None:
+    """(Пере)завантажити реєстр категорій з бази в сесії запиту"""
+    category_registry.load(await CategoryRepository(db).get_all())
+
+
+async def refresh_category_registry() -> None:
+    """(Пере)завантажити реєстр категорій з бази (lifespan, шина інвалідації)"""
+    async with AsyncSessionLocal() as session:
+        await load_category_registry(session)
+    logger.debug("Loaded %s categories into the registry", len(category_registry))
+
+
+async def _on_categories_invalidated(category_ids: Optional[List[int]]) -> None:
+    """Категорії змінив інший воркер - перечитуємо реєстр цілком (він малий).
+
+    Єдиний обробник CATEGORY: кеш продуктів теж скидається тут, бо знімки
+    продуктів містять категорію.
+    """
+    on_categories_changed()
+    await refresh_category_registry()
+
+
+invalidation_bus.register(CacheEntity.CATEGORY, _on_categories_invalidated)
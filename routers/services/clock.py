@@ -0,0 +1,6 @@
+from datetime import datetime, timezone
+
+
+def utc_now() -> datetime:
+    """Поточний час UTC без tzinfo (так зберігаються DateTime колонки)"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,140 @@
+import asyncio
+import inspect
+import json
+import logging
+from enum import Enum
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from db.database import engine
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntity(str, Enum):
+    """Сутності, per-process кеші яких синхронізуються між воркерами"""
+    PRODUCT = "product"
+    CATEGORY = "category"
+    USER = "user"
+    TOKEN = "token"
+
+
+# Обробник отримує список ID або None - "скинути все" (після втрати зʼєднання)
+InvalidationHandler = Callable[[Optional[List]], Union[None, Awaitable[None]]]
+
+# Postgres обмежує payload NOTIFY 8000 байтами (із запасом на обгортку повідомлення)
+MAX_PAYLOAD_BYTES = 7500
+
+
+class InvalidationBus:
+    """Шина інвалідації per-process кешів між воркерами через Postgres LISTEN/NOTIFY.
+
+    Писач викликає publish() у тій самій транзакції, що й зміна: NOTIFY
+    доставляється лише після COMMIT і зникає при ROLLBACK. Кожен воркер
+    слухає канал окремим asyncpg-зʼєднанням і викликає зареєстровані
+    обробники. Повідомлення, надіслані поки зʼєднання не було, втрачені,
+    тому після (пере)підключення всі обробники викликаються з None.
+    """
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self._handlers: Dict[CacheEntity, List[InvalidationHandler]] = {}
+        self._queue: Optional["asyncio.Queue[tuple[CacheEntity, Optional[List]]]"] = None
+
+    def register(self, entity: CacheEntity, handler: InvalidationHandler) -> None:
+        self._handlers.setdefault(entity, []).append(handler)
+
+    async def publish(self, db: AsyncSession, entity: CacheEntity, ids: Optional[Iterable] = None) -> None:
+        """Поставити NOTIFY у поточну транзакцію. ids=None - скинути всі записи сутності"""
+        if db.bind.dialect.name != "postgresql":
+            # SQLite (тести) - один процес, локальної інвалідації достатньо
+            return
+        for payload in self._payloads(entity, ids):
+            await db.execute(select(func.pg_notify(self.channel, payload)))
+
+    @staticmethod
+    def _message(entity: CacheEntity, ids: Optional[List]) -> str:
+        # Компактні роздільники: розмір пачки в _payloads рахується як значення + кома
+        return json.dumps({"entity": entity.value, "ids": ids}, separators=(",", ":"))
+
+    @classmethod
+    def _payloads(cls, entity: CacheEntity, ids: Optional[Iterable]) -> Iterator[str]:
+        if ids is None:
+            yield cls._message(entity, None)
+            return
+
+        chunk: List = []
+        size = 0
+        for value in ids:
+            item_size = len(json.dumps(value)) + 1
+            if chunk and size + item_size > MAX_PAYLOAD_BYTES:
+                yield cls._message(entity, chunk)
+                chunk, size = [], 0
+            chunk.append(value)
+            size += item_size
+        if chunk:
+            yield cls._message(entity, chunk)
+
+    async def dispatch(self, entity: CacheEntity, ids: Optional[List]) -> None:
+        for handler in self._handlers.get(entity, []):
+            try:
+                result = handler(ids)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("Invalidation handler for %s failed", entity.value)
+
+    async def reset(self) -> None:
+        """Скинути всі кеші, що слухають шину"""
+        for entity in list(self._handlers):
+            await self.dispatch(entity, None)
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            self._queue.put_nowait((CacheEntity(message["entity"]), message["ids"]))
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Malformed invalidation message: %r", payload)
+
+    async def listen(self) -> None:
+        """Слухати канал до скасування задачі, перепідключаючись при обриві"""
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        self._queue = asyncio.Queue()
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                await connection.add_listener(self.channel, self._on_notify)
+                await self.reset()
+                while True:
+                    try:
+                        entity, ids = await asyncio.wait_for(
+                            self._queue.get(), settings.INVALIDATION_KEEPALIVE_SECONDS
+                        )
+                    except asyncio.TimeoutError:
+                        # Тиша в каналі - перевіряємо, що зʼєднання ще живе
+                        await connection.fetchval("SELECT 1")
+                        continue
+                    await self.dispatch(entity, ids)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Invalidation listener disconnected, reconnecting")
+            finally:
+                if connection is not None:
+                    connection.terminate()
+            await asyncio.sleep(settings.INVALIDATION_RECONNECT_SECONDS)
+
+
+invalidation_bus = InvalidationBus(settings.INVALIDATION_CHANNEL)
+
+
+def start_invalidation_listener() -> Optional[asyncio.Task]:
+    """Запустити слухача шини у фоні воркера (лише для Postgres)"""
+    if engine.dialect.name != "postgresql":
+        return None
+    return asyncio.create_task(invalidation_bus.listen(), name="cache-invalidation-listener")
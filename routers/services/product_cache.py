@@ -0,0 +1,17 @@
+from typing import Iterable
+
+from core.cache import TTLCache
+from core.config import settings
+
+# Read-through кеш продуктів (per-worker): product_id -> знімок колонок Product і його категорії
+product_cache = TTLCache(
+    "product",
+    maxsize=settings.PRODUCT_CACHE_MAX_SIZE,
+    ttl=settings.PRODUCT_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_products(product_ids: Iterable[int]) -> None:
+    """Прибрати продукти з кешу після зміни (ціна, залишок, категорія...)"""
+    for product_id in product_ids:
+        product_cache.pop(product_id)
@@ -0,0 +1,38 @@
+import csv
+import io
+import json
+from decimal import Decimal
+from typing import Sequence
+
+from sqlalchemy import Row
+
+from db.enums import ImportFormat
+
+# Колонки експорту; CSV-заголовок сумісний з імпортом (зайві колонки імпорт ігнорує)
+EXPORT_COLUMNS = ["id", "sku", "name", "description", "price", "category_id", "category", "stock_quantity", "image_url"]
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def export_header(format: ImportFormat) -> str:
+    """Початок файлу експорту (заголовок CSV або нічого для NDJSON)"""
+    if format == ImportFormat.CSV:
+        return ",".join(EXPORT_COLUMNS) + "\n"
+    return ""
+
+
+def format_export_rows(rows: Sequence[Row], format: ImportFormat) -> str:
+    """Серіалізувати пачку рядків одним шматком тексту"""
+    if format == ImportFormat.CSV:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue()
+
+    return "".join(
+        json.dumps(row._asdict(), default=_json_default, ensure_ascii=False) + "\n"
+        for row in rows
+    )
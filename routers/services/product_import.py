@@ -0,0 +1,226 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from db.enums import ImportFormat
+from db.models import ProductImportJob
+from db.shemas import ProductCreate
+
+# (сирий рядок або None, помилка розбору або None)
+ParsedRow = Tuple[Optional[dict], Optional[str]]
+
+_products_adapter = TypeAdapter(List[ProductCreate])
+
+
+class ImportFormatError(ValueError):
+    """Потік не можна розібрати далі (а не окремий поганий рядок)"""
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[str]:
+    """Розбити потік байтів на рядки, тримаючи в памʼяті лише незавершений хвіст.
+
+    Ділимо ще сирі байти: у UTF-8 байт \n не трапляється всередині
+    багатобайтового символу, а ліміт рахується саме в байтах.
+    """
+    tail = b""
+    first = True
+    line_no = 0
+    async for chunk in chunks:
+        tail += chunk
+        if first:
+            # BOM може прийти розрізаним між чанками - чекаємо перших трьох байтів
+            if len(tail) < len(codecs.BOM_UTF8) and b"\n" not in tail:
+                continue
+            if tail.startswith(codecs.BOM_UTF8):
+                tail = tail[len(codecs.BOM_UTF8):]
+            first = False
+        lines = tail.split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            line_no += 1
+            if len(line) > max_line_bytes:
+                raise ImportFormatError(f"Line is longer than {max_line_bytes} bytes")
+            yield _decode_line(line, line_no)
+        if len(tail) > max_line_bytes:
+            raise ImportFormatError(f"Line is longer than {max_line_bytes} bytes")
+
+    if first and tail.startswith(codecs.BOM_UTF8):
+        tail = tail[len(codecs.BOM_UTF8):]
+    if tail:
+        yield _decode_line(tail, line_no + 1)
+
+
+def _decode_line(line: bytes, line_no: int) -> str:
+    try:
+        return line.decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError as e:
+        raise ImportFormatError(f"Invalid UTF-8 on line {line_no}") from e
+
+
+async def iter_csv_rows(lines: AsyncIterator[str], max_record_bytes: int) -> AsyncIterator[ParsedRow]:
+    """CSV з заголовком. Запис може займати кілька рядків, якщо поле в лапках містить перенос"""
+    header = None
+    pending: List[str] = []
+    pending_size = 0
+    quotes = 0
+    async for line in lines:
+        pending.append(line)
+        # Ліміт - у байтах (+1 за перенос рядка між частинами запису)
+        pending_size += len(line.encode("utf-8")) + 1
+        quotes += line.count('"')
+        if quotes % 2:
+            # Непарна кількість лапок - поле в лапках продовжується на наступному рядку
+            if pending_size > max_record_bytes:
+                raise ImportFormatError(f"CSV record is longer than {max_record_bytes} bytes")
+            continue
+
+        record = "\n".join(pending)
+        pending, pending_size, quotes = [], 0, 0
+        if not record.strip():
+            continue
+
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        # Порожні комірки - відсутні значення (спрацюють значення за замовчуванням)
+        yield {key: value for key, value in zip(header, values) if value != ""}, None
+
+    if pending:
+        yield None, "Unterminated quoted field at end of file"
+
+
+async def iter_ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRow]:
+    """Один JSON-обʼєкт на рядок"""
+    async for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield None, "Expected a JSON object"
+            continue
+        yield row, None
+
+
+def iter_rows(chunks: AsyncIterator[bytes], format: ImportFormat, max_record_bytes: int) -> AsyncIterator[ParsedRow]:
+    """Потоковий розбір тіла запиту у рядки даних"""
+    lines = iter_lines(chunks, max_record_bytes)
+    if format == ImportFormat.CSV:
+        return iter_csv_rows(lines, max_record_bytes)
+    return iter_ndjson_rows(lines)
+
+
+def validate_batch(rows: List[dict]) -> Tuple[Dict[int, ProductCreate], Dict[int, List[str]]]:
+    """Валідувати пачку рядків одним викликом pydantic.
+
+    Повертає ({індекс: ProductCreate}, {індекс: [помилки]}).
+    """
+    try:
+        return dict(enumerate(_products_adapter.validate_python(rows))), {}
+    except ValidationError as e:
+        errors: Dict[int, List[str]] = {}
+        for error in e.errors():
+            index, *field = error["loc"]
+            location = ".".join(str(part) for part in field) or "row"
+            errors.setdefault(index, []).append(f"{location}: {error['msg']}")
+
+    # Другий прохід лише по валідних рядках - вони гарантовано проходять
+    valid_indexes = [i for i in range(len(rows)) if i not in errors]
+    products = _products_adapter.validate_python([rows[i] for i in valid_indexes])
+    return dict(zip(valid_indexes, products)), errors
+
+
+class ProductImporter:
+    """Імпорт продуктів пачками: валідація, upsert за sku, commit разом із прогресом задачі.
+
+    Прогрес (rows_processed) фіксується в тій самій транзакції, що й пачка
+    продуктів, тож після обриву завантаження можна продовжити з того ж рядка.
+    """
+
+    def __init__(
+        self,
+        job: ProductImportJob,
+        product_repo,
+        uow,
+        category_ids: Set[int],
+        batch_size: int,
+        max_errors: int
+    ):
+        self.job = job
+        self.product_repo = product_repo
+        self.uow = uow
+        self.category_ids = category_ids
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+
+    async def run(self, rows: AsyncIterator[ParsedRow]) -> None:
+        """Обробити потік рядків; вже зафіксовані рядки задачі пропускаються"""
+        skip = self.job.rows_processed
+        row_no = 0
+        batch: List[Tuple[int, Optional[dict], Optional[str]]] = []
+        async for row, parse_error in rows:
+            row_no += 1
+            if row_no <= skip:
+                continue
+            batch.append((row_no, row, parse_error))
+            if len(batch) >= self.batch_size:
+                await self._process(batch)
+                batch = []
+
+        if batch:
+            await self._process(batch)
+
+    async def _process(self, batch: List[Tuple[int, Optional[dict], Optional[str]]]) -> None:
+        errors: Dict[int, List[str]] = {}
+        candidates = []
+        for row_no, row, parse_error in batch:
+            if parse_error:
+                errors[row_no] = [parse_error]
+            else:
+                candidates.append((row_no, row))
+
+        products, invalid = validate_batch([row for _, row in candidates])
+        for index, messages in invalid.items():
+            errors[candidates[index][0]] = messages
+
+        with_sku: Dict[str, dict] = {}
+        without_sku: List[dict] = []
+        imported = 0
+        for index, product in products.items():
+            if product.category_id not in self.category_ids:
+                errors[candidates[index][0]] = [f"category_id: Category {product.category_id} not found"]
+                continue
+            imported += 1
+            values = product.model_dump()
+            if product.sku:
+                # Дублікати sku в межах пачки: перемагає останній рядок
+                with_sku[product.sku] = values
+            else:
+                without_sku.append(values)
+
+        if with_sku:
+            await self.product_repo.upsert_by_sku(list(with_sku.values()))
+        if without_sku:
+            await self.product_repo.bulk_create(without_sku)
+
+        job = self.job
+        job.rows_processed = batch[-1][0]
+        job.rows_imported += imported
+        job.rows_failed += len(errors)
+        room = self.max_errors - len(job.errors)
+        if room > 0 and errors:
+            job.errors = job.errors + [
+                {"row": row_no, "errors": messages}
+                for row_no, messages in sorted(errors.items())[:room]
+            ]
+        await self.uow.commit()
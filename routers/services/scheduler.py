@@ -0,0 +1,29 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+async def _run_periodic(name: str, interval: float, job: Callable[[], Awaitable[None]]) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Фонова задача не повинна вмирати через одну помилку
+            logger.exception("Periodic job %s failed", name)
+
+
+def start_periodic(name: str, interval: float, job: Callable[[], Awaitable[None]]) -> asyncio.Task:
+    """Запустити job кожні interval секунд у фоні воркера"""
+    return asyncio.create_task(_run_periodic(name, interval, job), name=name)
+
+
+async def stop_periodic(tasks: List[asyncio.Task]) -> None:
+    """Зупинити фонові задачі (при завершенні lifespan)"""
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
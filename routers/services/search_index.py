@@ -0,0 +1,112 @@
+import math
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Вага збігу в назві вища, ніж в описі (як setweight 'A'/'B' у Postgres)
+NAME_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Розбиває текст на токени в нижньому регістрі"""
+    if not text:
+        return []
+    return TOKEN_RE.findall(text.lower())
+
+
+class InvertedIndex:
+    """In-process інвертований індекс продуктів.
+
+    Використовується як fallback повнотекстового пошуку, коли база не Postgres
+    (наприклад, SQLite у тестах). Ранжування - TF-IDF з вагами полів.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._documents: Dict[int, Dict[str, float]] = {}
+        self.is_built = False
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def build(self, rows: Iterable[Tuple[int, str, Optional[str]]]) -> None:
+        """Повністю перебудувати індекс з рядків (id, name, description)"""
+        self._postings = defaultdict(dict)
+        self._documents = {}
+        for product_id, name, description in rows:
+            self._add(product_id, name, description)
+        self.is_built = True
+
+    def invalidate(self) -> None:
+        """Скинути індекс - він лениво перебудується при наступному пошуку"""
+        self._postings = defaultdict(dict)
+        self._documents = {}
+        self.is_built = False
+
+    def add(self, product_id: int, name: str, description: Optional[str]) -> None:
+        """Додати або оновити продукт в індексі"""
+        if not self.is_built:
+            # Індекс ще не побудований - повна побудова підхопить зміни
+            return
+        self.remove(product_id)
+        self._add(product_id, name, description)
+
+    def remove(self, product_id: int) -> None:
+        """Видалити продукт з індексу"""
+        weights = self._documents.pop(product_id, None)
+        if not weights:
+            return
+        for token in weights:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[token]
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> List[int]:
+        """Повертає ID продуктів, що містять усі токени запиту, за спаданням релевантності"""
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+
+        postings = [self._postings.get(token) for token in tokens]
+        if any(not p for p in postings):
+            return []
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for p in postings[1:]:
+            candidates.intersection_update(p)
+            if not candidates:
+                return []
+
+        total = len(self._documents)
+        scores = {}
+        for product_id in candidates:
+            score = 0.0
+            for p in postings:
+                idf = math.log(1 + total / len(p))
+                score += p[product_id] * idf
+            scores[product_id] = score
+
+        ranked = sorted(scores, key=lambda pid: (-scores[pid], pid))
+        return ranked[offset:offset + limit]
+
+    def _add(self, product_id: int, name: str, description: Optional[str]) -> None:
+        weights: Dict[str, float] = defaultdict(float)
+        for token in tokenize(name):
+            weights[token] += NAME_WEIGHT
+        for token in tokenize(description):
+            weights[token] += DESCRIPTION_WEIGHT
+
+        self._documents[product_id] = dict(weights)
+        for token, weight in weights.items():
+            self._postings[token][product_id] = weight
+
+
+# Один індекс на процес воркера
+product_search_index = InvertedIndex()
@@ -0,0 +1,17 @@
+import logging
+
+from db.database import AsyncSessionLocal
+from routers.repositories.reservation_repository import ReservationRepository
+from .clock import utc_now
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_expired_stock_holds() -> None:
+    """Фонове прибирання протухлих holds, щоб товар повертався в продаж"""
+    async with AsyncSessionLocal() as session:
+        purged = await ReservationRepository(session).purge_expired(utc_now())
+        await session.commit()
+
+    if purged:
+        logger.info("Released %s expired stock holds", purged)
@@ -0,0 +1,27 @@
+import logging
+
+from db.database import AsyncSessionLocal
+from .catalog import on_stock_changed
+
+logger = logging.getLogger(__name__)
+
+
+async def rebalance_hot_products() -> None:
+    """Фонове вирівнювання шардів залишку гарячих продуктів.
+
+    Кожен продукт ребалансується в окремій короткій транзакції, щоб
+    не тримати блокування шардів під час обходу всього списку.
+    """
+    # product_repository сам імпортує routers.services, тому імпорт локальний
+    from routers.repositories.product_repository import ProductRepository
+
+    async with AsyncSessionLocal() as session:
+        repo = ProductRepository(session)
+        product_ids = await repo.get_hot_product_ids()
+        for product_id in product_ids:
+            await repo.rebalance_shards(product_id)
+            await session.commit()
+    on_stock_changed(product_ids)
+
+    if product_ids:
+        logger.debug("Rebalanced stock shards for %s hot products", len(product_ids))
@@ -0,0 +1,87 @@
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from db.models import Product
+from .search_index import TOKEN_RE
+
+
+class PrefixIndex:
+    """Відсортований масив ключів для автодоповнення назв продуктів.
+
+    Кожна назва індексується з початку кожного слова, тому "pho" знаходить
+    і "Phone X", і "Smart phone". Пошук - бінарний (bisect), без звернень до бази.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[str, int]] = []
+        self._names: Dict[int, str] = {}
+        self.is_built = False
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def build(self, rows: Iterable[Tuple[int, str]]) -> None:
+        """Повністю перебудувати індекс з рядків (id, name)"""
+        keys = []
+        names = {}
+        for product_id, name in rows:
+            names[product_id] = name
+            keys.extend((key, product_id) for key in self._keys_for(name))
+        keys.sort()
+        self._keys = keys
+        self._names = names
+        self.is_built = True
+
+    def add(self, product_id: int, name: str) -> None:
+        """Додати або оновити продукт"""
+        self.remove(product_id)
+        self._names[product_id] = name
+        for key in self._keys_for(name):
+            insort(self._keys, (key, product_id))
+
+    def remove(self, product_id: int) -> None:
+        """Видалити продукт"""
+        name = self._names.pop(product_id, None)
+        if name is None:
+            return
+        for key in self._keys_for(name):
+            i = bisect_left(self._keys, (key, product_id))
+            if i < len(self._keys) and self._keys[i] == (key, product_id):
+                del self._keys[i]
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Tuple[int, str]]:
+        """Повертає до limit пар (id, name), назви яких містять слово з цим префіксом"""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+
+        result = []
+        seen = set()
+        i = bisect_left(self._keys, (prefix, -1))
+        while i < len(self._keys) and len(result) < limit:
+            key, product_id = self._keys[i]
+            if not key.startswith(prefix):
+                break
+            if product_id not in seen:
+                seen.add(product_id)
+                result.append((product_id, self._names[product_id]))
+            i += 1
+        return result
+
+    @staticmethod
+    def _keys_for(name: str) -> List[str]:
+        normalized = name.lower()
+        return sorted({normalized[m.start():] for m in TOKEN_RE.finditer(normalized)})
+
+
+async def build_product_suggest_index(db: AsyncSession) -> None:
+    """Завантажити назви продуктів з бази та побудувати індекс"""
+    result = await db.execute(select(Product.id, Product.name))
+    product_suggest_index.build(result.all())
+
+
+# Один індекс на процес воркера
+product_suggest_index = PrefixIndex()
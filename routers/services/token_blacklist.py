@@ -0,0 +1,88 @@
+import logging
+from typing import Iterable, List, Optional, Set
+
+from core.bloom import BloomFilter
+from core.config import settings
+from db.database import AsyncSessionLocal
+from routers.repositories.token_repository import TokenRepository
+from .clock import utc_now
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBlacklistFilter:
+    """In-memory Bloom-фільтр поверх таблиці token_blacklist.
+
+    "Точно не в чорному списку" відповідає без бази; позитивна відповідь
+    (або ще не побудований фільтр) означає, що треба перевірити таблицю.
+
+    Перебудова читає таблицю не миттєво: logout, що встиг між знімком і
+    rebuild, у знімок не потрапив. Тому add() під час перебудови ще й
+    записується в pending-набір знімка, і rebuild додає його в новий фільтр.
+    """
+
+    def __init__(self):
+        self._bloom: Optional[BloomFilter] = None
+        # Набори хешів, доданих після початку кожної незавершеної перебудови
+        self._pending: List[Set[str]] = []
+
+    @property
+    def is_built(self) -> bool:
+        return self._bloom is not None
+
+    def might_contain(self, token_hash: str) -> bool:
+        if self._bloom is None:
+            return True
+        return token_hash in self._bloom
+
+    def add(self, token_hash: str) -> None:
+        if self._bloom is not None:
+            self._bloom.add(token_hash)
+        for pending in self._pending:
+            pending.add(token_hash)
+
+    def begin_rebuild(self) -> Set[str]:
+        """Почати запис доданих хешів; викликати до читання знімка з таблиці"""
+        pending: Set[str] = set()
+        self._pending.append(pending)
+        return pending
+
+    def end_rebuild(self, pending: Set[str]) -> None:
+        """Припинити запис (rebuild робить це сам; окремо - якщо перебудова впала)"""
+        self._pending = [item for item in self._pending if item is not pending]
+
+    def rebuild(self, token_hashes: Iterable[str], pending: Optional[Set[str]] = None) -> None:
+        """Новий фільтр зі знімка; pending з begin_rebuild доливається в нього"""
+        token_hashes = list(token_hashes)
+        if pending is not None:
+            self.end_rebuild(pending)
+            token_hashes.extend(pending)
+        capacity = max(settings.TOKEN_BLACKLIST_BLOOM_CAPACITY, len(token_hashes) * 2)
+        self._bloom = BloomFilter.from_items(
+            token_hashes,
+            capacity=capacity,
+            error_rate=settings.TOKEN_BLACKLIST_BLOOM_ERROR_RATE
+        )
+
+
+token_blacklist_filter = TokenBlacklistFilter()
+
+
+async def refresh_token_blacklist() -> None:
+    """Видалити протухлі токени та перебудувати Bloom-фільтр з таблиці"""
+    now = utc_now()
+    # Logout між get_active_hashes і rebuild інакше зник би з нового фільтра
+    pending = token_blacklist_filter.begin_rebuild()
+    try:
+        async with AsyncSessionLocal() as session:
+            repo = TokenRepository(session)
+            purged = await repo.purge_expired(now)
+            await session.commit()
+            token_hashes = await repo.get_active_hashes(now)
+    except BaseException:
+        token_blacklist_filter.end_rebuild(pending)
+        raise
+
+    token_blacklist_filter.rebuild(token_hashes, pending)
+    if purged:
+        logger.info("Purged %s expired blacklisted tokens", purged)
@@ -0,0 +1,336 @@
+"""Навантажувальний тест checkout: register -> login -> cart -> order -> payment.
+
+Ганяє main.app через in-process ASGI-клієнт (httpx) проти локальної бази
+з засіяними даними і рахує по кожному роуту RPS, p50/p95/p99 латентності
+та кількість SQL-запитів (із заголовка Server-Timing QueryCounterMiddleware).
+
+    python -m tests.benchmarks.checkout_load --users 200 --concurrency 20
+    python -m tests.benchmarks.checkout_load --update-baseline
+    python -m tests.benchmarks.checkout_load --database-url postgresql+asyncpg://... --compare
+
+Без --database-url використовується тимчасова SQLite-база. Для Postgres потрібна
+окрема (порожня або тестова) база: таблиці створюються через create_all.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BASELINE_PATH = Path(__file__).with_name("baseline_checkout.json")
+
+# Допустиме погіршення p95 відносно baseline при --compare
+DEFAULT_LATENCY_TOLERANCE = 0.5
+
+_SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+COUNTRY_CODE = "UA"
+CREDIT_CARD = {
+    "card_number": "4111111111111111",
+    "create_date": "2030-01-01",
+    "ccv": "123",
+    "holder_name": "Load Test"
+}
+
+
+def configure_database(database_url: Optional[str]) -> str:
+    """Задати SQLALCHEMY_DATABASE_URL до першого імпорту main/core.config"""
+    if database_url is None:
+        database_url = os.environ.get("BENCH_DATABASE_URL")
+    if database_url is None:
+        path = Path(tempfile.mkdtemp(prefix="checkout-bench-")) / "bench.db"
+        database_url = f"sqlite+aiosqlite:///{path}"
+    os.environ["SQLALCHEMY_DATABASE_URL"] = database_url
+    # Без SQL-ехо і без strict-бюджетів: міряємо, а не валимо запити
+    os.environ.setdefault("DB_ECHO", "false")
+    os.environ.setdefault("QUERY_COUNTER_ENABLED", "true")
+    os.environ.setdefault("QUERY_BUDGET_STRICT", "false")
+    return database_url
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль методом nearest-rank"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+class RouteStats:
+    """Латентності і кількості запитів одного роута"""
+
+    def __init__(self):
+        self.latencies_ms: List[float] = []
+        self.queries: List[int] = []
+        self.errors = 0
+
+    def record(self, latency_ms: float, queries: Optional[int], ok: bool) -> None:
+        self.latencies_ms.append(latency_ms)
+        if queries is not None:
+            self.queries.append(queries)
+        if not ok:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> dict:
+        count = len(self.latencies_ms)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "rps": round(count / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(self.latencies_ms, 50), 2),
+            "p95_ms": round(percentile(self.latencies_ms, 95), 2),
+            "p99_ms": round(percentile(self.latencies_ms, 99), 2),
+            "queries_per_request": round(sum(self.queries) / len(self.queries), 2) if self.queries else None,
+            "max_queries": max(self.queries) if self.queries else None
+        }
+
+
+async def seed(products: int, stock: int) -> List[int]:
+    """Створити схему, країну, категорії і продукти з великим залишком. Повертає ID продуктів"""
+    from db.database import AsyncSessionLocal, Base, engine
+    from db.models import Category, Country, Product
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSessionLocal() as session:
+        if await session.get(Country, COUNTRY_CODE) is None:
+            session.add(Country(code=COUNTRY_CODE, name="Ukraine"))
+        run = uuid.uuid4().hex[:8]
+        categories = [Category(name=f"bench-{run}-{i}") for i in range(5)]
+        session.add_all(categories)
+        await session.flush()
+        items = [
+            Product(
+                name=f"Bench product {run} {i}",
+                description="load test",
+                price=10 + i % 90,
+                stock_quantity=stock,
+                category_id=categories[i % len(categories)].id
+            )
+            for i in range(products)
+        ]
+        session.add_all(items)
+        await session.commit()
+        return [product.id for product in items]
+
+
+async def _order_id(user_id: int) -> int:
+    # OrderResponse не містить id - беремо останнє замовлення користувача поза вимірюванням
+    from sqlalchemy import select
+    from db.database import AsyncSessionLocal
+    from db.models import Order
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Order.id).where(Order.user_id == user_id).order_by(Order.id.desc()).limit(1)
+        )
+        return result.scalar_one()
+
+
+class CheckoutLoad:
+    """Прогін сценарію checkout для users користувачів із обмеженою конкурентністю"""
+
+    def __init__(self, client, product_ids: List[int], items_per_cart: int = 3):
+        self.client = client
+        self.product_ids = product_ids
+        self.items_per_cart = items_per_cart
+        self.stats: Dict[str, RouteStats] = defaultdict(RouteStats)
+        self.failed: List[BaseException] = []
+
+    async def _call(self, route: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        response = await self.client.request(method, url, **kwargs)
+        latency_ms = (time.perf_counter() - started) * 1000
+        match = _SERVER_TIMING_QUERIES.search(response.headers.get("server-timing", ""))
+        self.stats[route].record(latency_ms, int(match.group(1)) if match else None, response.is_success)
+        if not response.is_success:
+            raise RuntimeError(f"{route} -> {response.status_code}: {response.text[:200]}")
+        return response
+
+    async def checkout(self, n: int) -> None:
+        login = f"bench_{uuid.uuid4().hex[:12]}"
+        password = "bench-password"
+        response = await self._call("POST /auth/register", "POST", "/auth/register", json={
+            "login": login,
+            "first_name": "Load",
+            "last_name": "Test",
+            "email": f"{login}@example.com",
+            "password": password
+        })
+        user_id = response.json()["id"]
+
+        response = await self._call("POST /auth/login", "POST", "/auth/login", data={
+            "username": login,
+            "password": password
+        })
+        headers = {"Authorization": "Bearer " + response.json()["access_token"]}
+
+        for i in range(self.items_per_cart):
+            product_id = self.product_ids[(n * self.items_per_cart + i) % len(self.product_ids)]
+            await self._call("POST /cart/item", "POST", "/cart/item", headers=headers, json={
+                "product_id": product_id,
+                "quantity": 1
+            })
+
+        await self._call("POST /orders/", "POST", "/orders/", headers=headers, json={
+            "address_id": None,
+            "country_code": COUNTRY_CODE,
+            "city": "Kyiv",
+            "street": "Khreshchatyk 1",
+            "postal_code": "01001"
+        })
+
+        order_id = await _order_id(user_id)
+        await self._call("POST /payments/initiate/{order_id}", "POST", f"/payments/initiate/{order_id}", headers=headers, json={
+            "payment_type": "credit_card",
+            "credit_card": CREDIT_CARD,
+            "save_card": True
+        })
+
+    async def run(self, users: int, concurrency: int) -> float:
+        """Повертає загальний час прогону в секундах"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(n: int) -> None:
+            async with semaphore:
+                await self.checkout(n)
+
+        started = time.perf_counter()
+        # Помилка одного сценарію не зупиняє інші - вона вже врахована в errors роута
+        results = await asyncio.gather(*(one(n) for n in range(users)), return_exceptions=True)
+        self.failed = [result for result in results if isinstance(result, BaseException)]
+        return time.perf_counter() - started
+
+
+async def run_checkout_benchmark(
+    users: int = 50,
+    concurrency: int = 10,
+    products: int = 200,
+    items_per_cart: int = 3
+) -> dict:
+    """Засіяти базу, прогнати сценарій і повернути звіт (той самий формат, що й baseline)"""
+    import httpx
+    import main
+    from db.database import engine
+
+    if engine.dialect.name == "sqlite" and concurrency > 1:
+        # SQLite має одного writer-а: паралельні транзакції падають з "database is locked".
+        # Конкурентність має сенс лише на Postgres (--database-url)
+        print("SQLite: concurrency is limited to 1", file=sys.stderr)
+        concurrency = 1
+
+    product_ids = await seed(products, stock=users * items_per_cart + 100)
+    transport = httpx.ASGITransport(app=main.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            load = CheckoutLoad(client, product_ids, items_per_cart)
+            # Прогрів: перші запити будують кеші і відкривають зʼєднання
+            await load.checkout(-1)
+            load.stats.clear()
+            elapsed = await load.run(users, concurrency)
+    finally:
+        await engine.dispose()
+
+    total = sum(len(stats.latencies_ms) for stats in load.stats.values())
+    return {
+        "config": {
+            "users": users,
+            "concurrency": concurrency,
+            "products": products,
+            "items_per_cart": items_per_cart,
+            "database": engine.dialect.name
+        },
+        "total": {
+            "requests": total,
+            "failed_checkouts": len(load.failed),
+            "seconds": round(elapsed, 3),
+            "rps": round(total / elapsed, 2)
+        },
+        "routes": {route: stats.summary(elapsed) for route, stats in load.stats.items()}
+    }
+
+
+def compare_with_baseline(report: dict, baseline: dict, latency_tolerance: Optional[float]) -> List[str]:
+    """Список регресій відносно baseline.
+
+    Кількість SQL-запитів детермінована і порівнюється завжди; латентність -
+    лише якщо задано latency_tolerance (вона залежить від машини).
+    """
+    regressions = []
+    for route, base in baseline.get("routes", {}).items():
+        current = report["routes"].get(route)
+        if current is None:
+            regressions.append(f"{route}: missing from the run")
+            continue
+        if current["errors"]:
+            regressions.append(f"{route}: {current['errors']} failed requests")
+        if base.get("max_queries") is not None and (current["max_queries"] or 0) > base["max_queries"]:
+            regressions.append(f"{route}: {current['max_queries']} queries per request > baseline {base['max_queries']}")
+        if latency_tolerance is not None and current["p95_ms"] > base["p95_ms"] * (1 + latency_tolerance):
+            regressions.append(
+                f"{route}: p95 {current['p95_ms']} ms > baseline {base['p95_ms']} ms (+{latency_tolerance:.0%})"
+            )
+    return regressions
+
+
+def format_report(report: dict) -> str:
+    lines = [f"{'route':<36} {'req':>6} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8}"]
+    for route, stats in report["routes"].items():
+        queries = stats["queries_per_request"]
+        lines.append(
+            f"{route:<36} {stats['requests']:>6} {stats['rps']:>9} {stats['p50_ms']:>9} "
+            f"{stats['p95_ms']:>9} {stats['p99_ms']:>9} {queries if queries is not None else '-':>8}"
+        )
+    total = report["total"]
+    lines.append(
+        f"total: {total['requests']} requests in {total['seconds']} s ({total['rps']} rps), "
+        f"{total['failed_checkouts']} failed checkouts"
+    )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--items-per-cart", type=int, default=3)
+    parser.add_argument("--database-url", help="за замовчуванням BENCH_DATABASE_URL або тимчасова SQLite")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="записати результат як новий baseline")
+    parser.add_argument("--compare", action="store_true", help="ненульовий код виходу при регресії")
+    parser.add_argument(
+        "--latency-tolerance", type=float, default=None,
+        help=f"порівнювати і p95 (частка, напр. {DEFAULT_LATENCY_TOLERANCE})"
+    )
+    parser.add_argument("--output", type=Path, help="зберегти звіт у JSON")
+    args = parser.parse_args(argv)
+
+    configure_database(args.database_url)
+    report = asyncio.run(run_checkout_benchmark(args.users, args.concurrency, args.products, args.items_per_cart))
+    print(format_report(report))
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+    if args.compare:
+        regressions = compare_with_baseline(report, json.loads(args.baseline.read_text()), args.latency_tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""Синтетичні дані для мікробенчмарків репозиторіїв (10^4 - 10^6 рядків).
+
+Рядки генеруються потоково і вставляються пачками через Core INSERT
+(executemany), тож памʼять не залежить від розміру таблиць. Дані
+детерміновані (seed), щоб прогони на різних машинах були порівнюваними.
+
+Форма даних для scale = N:
+- products, token_blacklist: N рядків;
+- users: N // 10, у кожного адреса, кошик з CART_LINES відкритими рядками
+  і одне замовлення з ORDER_LINES позиціями (order_items ~ 0.8 * N).
+Обсяг даних одного користувача не залежить від N - зростання латентності
+показує саме вплив розміру таблиць.
+"""
+import hashlib
+import random
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Iterable, Iterator, List
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from db.models import (
+    Cart,
+    Category,
+    Country,
+    Order,
+    OrderItem,
+    Product,
+    TokenBlackList,
+    User,
+    UserAddress
+)
+
+CATEGORIES = 50
+CART_LINES = 3
+ORDER_LINES = 5
+COUNTRY_CODE = "UA"
+
+ADJECTIVES = (
+    "red", "blue", "green", "black", "white", "silver", "golden", "compact", "portable", "wireless",
+    "smart", "classic", "modern", "vintage", "premium", "budget", "ultra", "mini", "pro", "eco"
+)
+NOUNS = (
+    "phone", "laptop", "tablet", "camera", "speaker", "headphones", "monitor", "keyboard", "mouse", "router",
+    "printer", "watch", "charger", "cable", "lamp", "chair", "desk", "backpack", "bottle", "kettle",
+    "blender", "toaster", "drill", "bicycle", "helmet", "jacket", "sneakers", "umbrella", "wallet", "mug"
+)
+WORDS = ADJECTIVES + NOUNS + (
+    "durable", "lightweight", "waterproof", "fast", "quiet", "stylish", "ergonomic", "powerful", "warranty", "gift"
+)
+
+
+def users_for(scale: int) -> int:
+    return max(scale // 10, 1)
+
+
+def token_hash(i: int) -> str:
+    return hashlib.sha256(f"token-{i}".encode()).hexdigest()
+
+
+def _products(scale: int, rng: random.Random) -> Iterator[dict]:
+    for i in range(1, scale + 1):
+        yield {
+            "id": i,
+            "name": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}",
+            "description": " ".join(rng.choices(WORDS, k=8)),
+            "price": rng.randint(100, 100_000) / 100,
+            "stock_quantity": rng.randint(0, 500),
+            "category_id": 1 + i % CATEGORIES,
+            "is_hot": False
+        }
+
+
+def _users(users: int) -> Iterator[dict]:
+    for i in range(1, users + 1):
+        yield {
+            "id": i,
+            "email": f"user{i}@bench.example",
+            "password": "x",
+            "login": f"user{i}",
+            "first_name": "Bench",
+            "last_name": "User"
+        }
+
+
+def _addresses(users: int) -> Iterator[dict]:
+    for i in range(1, users + 1):
+        yield {
+            "id": i,
+            "user_id": i,
+            "country_code": COUNTRY_CODE,
+            "city": "Kyiv",
+            "street": f"Street {i}",
+            "postal_code": "01001",
+            "is_default": True
+        }
+
+
+def _carts(users: int) -> Iterator[dict]:
+    for i in range(1, users + 1):
+        yield {"id": i, "user_id": i, "total_price": 0}
+
+
+def _orders(users: int, now: datetime) -> Iterator[dict]:
+    for i in range(1, users + 1):
+        yield {
+            "id": i,
+            "user_id": i,
+            "cart_id": i,
+            "address_id": i,
+            "total_price": 0,
+            "created_at": now
+        }
+
+
+def _order_items(users: int, products: int, rng: random.Random) -> Iterator[dict]:
+    for user_id in range(1, users + 1):
+        # Продукти одного користувача різні - не порушуємо унікальність відкритих рядків кошика
+        product_ids = rng.sample(range(1, products + 1), min(CART_LINES + ORDER_LINES, products))
+        for n, product_id in enumerate(product_ids):
+            yield {
+                "cart_id": user_id,
+                "order_id": None if n < CART_LINES else user_id,
+                "product_id": product_id,
+                "quantity": rng.randint(1, 3),
+                "price_at_purchase": 10
+            }
+
+
+def _tokens(scale: int, now: datetime) -> Iterator[dict]:
+    for i in range(scale):
+        yield {"token_hash": token_hash(i), "expires_at": now + timedelta(days=1)}
+
+
+async def _bulk_insert(conn: AsyncConnection, model, rows: Iterable[dict], chunk_size: int) -> int:
+    rows = iter(rows)
+    total = 0
+    while True:
+        chunk: List[dict] = list(islice(rows, chunk_size))
+        if not chunk:
+            return total
+        await conn.execute(insert(model), chunk)
+        total += len(chunk)
+
+
+async def generate_dataset(conn: AsyncConnection, scale: int, seed: int = 42, chunk_size: int = 5000) -> dict:
+    """Заповнити порожню схему даними масштабу scale. Повертає кількість рядків по таблицях"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    users = users_for(scale)
+
+    counts = {}
+    await conn.execute(insert(Country), [{"code": COUNTRY_CODE, "name": "Ukraine"}])
+    counts["categories"] = await _bulk_insert(
+        conn, Category, ({"id": i, "name": f"Category {i}"} for i in range(1, CATEGORIES + 1)), chunk_size
+    )
+    counts["products"] = await _bulk_insert(conn, Product, _products(scale, rng), chunk_size)
+    counts["users"] = await _bulk_insert(conn, User, _users(users), chunk_size)
+    counts["addresses"] = await _bulk_insert(conn, UserAddress, _addresses(users), chunk_size)
+    counts["carts"] = await _bulk_insert(conn, Cart, _carts(users), chunk_size)
+    counts["orders"] = await _bulk_insert(conn, Order, _orders(users, now), chunk_size)
+    counts["order_items"] = await _bulk_insert(conn, OrderItem, _order_items(users, scale, rng), chunk_size)
+    counts["token_blacklist"] = await _bulk_insert(conn, TokenBlackList, _tokens(scale, now), chunk_size)
+
+    if conn.dialect.name == "postgresql":
+        # Явні id у INSERT не рухають sequence - вирівнюємо, щоб подальші вставки не конфліктували
+        for table in ("categories", "products", "users", "addresses", "carts", "orders"):
+            await conn.exec_driver_sql(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"
+            )
+        await conn.exec_driver_sql("ANALYZE")
+    return counts
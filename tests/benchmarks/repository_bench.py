@@ -0,0 +1,258 @@
+"""Мікробенчмарки репозиторіїв залежно від розміру таблиць.
+
+Для кожного масштабу (кількість рядків у головній таблиці) база
+перестворюється, заповнюється data_generators і кожен цільовий метод
+викликається rounds разів - щоразу в новій сесії, як у окремому HTTP-запиті.
+
+    python -m tests.benchmarks.repository_bench --sizes 10000 100000 1000000
+    python -m tests.benchmarks.repository_bench --database-url postgresql+asyncpg://.../bench
+
+УВАГА: база очищується (drop_all) перед кожним масштабом - лише окрема база
+для бенчмарків. Без --database-url використовується тимчасова SQLite.
+
+Результат: таблиця статистик (у стилі pytest-benchmark), ASCII-графік
+медіани від розміру в log-log масштабі та JSON-файл. growth - нахил
+log(медіана) / log(рядки): ~0 - індексний доступ, ~1 - лінійне сканування.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+from tests.benchmarks.checkout_load import configure_database, percentile
+
+DEFAULT_SIZES = (10_000, 100_000)
+RESULTS_PATH = Path(__file__).with_name("repository_bench.json")
+
+CHART_HEIGHT = 12
+
+
+# Моделі й репозиторії імпортуються в функціях: URL бази задається до імпорту core.config
+
+def _target_search(rng: random.Random, scale: int):
+    from routers.repositories import ProductRepository
+    from tests.benchmarks.data_generators import NOUNS
+
+    async def call(session) -> None:
+        await ProductRepository(session).search(rng.choice(NOUNS), limit=20)
+    return call
+
+
+def _target_cart(rng: random.Random, scale: int):
+    from routers.repositories import CartRepository
+    from tests.benchmarks.data_generators import users_for
+
+    async def call(session) -> None:
+        await CartRepository(session).get_by_user_id(rng.randint(1, users_for(scale)))
+    return call
+
+
+def _target_orders(rng: random.Random, scale: int):
+    from routers.repositories import OrderRepository
+    from tests.benchmarks.data_generators import users_for
+
+    async def call(session) -> None:
+        await OrderRepository(session).get_by_user_id(rng.randint(1, users_for(scale)))
+    return call
+
+
+def _target_blacklist(rng: random.Random, scale: int):
+    from routers.repositories import TokenRepository
+    from tests.benchmarks.data_generators import token_hash
+
+    async def call(session) -> None:
+        # Навпіл: токени з чорного списку і відсутні (типовий випадок)
+        i = rng.randrange(scale)
+        await TokenRepository(session).is_blacklisted(token_hash(i if rng.random() < 0.5 else scale + i))
+    return call
+
+
+TARGETS: Dict[str, Callable[[random.Random, int], Callable[..., Awaitable[None]]]] = {
+    "ProductRepository.search": _target_search,
+    "CartRepository.get_by_user_id": _target_cart,
+    "OrderRepository.get_by_user_id": _target_orders,
+    "TokenRepository.is_blacklisted": _target_blacklist,
+}
+
+
+def summarize(timings_ms: List[float]) -> dict:
+    """Статистики в стилі pytest-benchmark (мілісекунди)"""
+    median = statistics.median(timings_ms)
+    return {
+        "rounds": len(timings_ms),
+        "min_ms": round(min(timings_ms), 4),
+        "max_ms": round(max(timings_ms), 4),
+        "mean_ms": round(statistics.fmean(timings_ms), 4),
+        "stddev_ms": round(statistics.stdev(timings_ms), 4) if len(timings_ms) > 1 else 0.0,
+        "median_ms": round(median, 4),
+        "p95_ms": round(percentile(timings_ms, 95), 4),
+        "ops": round(1000 / median, 1) if median else None
+    }
+
+
+def growth_exponent(sizes: Sequence[int], medians: Sequence[float]) -> Optional[float]:
+    """Нахил регресії log(median) від log(size): показник степеня зростання латентності"""
+    points = [(math.log(size), math.log(median)) for size, median in zip(sizes, medians) if median > 0]
+    if len(points) < 2:
+        return None
+    mean_x = statistics.fmean(x for x, _ in points)
+    mean_y = statistics.fmean(y for _, y in points)
+    denominator = sum((x - mean_x) ** 2 for x, _ in points)
+    if not denominator:
+        return None
+    return round(sum((x - mean_x) * (y - mean_y) for x, y in points) / denominator, 3)
+
+
+async def _measure(call, rounds: int, warmup: int) -> List[float]:
+    from db.database import AsyncSessionLocal
+
+    timings = []
+    for n in range(warmup + rounds):
+        async with AsyncSessionLocal() as session:
+            started = time.perf_counter()
+            await call(session)
+            elapsed = (time.perf_counter() - started) * 1000
+        if n >= warmup:
+            timings.append(elapsed)
+    return timings
+
+
+async def _prepare(scale: int, seed: int) -> dict:
+    from db.database import Base, engine
+    from routers.services import product_cache, product_search_index
+    from tests.benchmarks.data_generators import generate_dataset
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with engine.begin() as conn:
+        counts = await generate_dataset(conn, scale, seed)
+    # In-process індекси/кеші попереднього масштабу більше не відповідають базі
+    product_search_index.invalidate()
+    product_cache.clear()
+    return counts
+
+
+async def run_repository_benchmarks(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    rounds: int = 200,
+    warmup: int = 10,
+    targets: Optional[Sequence[str]] = None,
+    seed: int = 42
+) -> dict:
+    """Прогнати цільові методи для кожного масштабу і повернути звіт"""
+    from db.database import engine
+
+    targets = list(targets or TARGETS)
+    results: Dict[str, Dict[str, dict]] = {target: {} for target in targets}
+    datasets = {}
+    try:
+        for scale in sizes:
+            started = time.perf_counter()
+            datasets[str(scale)] = await _prepare(scale, seed)
+            datasets[str(scale)]["seed_seconds"] = round(time.perf_counter() - started, 2)
+            for target in targets:
+                call = TARGETS[target](random.Random(seed), scale)
+                results[target][str(scale)] = summarize(await _measure(call, rounds, warmup))
+    finally:
+        await engine.dispose()
+
+    return {
+        "config": {
+            "sizes": list(sizes),
+            "rounds": rounds,
+            "warmup": warmup,
+            "seed": seed,
+            "database": engine.dialect.name
+        },
+        "datasets": datasets,
+        "results": results,
+        "growth": {
+            target: growth_exponent(sizes, [by_size[str(size)]["median_ms"] for size in sizes])
+            for target, by_size in results.items()
+        }
+    }
+
+
+def format_table(report: dict) -> str:
+    lines = [
+        f"{'target':<32} {'rows':>9} {'min ms':>9} {'median ms':>10} {'mean ms':>9} "
+        f"{'p95 ms':>9} {'stddev':>8} {'ops/s':>9}"
+    ]
+    for target, by_size in report["results"].items():
+        for size, stats in by_size.items():
+            lines.append(
+                f"{target:<32} {size:>9} {stats['min_ms']:>9} {stats['median_ms']:>10} {stats['mean_ms']:>9} "
+                f"{stats['p95_ms']:>9} {stats['stddev_ms']:>8} {stats['ops']:>9}"
+            )
+        lines.append(f"{'':<32} growth {report['growth'][target]}")
+    return "\n".join(lines)
+
+
+def format_chart(report: dict, height: int = CHART_HEIGHT) -> str:
+    """ASCII-графік медіани від розміру таблиць (обидві осі логарифмічні)"""
+    sizes = report["config"]["sizes"]
+    series = {
+        target: [by_size[str(size)]["median_ms"] for size in sizes]
+        for target, by_size in report["results"].items()
+    }
+    values = [value for medians in series.values() for value in medians if value > 0]
+    if not values:
+        return ""
+    low, high = math.log10(min(values)), math.log10(max(values))
+    span = (high - low) or 1.0
+
+    column_width = 10
+    grid = [[" "] * (len(sizes) * column_width) for _ in range(height)]
+    markers = {}
+    for n, (target, medians) in enumerate(series.items()):
+        marker = "ABCDEFGHIJ"[n % 10]
+        markers[marker] = target
+        for i, median in enumerate(medians):
+            if median <= 0:
+                continue
+            row = height - 1 - round((math.log10(median) - low) / span * (height - 1))
+            col = i * column_width + column_width // 2 + n % 4 - 2
+            grid[row][col] = marker
+
+    lines = []
+    for r, row in enumerate(grid):
+        level = 10 ** (high - r * span / (height - 1))
+        lines.append(f"{level:>10.3f} ms |" + "".join(row))
+    lines.append(" " * 14 + "+" + "-" * (len(sizes) * column_width))
+    lines.append(" " * 15 + "".join(f"{size:^{column_width}}" for size in sizes) + "  rows")
+    lines.extend(f"  {marker} = {target}" for marker, target in markers.items())
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--target", action="append", choices=list(TARGETS), help="за замовчуванням усі")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="окрема база для бенчмарків (буде очищена)")
+    parser.add_argument("--output", type=Path, default=RESULTS_PATH)
+    args = parser.parse_args(argv)
+
+    configure_database(args.database_url)
+    report = asyncio.run(run_repository_benchmarks(
+        sorted(args.sizes), args.rounds, args.warmup, args.target, args.seed
+    ))
+    print(format_table(report))
+    print()
+    print(format_chart(report))
+    args.output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nresults written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
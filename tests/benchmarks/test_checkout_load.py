@@ -0,0 +1,34 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from tests.benchmarks.checkout_load import (
+    BASELINE_PATH,
+    compare_with_baseline,
+    configure_database,
+    format_report,
+    run_checkout_benchmark
+)
+
+# Навантажувальні тести довгі (argon2 на кожну реєстрацію) - лише на запит
+pytestmark = pytest.mark.skipif(
+    os.environ.get("RUN_BENCHMARKS") != "1",
+    reason="set RUN_BENCHMARKS=1 to run load benchmarks"
+)
+
+
+def test_checkout_has_no_query_regressions():
+    """Кількість SQL-запитів на роут checkout не більша, ніж у baseline"""
+    configure_database(None)
+    report = asyncio.run(run_checkout_benchmark(users=10, concurrency=5))
+    print(format_report(report))
+
+    tolerance = os.environ.get("BENCH_LATENCY_TOLERANCE")
+    regressions = compare_with_baseline(
+        report,
+        json.loads(BASELINE_PATH.read_text()),
+        float(tolerance) if tolerance else None
+    )
+    assert not regressions, "\n".join(regressions)
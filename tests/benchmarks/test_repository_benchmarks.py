@@ -0,0 +1,34 @@
+import asyncio
+import os
+
+import pytest
+
+from tests.benchmarks.checkout_load import configure_database
+from tests.benchmarks.repository_bench import TARGETS, format_chart, format_table, run_repository_benchmarks
+
+pytestmark = pytest.mark.skipif(
+    os.environ.get("RUN_BENCHMARKS") != "1",
+    reason="set RUN_BENCHMARKS=1 to run repository benchmarks"
+)
+
+
+@pytest.fixture(scope="module")
+def report():
+    """Один прогін на всі цілі: генерація даних дорожча за самі вимірювання"""
+    sizes = [int(size) for size in os.environ.get("BENCH_SIZES", "1000 10000").split()]
+    configure_database(None)
+    report = asyncio.run(run_repository_benchmarks(sizes, rounds=int(os.environ.get("BENCH_ROUNDS", "50"))))
+    print(format_table(report))
+    print(format_chart(report))
+    return report
+
+
+@pytest.mark.parametrize("target", list(TARGETS))
+def test_repository_latency_growth(report, target):
+    """Латентність росте з розміром таблиць не швидше за BENCH_MAX_GROWTH (якщо задано)"""
+    assert set(report["results"][target]) == {str(size) for size in report["config"]["sizes"]}
+
+    max_growth = os.environ.get("BENCH_MAX_GROWTH")
+    growth = report["growth"][target]
+    if max_growth and growth is not None:
+        assert growth <= float(max_growth), f"{target}: latency grows as rows^{growth}"
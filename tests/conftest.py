@@ -0,0 +1,57 @@
+import asyncio
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Налаштування читаються при першому імпорті core.config - задаємо їх до імпорту застосунку.
+# Тести ніколи не беруть SQLALCHEMY_DATABASE_URL з оточення чи .env: схема перестворюється.
+os.environ["SQLALCHEMY_DATABASE_URL"] = (
+    os.environ.get("TEST_DATABASE_URL")
+    or f"sqlite+aiosqlite:///{Path(tempfile.mkdtemp(prefix='shop-tests-')) / 'test.db'}"
+)
+os.environ["DB_ECHO"] = "false"
+os.environ["QUERY_COUNTER_ENABLED"] = "true"
+# Роут, що перевищив @query_budget, валить тест
+os.environ["QUERY_BUDGET_STRICT"] = "true"
+
+
+@pytest.fixture
+def api(caplog):
+    """Запуск сценарію проти застосунку: чиста схема, lifespan і скинуті кеші воркера.
+
+        def test_x(api):
+            async def scenario(client): ...
+            api(scenario)
+
+    Перевищення бюджету після commit відповідь не змінює, лише логується -
+    такий лог теж валить тест (крім allow_overruns=True).
+    """
+    import httpx
+    import main
+    from db.database import Base, engine
+    from routers.services import invalidation_bus
+
+    async def run(scenario):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        try:
+            async with main.lifespan(main.app):
+                # Кеші процесу пережили попередній тест - скидаємо як після перепідключення шини
+                await invalidation_bus.reset()
+                transport = httpx.ASGITransport(app=main.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    return await scenario(client)
+        finally:
+            await engine.dispose()
+
+    def runner(scenario, allow_overruns: bool = False):
+        with caplog.at_level(logging.ERROR, logger="db.query_counter"):
+            result = asyncio.run(run(scenario))
+        overruns = [record.getMessage() for record in caplog.records if record.name == "db.query_counter"]
+        assert allow_overruns or not overruns, overruns
+        return result
+
+    return runner
@@ -0,0 +1,56 @@
+"""Спільні кроки сценаріїв для тестів роутів (див. фікстуру api у conftest)"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+from db.database import AsyncSessionLocal
+from db.models import Category, Country, Product
+from routers.services import CacheEntity, invalidation_bus
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+async def seed_catalog(products: List[Tuple[str, float, int]], categories: int = 2) -> List[int]:
+    """Категорії і продукти (назва, ціна, залишок) напряму в базу. Повертає ID продуктів"""
+    async with AsyncSessionLocal() as session:
+        session.add_all([Category(name=f"Category {i}") for i in range(1, categories + 1)])
+        await session.flush()
+        rows = [
+            Product(name=name, description=f"{name} description", price=price,
+                    stock_quantity=stock, category_id=1 + n % categories)
+            for n, (name, price, stock) in enumerate(products)
+        ]
+        session.add_all(rows)
+        await session.commit()
+        ids = [product.id for product in rows]
+    # Індекси пошуку/автодоповнення будувалися на порожній базі
+    await invalidation_bus.dispatch(CacheEntity.PRODUCT, None)
+    return ids
+
+
+async def seed_country(code: str = "UA") -> None:
+    async with AsyncSessionLocal() as session:
+        session.add(Country(code=code, name=code))
+        await session.commit()
+
+
+async def login(client, name: str = "alice") -> Dict[str, str]:
+    """Зареєструвати користувача і повернути заголовок авторизації"""
+    response = await client.post("/auth/register", json={
+        "login": name, "first_name": "Test", "last_name": "User",
+        "email": f"{name}@example.com", "password": "secret123"
+    })
+    assert response.status_code == 200, response.text
+    response = await client.post("/auth/login", data={"username": name, "password": "secret123"})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def make_hot(client, product_id: int, shards: Optional[int] = None) -> None:
+    params = {"shards": shards} if shards else {}
+    response = await client.post(f"/saller/products/{product_id}/hot", params=params)
+    assert response.status_code == 200, response.text
+
+
+def query_count(response) -> int:
+    """Кількість SQL-запитів роута із заголовка Server-Timing"""
+    return int(_QUERIES.search(response.headers["server-timing"]).group(1))
@@ -0,0 +1,82 @@
+from sqlalchemy import event, select
+
+from db.database import AsyncSessionLocal, engine
+from db.models import Product
+from routers.repositories.base_repository import BaseRepository
+from tests.helpers import seed_catalog
+
+
+def rows(*skus, price=10):
+    return [
+        {"name": f"Product {sku}", "price": price, "stock_quantity": 1, "category_id": 1, "sku": sku}
+        for sku in skus
+    ]
+
+
+async def products():
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(Product.sku, Product.price).order_by(Product.sku))
+        return {sku: float(price) for sku, price in result.all()}
+
+
+def test_bulk_create_in_chunks(api):
+    async def scenario(client):
+        await seed_catalog([])
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            if statement.startswith("INSERT"):
+                statements.append(statement)
+
+        async with AsyncSessionLocal() as session:
+            repo = BaseRepository(Product, session)
+            event.listen(engine.sync_engine, "before_cursor_execute", record)
+            try:
+                ids = await repo.bulk_create(rows("A", "B", "C", "D", "E"), returning=True, chunk_size=2)
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", record)
+            assert await repo.bulk_create(rows("F")) == 1
+            assert await repo.bulk_create([]) == 0
+            await session.commit()
+
+        assert len(statements) == 3
+        assert len(set(ids)) == 5
+        assert list(await products()) == ["A", "B", "C", "D", "E", "F"]
+
+    api(scenario)
+
+
+def test_bulk_upsert_updates_and_skips_conflicts(api):
+    async def scenario(client):
+        await seed_catalog([])
+        async with AsyncSessionLocal() as session:
+            repo = BaseRepository(Product, session)
+            await repo.bulk_create(rows("A", "B"))
+
+            ids = await repo.bulk_upsert(
+                rows("B", "C", price=20), index_elements=["sku"], update_fields=["price"], returning=True
+            )
+            assert len(ids) == 2
+            # Порожній update_fields - ON CONFLICT DO NOTHING
+            assert await repo.bulk_upsert(rows("A", "D", price=30), index_elements=["sku"], update_fields=[]) == 1
+            await session.commit()
+
+        assert await products() == {"A": 10, "B": 20, "C": 20, "D": 30}
+
+    api(scenario)
+
+
+def test_bulk_delete(api):
+    async def scenario(client):
+        await seed_catalog([])
+        async with AsyncSessionLocal() as session:
+            repo = BaseRepository(Product, session)
+            ids = await repo.bulk_create(rows("A", "B", "C"), returning=True)
+            assert sorted(await repo.bulk_delete(ids[:2] + [999], returning=True, chunk_size=1)) == sorted(ids[:2])
+            assert await repo.bulk_delete([ids[2], 999]) == 1
+            assert await repo.bulk_delete([]) == 0
+            await session.commit()
+
+        assert await products() == {}
+
+    api(scenario)
@@ -0,0 +1,84 @@
+import pytest
+
+from core import cache as cache_module
+from core.cache import TTLCache
+from tests.helpers import query_count, seed_catalog
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = TTLCache("test", ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=30)
+
+    clock.now += 10
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert len(cache) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_non_positive_ttl_is_not_stored(clock):
+    cache = TTLCache("test", ttl=10)
+    cache.set("a", 1, ttl=0)
+    assert "a" not in cache
+    # Перевірка через in не рахується в hit/miss
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_least_recently_used_is_evicted(clock):
+    cache = TTLCache("test", maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_invalidation(clock):
+    cache = TTLCache("test")
+    for key in range(5):
+        cache.set(key, {"id": key, "even": key % 2 == 0})
+
+    assert cache.pop(1) == {"id": 1, "even": False}
+    assert cache.pop(1) is None
+    assert cache.evict_if(lambda key, value: value["even"]) == 3
+    assert len(cache) == 1
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_product_cache_is_invalidated_by_update(api):
+    async def scenario(client):
+        lamp, = await seed_catalog([("Lamp", 10, 5)])
+
+        response = await client.get(f"/products/{lamp}")
+        assert query_count(response) == 1
+        response = await client.get(f"/products/{lamp}")
+        assert query_count(response) == 0
+
+        response = await client.put(f"/saller/products/{lamp}", json={"name": "Lamp", "price": 15, "category_id": 1})
+        assert response.status_code == 200, response.text
+        response = await client.get(f"/products/{lamp}")
+        assert float(response.json()["price"]) == 15
+        assert query_count(response) == 1
+
+    api(scenario)
@@ -0,0 +1,135 @@
+from decimal import Decimal
+
+from sqlalchemy import update
+
+from db.database import AsyncSessionLocal
+from db.models import Cart
+from routers.repositories import CartRepository
+from routers.services.cart_totals import reconcile_cart_totals
+from tests.helpers import login, seed_catalog
+
+
+def total(cart) -> Decimal:
+    return Decimal(str(cart["total_price"]))
+
+
+def quantities(cart) -> dict:
+    return {item["product"]["id"]: item["quantity"] for item in cart["items"]}
+
+
+def recomputed(cart) -> Decimal:
+    """Повний перерахунок суми кошика по його рядках"""
+    return sum(
+        (Decimal(str(item["price_at_purchase"])) * item["quantity"] for item in cart["items"]),
+        Decimal(0)
+    )
+
+
+def test_incremental_total_matches_full_recompute(api):
+    async def scenario(client):
+        lamp, desk = await seed_catalog([("Lamp", 10.25, 10), ("Desk", 30, 10)])
+        auth = await login(client)
+
+        async def check():
+            cart = (await client.get("/cart/", headers=auth)).json()
+            assert total(cart) == recomputed(cart)
+            async with AsyncSessionLocal() as session:
+                assert await CartRepository(session).find_total_drift(10) == []
+            return cart
+
+        response = await client.post("/cart/item", json={"product_id": lamp, "quantity": 2}, headers=auth)
+        lamp_line = response.json()["id"]
+        await client.post("/cart/item", json={"product_id": desk, "quantity": 1}, headers=auth)
+        await client.post("/cart/item", json={"product_id": lamp, "quantity": 1}, headers=auth)
+        assert total(await check()) == Decimal("60.75")
+
+        response = await client.put(f"/cart/item/{lamp_line}", params={"quantity": -2}, headers=auth)
+        assert response.status_code == 200, response.text
+        assert total(await check()) == Decimal("40.25")
+
+        response = await client.delete(f"/cart/item/{lamp_line}", headers=auth)
+        assert response.status_code == 200, response.text
+        assert total(await check()) == 30
+
+        await client.delete("/cart/", headers=auth)
+        assert total(await check()) == 0
+
+    api(scenario)
+
+
+def test_reconcile_fixes_drifted_total(api):
+    async def scenario(client):
+        lamp, = await seed_catalog([("Lamp", 10, 10)])
+        auth = await login(client)
+        await client.post("/cart/item", json={"product_id": lamp, "quantity": 3}, headers=auth)
+        async with AsyncSessionLocal() as session:
+            await session.execute(update(Cart).values(total_price=1))
+            await session.commit()
+
+        await reconcile_cart_totals()
+        cart = (await client.get("/cart/", headers=auth)).json()
+        assert total(cart) == 30
+
+    api(scenario)
+
+
+def test_batch_add_sums_repeats_and_totals(api):
+    async def scenario(client):
+        lamp, desk = await seed_catalog([("Lamp", 10.5, 5), ("Desk", 30, 5)])
+        auth = await login(client)
+        response = await client.post("/cart/item", json={"product_id": lamp, "quantity": 1}, headers=auth)
+        assert response.status_code == 200, response.text
+
+        response = await client.post("/cart/items", headers=auth, json=[
+            {"product_id": lamp, "quantity": 1},
+            {"product_id": desk, "quantity": 2},
+            {"product_id": lamp, "quantity": 1}
+        ])
+        assert response.status_code == 200, response.text
+        cart = response.json()
+        assert quantities(cart) == {lamp: 3, desk: 2}
+        assert total(cart) == Decimal("91.5")
+
+    api(scenario)
+
+
+def test_batch_add_rejects_whole_batch_over_stock(api):
+    async def scenario(client):
+        lamp, desk = await seed_catalog([("Lamp", 10, 5), ("Desk", 30, 1)])
+        auth = await login(client)
+        await client.post("/cart/item", json={"product_id": desk, "quantity": 1}, headers=auth)
+
+        response = await client.post("/cart/items", headers=auth, json=[
+            {"product_id": lamp, "quantity": 2},
+            {"product_id": desk, "quantity": 1}
+        ])
+        assert response.status_code == 400
+        assert "'Desk' (requested 2, available 1)" in response.json()["detail"]
+
+        response = await client.post("/cart/items", headers=auth, json=[{"product_id": 999, "quantity": 1}])
+        assert response.status_code == 404
+        response = await client.post("/cart/items", headers=auth, json=[])
+        assert response.status_code == 400
+
+        # Жоден товар з відхилених пачок не доданий
+        cart = (await client.get("/cart/", headers=auth)).json()
+        assert quantities(cart) == {desk: 1}
+        assert total(cart) == 30
+
+    api(scenario)
+
+
+def test_batch_add_counts_holds_of_other_carts(api):
+    async def scenario(client):
+        lamp, = await seed_catalog([("Lamp", 10, 3)])
+        alice = await login(client, "alice")
+        bobby = await login(client, "bobby")
+        response = await client.post("/cart/items", headers=alice, json=[{"product_id": lamp, "quantity": 2}])
+        assert response.status_code == 200, response.text
+
+        response = await client.post("/cart/items", headers=bobby, json=[{"product_id": lamp, "quantity": 2}])
+        assert response.status_code == 400
+        response = await client.post("/cart/items", headers=bobby, json=[{"product_id": lamp, "quantity": 1}])
+        assert response.status_code == 200, response.text
+
+    api(scenario)
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+from db.database import AsyncSessionLocal
+from db.models import Category
+from routers.services import CacheEntity, invalidation_bus, product_cache
+from routers.services.category_registry import CategoryRegistry
+from tests.helpers import query_count, seed_catalog
+
+
+def test_rename_and_remove_keep_name_lookup_consistent():
+    registry = CategoryRegistry()
+    registry.load([SimpleNamespace(id=2, name="Lamps"), SimpleNamespace(id=1, name="Desks")])
+    assert [category.id for category in registry.all()] == [1, 2]
+
+    registry.put(2, "Lighting")
+    assert registry.find_by_name("Lamps") is None
+    assert registry.find_by_name("Lighting") == 2
+
+    registry.remove(2)
+    assert registry.get(2) is None and registry.find_by_name("Lighting") is None
+    assert registry.has_all([1]) and not registry.has_all([1, 2])
+
+
+def test_registry_reloads_after_bus_event(api):
+    async def scenario(client):
+        lamp, = await seed_catalog([("Lamp", 10, 1)])
+        # Реєстр завантажено в lifespan, ще до появи категорій
+        response = await client.get("/categories/")
+        assert response.json() == []
+
+        await invalidation_bus.dispatch(CacheEntity.CATEGORY, None)
+        response = await client.get("/categories/")
+        assert [category["name"] for category in response.json()] == ["Category 1", "Category 2"]
+        assert query_count(response) == 0
+        await client.get(f"/products/{lamp}")
+        assert lamp in product_cache
+
+        # Категорію змінив інший воркер: база вже нова, реєстр ще старий
+        async with AsyncSessionLocal() as session:
+            category = await session.get(Category, 1)
+            category.name = "Lighting"
+            await session.commit()
+        response = await client.get("/categories/1")
+        assert response.json()["name"] == "Category 1"
+
+        await invalidation_bus.dispatch(CacheEntity.CATEGORY, [1])
+        response = await client.get("/categories/1")
+        assert response.json()["name"] == "Lighting"
+        # Знімки продуктів містять категорію - кеш продуктів теж скинуто
+        assert lamp not in product_cache
+
+    api(scenario)
@@ -0,0 +1,54 @@
+from decimal import Decimal
+
+from db.shemas import CategoryResponse, ProductResponse
+from routers.calculation.comparison_calculations import COMPARED_ATTRIBUTES, comparison_matrix
+from tests.helpers import login, seed_catalog
+
+
+def product(product_id: int, **fields) -> ProductResponse:
+    data = dict(name=f"Product {product_id}", price=Decimal("10.00"), category_id=1, stock_quantity=5,
+                category=CategoryResponse(id=1, name="Lamps"))
+    data.update(fields)
+    return ProductResponse(id=product_id, **data)
+
+
+def rows(attributes) -> dict:
+    return {attribute.name: (attribute.values, attribute.differs) for attribute in attributes}
+
+
+def test_matrix_rows_follow_attribute_order_and_product_columns():
+    matrix = comparison_matrix([product(1), product(2, price=Decimal("12.50"), sku="B-2")])
+    assert [attribute.name for attribute in matrix] == list(COMPARED_ATTRIBUTES)
+
+    by_name = rows(matrix)
+    assert by_name["price"] == ([10.0, 12.5], True)
+    assert by_name["sku"] == ([None, "B-2"], True)
+    assert by_name["category"] == (["Lamps", "Lamps"], False)
+    assert by_name["stock_quantity"] == ([5, 5], False)
+
+
+def test_matrix_category_without_relation_and_single_product():
+    by_name = rows(comparison_matrix([product(1, category=None)]))
+    assert by_name["category"] == ([None], False)
+    assert not any(differs for _, differs in by_name.values())
+    assert comparison_matrix([])[0].values == []
+
+
+def test_matrix_route(api):
+    async def scenario(client):
+        lamp, desk = await seed_catalog([("Lamp", 10, 5), ("Desk", 30, 0)])
+        auth = await login(client)
+        for product_id in (lamp, desk, lamp):
+            response = await client.post(f"/products/{product_id}/comparison", headers=auth)
+            assert response.status_code == 200, response.text
+
+        response = await client.get("/products/comparison/matrix", headers=auth)
+        assert response.status_code == 200, response.text
+        matrix = response.json()
+        # Повторне додавання не дублює продукт
+        assert [item["id"] for item in matrix["products"]] == [lamp, desk]
+        by_name = {row["name"]: row for row in matrix["attributes"]}
+        assert by_name["stock_quantity"]["values"] == [5, 0]
+        assert by_name["category"] == {"name": "category", "values": ["Category 1", "Category 2"], "differs": True}
+
+    api(scenario)
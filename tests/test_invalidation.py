@@ -0,0 +1,106 @@
+import asyncio
+import json
+import logging
+
+from db.database import AsyncSessionLocal
+from db.models import Product
+from routers.services import product_cache, product_search_index, product_suggest_index
+from routers.services.invalidation import MAX_PAYLOAD_BYTES, CacheEntity, InvalidationBus, invalidation_bus
+from tests.helpers import seed_catalog
+
+
+def test_dispatch_calls_handlers_of_entity():
+    bus = InvalidationBus("test")
+    calls = []
+
+    async def async_handler(ids):
+        calls.append(("async", ids))
+
+    bus.register(CacheEntity.PRODUCT, lambda ids: calls.append(("sync", ids)))
+    bus.register(CacheEntity.PRODUCT, async_handler)
+    bus.register(CacheEntity.USER, lambda ids: calls.append(("user", ids)))
+
+    asyncio.run(bus.dispatch(CacheEntity.PRODUCT, [1, 2]))
+    assert calls == [("sync", [1, 2]), ("async", [1, 2])]
+
+    calls.clear()
+    asyncio.run(bus.dispatch(CacheEntity.TOKEN, ["digest"]))
+    assert calls == []
+
+
+def test_failing_handler_does_not_stop_others(caplog):
+    bus = InvalidationBus("test")
+    calls = []
+
+    def broken(ids):
+        raise RuntimeError("boom")
+
+    bus.register(CacheEntity.CATEGORY, broken)
+    bus.register(CacheEntity.CATEGORY, calls.append)
+    with caplog.at_level(logging.ERROR):
+        asyncio.run(bus.dispatch(CacheEntity.CATEGORY, [3]))
+
+    assert calls == [[3]]
+    assert "Invalidation handler for category failed" in caplog.text
+
+
+def test_reset_dispatches_none_to_every_entity():
+    bus = InvalidationBus("test")
+    calls = []
+    bus.register(CacheEntity.PRODUCT, lambda ids: calls.append(("product", ids)))
+    bus.register(CacheEntity.USER, lambda ids: calls.append(("user", ids)))
+
+    asyncio.run(bus.reset())
+    assert sorted(calls) == [("product", None), ("user", None)]
+
+
+def test_payloads_are_split_under_notify_limit():
+    ids = list(range(100_000, 105_000))
+    payloads = list(InvalidationBus._payloads(CacheEntity.PRODUCT, ids))
+
+    assert len(payloads) > 1
+    assert all(len(payload) < 8000 for payload in payloads)
+    messages = [json.loads(payload) for payload in payloads]
+    assert {message["entity"] for message in messages} == {"product"}
+    assert [i for message in messages for i in message["ids"]] == ids
+    assert len(payloads[0]) > MAX_PAYLOAD_BYTES - 100
+
+    assert list(InvalidationBus._payloads(CacheEntity.USER, None)) == ['{"entity":"user","ids":null}']
+
+
+def test_notify_payload_is_queued_and_malformed_skipped(caplog):
+    bus = InvalidationBus("test")
+    bus._queue = asyncio.Queue()
+    bus._on_notify(None, 1, "test", '{"entity": "token", "ids": ["a"]}')
+    with caplog.at_level(logging.WARNING):
+        bus._on_notify(None, 1, "test", '{"entity": "unknown", "ids": null}')
+        bus._on_notify(None, 1, "test", "not json")
+
+    assert bus._queue.qsize() == 1
+    assert bus._queue.get_nowait() == (CacheEntity.TOKEN, ["a"])
+    assert caplog.text.count("Malformed invalidation message") == 2
+
+
+def test_product_event_refreshes_cache_and_indexes(api):
+    async def scenario(client):
+        lamp, desk = await seed_catalog([("Lamp", 10, 1), ("Desk", 20, 1)])
+        await client.get(f"/products/{lamp}")
+        # Індекс пошуку будується при першому пошуку
+        response = await client.get("/products/search", params={"q": "lamp"})
+        assert [product["id"] for product in response.json()] == [lamp]
+        assert lamp in product_cache
+
+        # Інший воркер видалив стіл і перейменував лампу
+        async with AsyncSessionLocal() as session:
+            await session.delete(await session.get(Product, desk))
+            (await session.get(Product, lamp)).name = "Floor light"
+            await session.commit()
+
+        await invalidation_bus.dispatch(CacheEntity.PRODUCT, [lamp, desk])
+        assert lamp not in product_cache
+        assert product_search_index.search("light") == [lamp]
+        assert product_search_index.search("desk") == []
+        assert product_suggest_index.suggest("flo") == [(lamp, "Floor light")]
+        assert product_suggest_index.suggest("des") == []
+
+    api(scenario)
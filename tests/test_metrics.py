@@ -0,0 +1,99 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsMiddleware,
+    Registry,
+    http_request_duration_seconds,
+    http_requests_total,
+    registry
+)
+
+
+def test_counter_and_gauge_rendering():
+    registry = Registry()
+    requests = Counter("requests_total", "Requests", ("method", "status"), registry=registry)
+    in_flight = Gauge("in_flight", "In flight", registry=registry)
+    requests.labels("GET", 200).inc()
+    requests.labels("GET", 200).inc(2)
+    requests.labels("POST", 500).inc(0.5)
+    in_flight.inc()
+    in_flight.dec(3)
+
+    assert registry.render() == (
+        "# HELP requests_total Requests\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{method="GET",status="200"} 3\n'
+        'requests_total{method="POST",status="500"} 0.5\n'
+        "# HELP in_flight In flight\n"
+        "# TYPE in_flight gauge\n"
+        "in_flight -2\n"
+    )
+
+
+def test_metric_without_labels_is_exported_as_zero():
+    registry = Registry()
+    Counter("jobs_total", "Jobs", registry=registry)
+    assert "jobs_total 0\n" in registry.render()
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = Histogram("latency_seconds", "Latency", ("route",), buckets=(1.0, 0.1), registry=registry)
+    for value in (0.05, 0.1, 0.5, 3):
+        latency.labels("/products").observe(value)
+
+    lines = registry.render().splitlines()
+    assert lines[2:] == [
+        'latency_seconds_bucket{route="/products",le="0.1"} 2',
+        'latency_seconds_bucket{route="/products",le="1"} 3',
+        'latency_seconds_bucket{route="/products",le="+Inf"} 4',
+        'latency_seconds_sum{route="/products"} 3.65',
+        'latency_seconds_count{route="/products"} 4'
+    ]
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    Counter("errors_total", "Errors", ("message",), registry=registry).labels('say "hi"\\\n').inc()
+    assert 'errors_total{message="say \\"hi\\"\\\\\\n"} 1' in registry.render()
+
+
+def test_wrong_label_count():
+    counter = Counter("x_total", "X", ("a", "b"), registry=Registry())
+    with pytest.raises(ValueError):
+        counter.labels("only-one")
+
+
+def test_collectors_run_on_every_scrape():
+    registry = Registry()
+    gauge = Gauge("pool_size", "Pool size", registry=registry)
+    sizes = iter([5, 7])
+    registry.add_collector(lambda: gauge.set(next(sizes)))
+    assert "pool_size 5\n" in registry.render()
+    assert "pool_size 7\n" in registry.render()
+
+
+def test_middleware_labels_by_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics-test/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    before = http_requests_total.labels("GET", "/metrics-test/{item_id}", 200).value
+    with TestClient(app) as client:
+        assert client.get("/metrics-test/1").status_code == 200
+        assert client.get("/metrics-test/2").status_code == 200
+        assert client.get("/missing").status_code == 404
+
+    assert http_requests_total.labels("GET", "/metrics-test/{item_id}", 200).value == before + 2
+    assert http_request_duration_seconds.labels("GET", "/metrics-test/{item_id}").count >= 2
+    assert http_requests_total.labels("GET", "<unmatched>", 404).value >= 1
+    # Конкретні ID не створюють окремих часових рядів
+    assert 'route="/metrics-test/1"' not in registry.render()
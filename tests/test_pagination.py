@@ -0,0 +1,30 @@
+import base64
+
+import pytest
+
+from routers.calculation.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    position = {"price": "19.99", "id": 42, "name": "Лампа"}
+    cursor = encode_cursor(position)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == position
+
+
+@pytest.mark.parametrize("size", range(1, 5))
+def test_cursor_without_padding_decodes_for_any_length(size):
+    position = {"id": "x" * size}
+    assert decode_cursor(encode_cursor(position)) == position
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    base64.urlsafe_b64encode(b"{broken").decode(),
+    # Валідний JSON, але не обʼєкт
+    base64.urlsafe_b64encode(b"[1, 2]").decode().rstrip("=")
+])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
@@ -0,0 +1,30 @@
+import csv
+import io
+import json
+
+from sqlalchemy import update
+
+from db.database import AsyncSessionLocal
+from db.models import ProductStockShard
+from tests.helpers import make_hot, seed_catalog
+
+
+def test_export_uses_live_stock_of_hot_products(api):
+    async def scenario(client):
+        hot, lamp = await seed_catalog([("Hot phone", 10, 8), ("Lamp", 20, 3)])
+        await make_hot(client, hot, shards=4)
+        # Розпродаж: шарди вичерпані, products.stock_quantity ребалансер ще не оновив
+        async with AsyncSessionLocal() as session:
+            await session.execute(update(ProductStockShard).values(quantity=0))
+            await session.commit()
+
+        response = await client.get("/products/export")
+        assert response.status_code == 200
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert {row["id"]: row["stock_quantity"] for row in rows} == {hot: 0, lamp: 3}
+
+        response = await client.get("/products/export", params={"format": "csv"})
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [(row["name"], row["stock_quantity"]) for row in rows] == [("Hot phone", "0"), ("Lamp", "3")]
+
+    api(scenario)
@@ -0,0 +1,210 @@
+import asyncio
+import codecs
+from types import SimpleNamespace
+from typing import AsyncIterator, Iterable, List
+
+import pytest
+
+from routers.services.product_import import (
+    ImportFormatError,
+    ProductImporter,
+    iter_csv_rows,
+    iter_lines,
+    iter_ndjson_rows,
+    validate_batch
+)
+
+
+async def _stream(items: Iterable) -> AsyncIterator:
+    for item in items:
+        yield item
+
+
+async def _collect(iterator: AsyncIterator) -> list:
+    return [item async for item in iterator]
+
+
+def lines_of(chunks: List[bytes], max_line_bytes: int = 1024) -> List[str]:
+    return asyncio.run(_collect(iter_lines(_stream(chunks), max_line_bytes)))
+
+
+def csv_rows(lines: List[str], max_record_bytes: int = 1024) -> list:
+    return asyncio.run(_collect(iter_csv_rows(_stream(lines), max_record_bytes)))
+
+
+def ndjson_rows(lines: List[str]) -> list:
+    return asyncio.run(_collect(iter_ndjson_rows(_stream(lines))))
+
+
+def test_lines_split_across_chunks():
+    assert lines_of([b"na", b"me\r\nsec", b"ond\n", b"third"]) == ["name", "second", "third"]
+
+
+def test_bom_split_between_chunks_is_stripped():
+    bom = codecs.BOM_UTF8
+    assert lines_of([bom[:1], bom[1:], b"name\n"]) == ["name"]
+    assert lines_of([bom + b"name"]) == ["name"]
+
+
+def test_bom_only_stripped_at_start():
+    assert lines_of([b"a\n", codecs.BOM_UTF8 + b"b\n"]) == ["a", "\ufeffb"]
+
+
+def test_line_limit_counts_bytes():
+    # 4 символи, але 8 байтів
+    assert lines_of(["їїїї\n".encode()], max_line_bytes=8) == ["їїїї"]
+    with pytest.raises(ImportFormatError, match="longer than 7 bytes"):
+        lines_of(["їїїї\n".encode()], max_line_bytes=7)
+
+
+def test_unterminated_line_over_limit_fails_before_end_of_stream():
+    with pytest.raises(ImportFormatError):
+        lines_of([b"x" * 10, b"x" * 10], max_line_bytes=15)
+
+
+def test_multibyte_character_split_between_chunks():
+    data = "ціна\n".encode()
+    assert lines_of([data[:1], data[1:]]) == ["ціна"]
+
+
+def test_invalid_utf8_reports_line_number():
+    with pytest.raises(ImportFormatError, match="line 2"):
+        lines_of([b"ok\n\xff\xfe\n"])
+
+
+def test_csv_quoted_field_spans_lines():
+    rows = csv_rows(['name,description,price', '"Lamp","first', 'second ""quoted""",10'])
+    assert rows == [({"name": "Lamp", "description": 'first\nsecond "quoted"', "price": "10"}, None)]
+
+
+def test_csv_empty_cells_are_omitted():
+    assert csv_rows(["name,sku,price", "Lamp,,10"]) == [({"name": "Lamp", "price": "10"}, None)]
+
+
+def test_csv_column_count_mismatch_is_row_error():
+    rows = csv_rows(["name,price", "Lamp", "Desk,20"])
+    assert rows == [(None, "Expected 2 columns, got 1"), ({"name": "Desk", "price": "20"}, None)]
+
+
+def test_csv_unterminated_quote():
+    assert csv_rows(["name,price", '"Lamp,10']) == [(None, "Unterminated quoted field at end of file")]
+
+
+def test_csv_record_limit_counts_bytes_of_all_lines():
+    lines = ["name", '"ї', "ї", 'ї"']
+    # "ї = 3 байти, ї = 2, ї" = 3, плюс переноси між частинами
+    assert csv_rows(lines, max_record_bytes=11) == [({"name": "ї\nї\nї"}, None)]
+    with pytest.raises(ImportFormatError, match="longer than 6 bytes"):
+        csv_rows(lines, max_record_bytes=6)
+
+
+def test_ndjson_rows():
+    rows = ndjson_rows(['{"name": "Lamp"}', "", "[1, 2]", "{broken"])
+    assert rows[0] == ({"name": "Lamp"}, None)
+    assert rows[1] == (None, "Expected a JSON object")
+    assert rows[2][0] is None and rows[2][1].startswith("Invalid JSON")
+    assert len(rows) == 3
+
+
+def test_validate_batch_keeps_indexes_of_valid_rows():
+    products, errors = validate_batch([
+        {"name": "Lamp", "price": "10", "category_id": 1},
+        {"name": "Desk", "price": "abc", "category_id": 1, "stock_quantity": -1},
+        {"price": "5", "category_id": 1},
+        {"name": "Chair", "price": "20", "category_id": 2, "sku": "CH-1"}
+    ])
+    assert sorted(products) == [0, 3]
+    assert products[3].sku == "CH-1"
+    assert sorted(errors) == [1, 2]
+    assert {message.split(":")[0] for message in errors[1]} == {"price", "stock_quantity"}
+    assert errors[2] == ["name: Field required"]
+
+
+def test_validate_batch_all_valid():
+    products, errors = validate_batch([{"name": "Lamp", "price": "10", "category_id": 1}])
+    assert errors == {}
+    assert products[0].stock_quantity == 0
+
+
+class FakeProductRepository:
+    def __init__(self):
+        self.upserted = []
+        self.created = []
+
+    async def upsert_by_sku(self, rows):
+        self.upserted.extend(rows)
+
+    async def bulk_create(self, rows):
+        self.created.extend(rows)
+
+
+class FakeUnitOfWork:
+    def __init__(self, job):
+        self.job = job
+        self.commits = []
+
+    async def commit(self):
+        self.commits.append(self.job.rows_processed)
+
+
+def _job(rows_processed: int = 0):
+    return SimpleNamespace(rows_processed=rows_processed, rows_imported=0, rows_failed=0, errors=[])
+
+
+def _product_rows(count: int) -> list:
+    return [
+        ({"name": f"Product {i}", "price": "10", "category_id": 1, "sku": f"SKU-{i}"}, None)
+        for i in range(1, count + 1)
+    ]
+
+
+def _run_import(job, rows, batch_size=2, max_errors=10, category_ids=frozenset({1})):
+    repo = FakeProductRepository()
+    uow = FakeUnitOfWork(job)
+    importer = ProductImporter(job, repo, uow, set(category_ids), batch_size, max_errors)
+    asyncio.run(importer.run(_stream(rows)))
+    return repo, uow
+
+
+def test_importer_commits_progress_per_batch():
+    job = _job()
+    rows = _product_rows(3) + [(None, "Expected a JSON object")]
+    repo, uow = _run_import(job, rows)
+
+    assert uow.commits == [2, 4]
+    assert [row["sku"] for row in repo.upserted] == ["SKU-1", "SKU-2", "SKU-3"]
+    assert (job.rows_processed, job.rows_imported, job.rows_failed) == (4, 3, 1)
+    assert job.errors == [{"row": 4, "errors": ["Expected a JSON object"]}]
+
+
+def test_importer_resumes_after_committed_rows():
+    # Попереднє завантаження обірвалося після першої пачки
+    job = _job(rows_processed=2)
+    repo, uow = _run_import(job, _product_rows(5))
+
+    assert [row["sku"] for row in repo.upserted] == ["SKU-3", "SKU-4", "SKU-5"]
+    assert uow.commits == [4, 5]
+    assert job.rows_imported == 3
+
+
+def test_importer_rejects_unknown_category_and_caps_errors():
+    job = _job()
+    rows = [
+        ({"name": "Lamp", "price": "10", "category_id": 7}, None),
+        ({"name": "Desk", "price": "10", "category_id": 1}, None),
+        (None, "Expected 2 columns, got 1")
+    ]
+    repo, _ = _run_import(job, rows, batch_size=10, max_errors=1)
+
+    assert [row["name"] for row in repo.created] == ["Desk"]
+    assert job.rows_failed == 2
+    assert job.errors == [{"row": 1, "errors": ["category_id: Category 7 not found"]}]
+
+
+def test_importer_last_duplicate_sku_in_batch_wins():
+    rows = [
+        ({"name": "Old", "price": "10", "category_id": 1, "sku": "A"}, None),
+        ({"name": "New", "price": "10", "category_id": 1, "sku": "A"}, None)
+    ]
+    repo, _ = _run_import(_job(), rows)
+    assert [row["name"] for row in repo.upserted] == ["New"]
@@ -0,0 +1,130 @@
+"""Роути з @query_budget у strict-режимі (QUERY_BUDGET_STRICT=true, див. conftest).
+
+Перед кожним запитом кеші воркера скидаються (холодний кеш користувача
+і продуктів), кошик містить гарячий (шардований) продукт, замовлення
+створюється з новою адресою - найдорожчий шлях, під який задані бюджети.
+"""
+from routers.routes import cart, orders
+from routers.services import invalidation_bus
+from tests.helpers import login, make_hot, query_count, seed_catalog, seed_country
+
+ADDRESS = {"address_id": None, "country_code": "UA", "city": "Kyiv", "street": "Main 1", "postal_code": "01001"}
+
+
+async def cold(client, method: str, url: str, **kwargs):
+    """Запит із холодними кешами воркера"""
+    await invalidation_bus.reset()
+    return await client.request(method, url, **kwargs)
+
+
+async def checkout_setup(client):
+    """Кошик із гарячим продуктом (по одиниці в кожному з 4 шардів + 1) і лампою"""
+    await seed_country()
+    hot, lamp, desk = await seed_catalog([("Hot phone", 10, 5), ("Lamp", 20, 5), ("Desk", 30, 5)])
+    await make_hot(client, hot, shards=4)
+    auth = await login(client)
+    return auth, hot, lamp, desk
+
+
+def test_budgets_hold_on_worst_path(api):
+    async def scenario(client):
+        auth, hot, lamp, desk = await checkout_setup(client)
+
+        response = await cold(client, "POST", "/cart/item", json={"product_id": hot, "quantity": 1}, headers=auth)
+        assert response.status_code == 200, response.text
+        hot_line = response.json()["id"]
+        response = await cold(client, "POST", "/cart/item", json={"product_id": hot, "quantity": 1}, headers=auth)
+        assert response.status_code == 200, response.text
+        response = await cold(client, "POST", "/cart/items", headers=auth, json=[
+            {"product_id": hot, "quantity": 1}, {"product_id": lamp, "quantity": 1}, {"product_id": desk, "quantity": 1}
+        ])
+        assert response.status_code == 200, response.text
+        desk_line = next(item["id"] for item in response.json()["items"] if item["product"]["name"] == "Desk")
+        response = await cold(client, "PUT", f"/cart/item/{hot_line}", params={"quantity": 1}, headers=auth)
+        assert response.status_code == 200, response.text
+        response = await cold(client, "DELETE", f"/cart/item/{desk_line}", headers=auth)
+        assert response.status_code == 200, response.text
+        response = await cold(client, "GET", "/cart/", headers=auth)
+        assert response.status_code == 200, response.text
+
+        for url in ("/products/?in_stock=true", "/products/?sort=price", "/products/search?q=phone", f"/products/{hot}"):
+            response = await cold(client, "GET", url)
+            assert response.status_code == 200, response.text
+        for product_id in (hot, lamp):
+            response = await client.post(f"/products/{product_id}/comparison", headers=auth)
+            assert response.status_code == 200, response.text
+        for url in ("/products/comparison", "/products/comparison/matrix"):
+            response = await cold(client, "GET", url, headers=auth)
+            assert response.status_code == 200, response.text
+
+        # 4 одиниці гарячого продукту: жоден шард окремо не покриває - списання з кількох
+        response = await cold(client, "POST", "/orders/", json=ADDRESS, headers=auth)
+        assert response.status_code == 200, response.text
+        response = await cold(client, "GET", "/orders/1", headers=auth)
+        assert response.status_code == 200, response.text
+        response = await client.get(f"/products/{hot}")
+        assert response.json()["stock_quantity"] == 1
+
+        response = await cold(client, "POST", "/cart/item", json={"product_id": lamp, "quantity": 1}, headers=auth)
+        assert response.status_code == 200, response.text
+        response = await cold(client, "DELETE", "/cart/", headers=auth)
+        assert response.status_code == 200, response.text
+
+    api(scenario)
+
+
+def test_overrun_before_commit_rolls_back(api, monkeypatch):
+    monkeypatch.setattr(orders.create_order, "__query_budget__", 8)
+
+    async def scenario(client):
+        auth, hot, lamp, _ = await checkout_setup(client)
+        for product_id in (hot, lamp):
+            response = await client.post("/cart/item", json={"product_id": product_id, "quantity": 2}, headers=auth)
+            assert response.status_code == 200, response.text
+
+        response = await cold(client, "POST", "/orders/", json=ADDRESS, headers=auth)
+        assert response.status_code == 500
+        assert "Query budget exceeded" in response.json()["detail"]
+
+        # Замовлення не зафіксоване: залишки і кошик без змін
+        for product_id in (hot, lamp):
+            response = await client.get(f"/products/{product_id}")
+            assert response.json()["stock_quantity"] == 5
+        response = await client.get("/cart/", headers=auth)
+        assert len(response.json()["items"]) == 2
+        response = await client.get("/orders/1", headers=auth)
+        assert response.status_code == 404
+
+    api(scenario, allow_overruns=True)
+
+
+def test_overrun_after_commit_keeps_response(api, monkeypatch, caplog):
+    async def scenario(client):
+        auth, _, lamp, _ = await checkout_setup(client)
+        response = await client.post("/cart/item", json={"product_id": lamp, "quantity": 1}, headers=auth)
+        line = response.json()["id"]
+
+        response = await cold(client, "PUT", f"/cart/item/{line}", params={"quantity": 1}, headers=auth)
+        assert response.status_code == 200, response.text
+        # Бюджет, який закінчується рівно на commit: перечитування кошика після нього - перевищення
+        monkeypatch.setattr(cart.change_order_quantity, "__query_budget__", query_count(response) - 1)
+
+        response = await cold(client, "PUT", f"/cart/item/{line}", params={"quantity": 1}, headers=auth)
+        assert response.status_code == 200, response.text
+        assert response.json()["items"][0]["quantity"] == 3
+
+    api(scenario, allow_overruns=True)
+    assert any("after commit" in record.getMessage() for record in caplog.records)
+
+
+def test_read_route_over_budget_fails(api, monkeypatch):
+    from routers.routes import products
+    monkeypatch.setattr(products.search_product, "__query_budget__", 1)
+
+    async def scenario(client):
+        await seed_catalog([("Phone", 10, 1)])
+        response = await cold(client, "GET", "/products/search?q=phone")
+        assert response.status_code == 500
+        assert query_count(response) == 2
+
+    api(scenario, allow_overruns=True)
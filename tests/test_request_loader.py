@@ -0,0 +1,63 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event, select
+
+from db.database import AsyncSessionLocal, engine
+from db.loader import RequestLoader, memoized
+from db.models import Cart
+from routers.repositories import CartRepository
+from tests.helpers import login
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+def test_same_key_loads_once_per_session(api):
+    async def scenario(client):
+        await login(client)
+        async with AsyncSessionLocal() as session:
+            repo = CartRepository(session)
+            with count_queries() as statements:
+                first = await repo.get_for_user(1)
+                second = await repo.get_for_user(1)
+                assert await repo.get_for_user(2) is None
+            assert first is second
+            # user 1 - один запит, відсутній user 2 не запамʼятовується
+            assert len(statements) == 2
+
+        # Нова сесія (наступний HTTP-запит) - нове memo
+        async with AsyncSessionLocal() as session:
+            with count_queries() as statements:
+                await CartRepository(session).get_for_user(1)
+            assert len(statements) == 1
+
+    api(scenario)
+
+
+def test_rollback_clears_memo(api):
+    async def scenario(client):
+        await login(client)
+        async with AsyncSessionLocal() as session:
+            async def load():
+                return (await session.execute(select(Cart).where(Cart.user_id == 1))).scalar_one()
+
+            with count_queries() as statements:
+                await memoized(session, "cart", load)
+                await memoized(session, "cart", load)
+                await session.rollback()
+                await memoized(session, "cart", load)
+            assert len(statements) == 2
+            assert RequestLoader.of(session).get("cart") is not None
+
+    api(scenario)
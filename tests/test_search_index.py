@@ -0,0 +1,67 @@
+from routers.services.search_index import InvertedIndex, tokenize
+from tests.helpers import seed_catalog
+
+
+def index_of(*rows) -> InvertedIndex:
+    index = InvertedIndex()
+    index.build(rows)
+    return index
+
+
+def test_tokenize_lowercases_unicode_words():
+    assert tokenize("Чорна Лампа, 40W!") == ["чорна", "лампа", "40w"]
+    assert tokenize(None) == []
+
+
+def test_search_requires_all_tokens():
+    index = index_of((1, "Desk lamp", "Warm light"), (2, "Floor lamp", None), (3, "Desk", "Oak"))
+    assert sorted(index.search("lamp")) == [1, 2]
+    assert index.search("desk lamp") == [1]
+    assert index.search("lamp chair") == []
+    assert index.search("   ") == []
+
+
+def test_name_match_ranks_above_description_match():
+    index = index_of((1, "Chair", "Goes well with a lamp"), (2, "Lamp", "Bright"), (3, "Table", None))
+    assert index.search("lamp") == [2, 1]
+
+
+def test_equal_scores_ordered_by_id_and_paginated():
+    index = index_of(*[(product_id, "Lamp", None) for product_id in (5, 3, 4, 1)])
+    assert index.search("lamp") == [1, 3, 4, 5]
+    assert index.search("lamp", limit=2, offset=1) == [3, 4]
+
+
+def test_add_replaces_and_remove_drops_document():
+    index = index_of((1, "Lamp", None))
+    index.add(1, "Chair", None)
+    assert index.search("lamp") == []
+    assert index.search("chair") == [1]
+
+    index.remove(1)
+    assert index.search("chair") == []
+    assert len(index) == 0
+
+
+def test_add_before_build_is_ignored():
+    index = InvertedIndex()
+    index.add(1, "Lamp", None)
+    assert not index.is_built and len(index) == 0
+
+    index.build([(2, "Desk", None)])
+    index.invalidate()
+    assert not index.is_built and index.search("desk") == []
+
+
+def test_search_route_uses_fallback_on_sqlite(api):
+    async def scenario(client):
+        lamp, chair, table = await seed_catalog([("Desk lamp", 10, 1), ("Chair", 20, 1), ("Table", 30, 1)])
+        response = await client.get("/products/search", params={"q": "lamp"})
+        assert response.status_code == 200, response.text
+        # "Desk lamp description" збігається і в назві, і в описі
+        assert [product["id"] for product in response.json()] == [lamp]
+
+        response = await client.get("/products/search", params={"q": "description"})
+        assert {product["id"] for product in response.json()} == {lamp, chair, table}
+
+    api(scenario)
@@ -0,0 +1,95 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+
+from db import slow_queries
+
+
+class Clock:
+    """perf_counter модуля; кожен запит "триває" duration_ms"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.duration_ms = 0.0
+
+    def perf_counter(self) -> float:
+        return self.now
+
+    def elapse(self, *args) -> None:
+        self.now += self.duration_ms / 1000
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(slow_queries, "time", clock)
+    return clock
+
+
+def make_engine(clock: Clock, threshold_ms: float, sample_rate: float = 1.0):
+    engine = create_engine("sqlite://")
+    slow_queries.install_slow_query_logger(engine, threshold_ms, sample_rate)
+    # Після старту таймера логера - час "виконання" запиту
+    event.listen(engine, "before_cursor_execute", clock.elapse)
+    return engine
+
+
+def run(engine, statement: str = "SELECT 1") -> None:
+    with engine.connect() as conn:
+        conn.execute(text(statement))
+
+
+def slow_logs(caplog):
+    return [record.getMessage() for record in caplog.records if record.name == "db.slow_queries"]
+
+
+def test_only_queries_over_threshold_are_logged(clock, caplog):
+    engine = make_engine(clock, threshold_ms=50)
+    with caplog.at_level(logging.WARNING, logger="db.slow_queries"):
+        clock.duration_ms = 49
+        run(engine)
+        clock.duration_ms = 50
+        run(engine, "SELECT 2")
+
+    assert slow_logs(caplog) == ["Slow query (50.0 ms): SELECT 2"]
+
+
+def test_long_statement_is_truncated(clock, caplog):
+    engine = make_engine(clock, threshold_ms=1)
+    clock.duration_ms = 5
+    statement = "SELECT 1" + " " * 2000
+    with caplog.at_level(logging.WARNING, logger="db.slow_queries"):
+        run(engine, statement)
+
+    message, = slow_logs(caplog)
+    assert message.endswith(statement[:slow_queries.MAX_STATEMENT_CHARS])
+    assert len(message) < len(statement)
+
+
+def test_sampling_and_disabled_logger(clock, caplog, monkeypatch):
+    clock.duration_ms = 100
+    monkeypatch.setattr(slow_queries, "random", SimpleNamespace(random=lambda: 0.5))
+    with caplog.at_level(logging.WARNING, logger="db.slow_queries"):
+        run(make_engine(clock, threshold_ms=10, sample_rate=0.5))
+        run(make_engine(clock, threshold_ms=0))
+        run(make_engine(clock, threshold_ms=10, sample_rate=0))
+        assert slow_logs(caplog) == []
+
+        run(make_engine(clock, threshold_ms=10, sample_rate=0.6))
+    assert len(slow_logs(caplog)) == 1
+
+
+def test_failed_query_does_not_shift_timers(clock, caplog):
+    engine = make_engine(clock, threshold_ms=50)
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing"))
+        # Таймер упалого запиту знято, стек порожній
+        assert conn.info["query_started_at"] == []
+        clock.duration_ms = 60
+        with caplog.at_level(logging.WARNING, logger="db.slow_queries"):
+            conn.execute(text("SELECT 1"))
+    assert slow_logs(caplog) == ["Slow query (60.0 ms): SELECT 1"]
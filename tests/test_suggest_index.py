@@ -0,0 +1,53 @@
+from routers.services.suggest_index import PrefixIndex
+from tests.helpers import seed_catalog
+
+
+def index_of(*rows) -> PrefixIndex:
+    index = PrefixIndex()
+    index.build(rows)
+    return index
+
+
+def test_prefix_matches_start_of_any_word():
+    index = index_of((1, "Phone X"), (2, "Smart phone"), (3, "Headphones"), (4, "Photo frame"))
+    # Порядок - за ключем (залишок назви від слова), потім за id
+    assert [product_id for product_id, _ in index.suggest("phon")] == [2, 1]
+    assert index.suggest("PHO ") == index.suggest("pho")
+    assert index.suggest("") == []
+
+
+def test_product_listed_once_when_several_words_match():
+    index = index_of((1, "Lamp lamp lampshade"))
+    assert index.suggest("lamp") == [(1, "Lamp lamp lampshade")]
+
+
+def test_limit_counts_products():
+    index = index_of(*[(product_id, f"Lamp {product_id}") for product_id in range(1, 6)])
+    assert [product_id for product_id, _ in index.suggest("lamp", limit=3)] == [1, 2, 3]
+    assert len(index.suggest("lamp", limit=10)) == 5
+
+
+def test_add_and_remove_keep_keys_sorted():
+    index = index_of((1, "Desk"), (2, "Chair"))
+    index.add(1, "Standing desk")
+    index.add(3, "Desk lamp")
+    assert index.suggest("desk") == [(1, "Standing desk"), (3, "Desk lamp")]
+    assert index.suggest("sta") == [(1, "Standing desk")]
+
+    index.remove(1)
+    index.remove(42)
+    assert index.suggest("sta") == []
+    assert len(index) == 2
+
+
+def test_suggest_route(api):
+    async def scenario(client):
+        phone, lamp = await seed_catalog([("Smart phone", 10, 1), ("Lamp", 20, 1)])
+        response = await client.get("/products/suggest", params={"prefix": "pho"})
+        assert response.status_code == 200, response.text
+        assert response.json() == [{"id": phone, "name": "Smart phone"}]
+
+        response = await client.get("/products/suggest", params={"prefix": "l", "limit": 1})
+        assert response.json() == [{"id": lamp, "name": "Lamp"}]
+
+    api(scenario)
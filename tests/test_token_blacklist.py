@@ -0,0 +1,76 @@
+import hashlib
+
+from core.bloom import BloomFilter
+from routers.services.token_blacklist import TokenBlacklistFilter
+
+
+def token_hash(i: int) -> str:
+    return hashlib.sha256(f"token-{i}".encode()).hexdigest()
+
+
+def test_bloom_has_no_false_negatives():
+    items = [token_hash(i) for i in range(2000)]
+    bloom = BloomFilter.from_items(items, capacity=2000, error_rate=0.01)
+    assert all(item in bloom for item in items)
+    assert bloom.count == 2000
+
+
+def test_bloom_false_positive_rate_within_bound():
+    capacity, error_rate = 5000, 0.01
+    bloom = BloomFilter.from_items((token_hash(i) for i in range(capacity)), capacity, error_rate)
+    probes = 20000
+    false_positives = sum(token_hash(i) in bloom for i in range(capacity, capacity + probes))
+    # Запас у 2 рази: оцінка для n = capacity, а хеші детерміновані
+    assert false_positives / probes < error_rate * 2
+
+
+def test_bloom_sizing():
+    bloom = BloomFilter(capacity=1000, error_rate=0.001)
+    # ~14.4 біта і ~10 хешів на елемент для 0.1%
+    assert 14_000 < bloom.size < 15_000
+    assert bloom.hash_count == 10
+
+
+def test_filter_before_build_defers_to_database():
+    blacklist = TokenBlacklistFilter()
+    assert not blacklist.is_built
+    blacklist.add("ignored")
+    assert blacklist.might_contain("anything")
+    assert not blacklist.is_built
+
+
+def test_filter_after_rebuild():
+    blacklist = TokenBlacklistFilter()
+    blacklist.rebuild(["revoked"])
+    assert blacklist.is_built
+    assert blacklist.might_contain("revoked")
+    assert not blacklist.might_contain(token_hash(1))
+
+    # Токени, відкликані після побудови, теж мають знаходитися
+    blacklist.add("logged-out")
+    assert blacklist.might_contain("logged-out")
+
+
+def test_add_during_rebuild_survives_swap():
+    blacklist = TokenBlacklistFilter()
+    blacklist.rebuild([])
+
+    # Знімок таблиці прочитано до logout - у ньому токена ще немає
+    pending = blacklist.begin_rebuild()
+    snapshot = ["revoked"]
+    blacklist.add("logged-out")
+    blacklist.rebuild(snapshot, pending)
+
+    assert blacklist.might_contain("revoked")
+    assert blacklist.might_contain("logged-out")
+    # Запис зупинено: наступна перебудова не тягне старий pending
+    blacklist.rebuild([])
+    assert not blacklist.might_contain("logged-out")
+
+
+def test_failed_rebuild_stops_recording():
+    blacklist = TokenBlacklistFilter()
+    pending = blacklist.begin_rebuild()
+    blacklist.end_rebuild(pending)
+    blacklist.add("later")
+    assert pending == set()
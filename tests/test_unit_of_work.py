@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from db.database import AsyncSessionLocal
+from db.models import Category, Order, Product
+from db.unit_of_work import UnitOfWork
+from routers.services import CacheEntity, invalidation_bus
+from tests.helpers import login, seed_catalog, seed_country
+
+ADDRESS = {"address_id": None, "country_code": "UA", "city": "Kyiv", "street": "Main 1", "postal_code": "01001"}
+
+
+async def count(model) -> int:
+    async with AsyncSessionLocal() as session:
+        return (await session.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+def test_rollback_discards_pending_changes(api):
+    async def scenario(client):
+        async with AsyncSessionLocal() as session:
+            uow = UnitOfWork(session)
+            session.add(Category(name="Lamps"))
+            await uow.flush()
+            await uow.rollback()
+
+            # Сесія придатна далі, відкочене не потрапляє в наступний commit
+            session.add(Category(name="Desks"))
+            await uow.commit()
+
+        async with AsyncSessionLocal() as session:
+            names = (await session.execute(select(Category.name))).scalars().all()
+        assert names == ["Desks"]
+
+    api(scenario)
+
+
+def test_failed_flush_commits_nothing(api):
+    async def scenario(client):
+        await seed_catalog([])
+        async with AsyncSessionLocal() as session:
+            uow = UnitOfWork(session)
+            session.add(Product(name="Lamp", price=10, stock_quantity=1, category_id=1, sku="SKU"))
+            session.add(Product(name="Desk", price=10, stock_quantity=1, category_id=1, sku="SKU"))
+            with pytest.raises(IntegrityError):
+                await uow.commit()
+            await uow.rollback()
+        assert await count(Product) == 0
+
+    api(scenario)
+
+
+def test_order_rolls_back_when_stock_ran_out(api):
+    async def scenario(client):
+        await seed_country()
+        lamp, desk = await seed_catalog([("Lamp", 10, 5), ("Desk", 30, 5)])
+        auth = await login(client)
+        await client.post("/cart/items", headers=auth, json=[
+            {"product_id": lamp, "quantity": 2}, {"product_id": desk, "quantity": 1}
+        ])
+
+        # Залишок зменшили в обхід holds (наприклад, інвентаризація)
+        async with AsyncSessionLocal() as session:
+            await session.execute(update(Product).where(Product.id == desk).values(stock_quantity=0))
+            await session.commit()
+        await invalidation_bus.dispatch(CacheEntity.PRODUCT, [desk])
+
+        response = await client.post("/orders/", json=ADDRESS, headers=auth)
+        assert response.status_code == 400
+        assert "'Desk' (requested 1, available 0)" in response.json()["detail"]
+
+        # Ні замовлення, ні списання лампи; кошик як був
+        assert await count(Order) == 0
+        response = await client.get(f"/products/{lamp}")
+        assert response.json()["stock_quantity"] == 5
+        cart = (await client.get("/cart/", headers=auth)).json()
+        assert len(cart["items"]) == 2 and float(cart["total_price"]) == 50
+
+    api(scenario)